@@ -1,26 +1,53 @@
 """
 Flask app: simplified coaching homework API.
 Backend for Willab — deploy to Railway.
+create_app() builds the app; SDK clients are created lazily on first use (services/clients.py).
 """
 import os
 from flask import Flask
-from flask_cors import CORS
 from config import Config
-from routes.homework_v2 import bp as homework_bp
-from routes.admin_v2 import bp as admin_bp
 
-app = Flask(__name__)
-app.config.from_object(Config)
-CORS(app, origins=os.environ.get("CORS_ORIGINS", "").split(",") or ["*"])
 
-app.register_blueprint(homework_bp)
-app.register_blueprint(admin_bp)
+def create_app(config_object=Config):
+    app = Flask(__name__)
+    app.config.from_object(config_object)
 
+    from flask_cors import CORS
+    from routes.homework_v2 import bp as homework_bp
+    from routes.admin_v2 import bp as admin_bp
 
-@app.route("/health")
-def health():
-    return {"status": "ok"}
+    CORS(app, origins=os.environ.get("CORS_ORIGINS", "").split(",") or ["*"])
+    app.register_blueprint(homework_bp)
+    app.register_blueprint(admin_bp)
+
+    import commands
+    commands.register(app)
+
+    @app.route("/health")
+    def health():
+        return {"status": "ok"}
+
+    @app.route("/ready")
+    def ready():
+        """Dependency probes with per-dependency latency; 503 while warming up or a required dependency fails."""
+        from services import readiness
+        payload, ok = readiness.status(app)
+        return payload, 200 if ok else 503
+
+    return app
+
+
+def warm_up():
+    """Import heavy SDKs ahead of the first request. gunicorn calls this in the master when preloading."""
+    from services import clients
+    clients.preload()
+
+
+app = create_app()
 
 
 if __name__ == "__main__":
+    from services import finalize_sweeper, readiness
+    finalize_sweeper.start(app)
+    readiness.warm_up(app)
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)))
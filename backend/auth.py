@@ -4,7 +4,7 @@ Extract user from Supabase JWT in Authorization header.
 import os
 from functools import wraps
 from flask import request, jsonify, g
-from supabase import create_client
+from services.clients import supabase_client
 
 
 def get_supabase_auth():
@@ -12,7 +12,7 @@ def get_supabase_auth():
     key = os.environ.get("SUPABASE_SERVICE_KEY")
     if not url or not key:
         return None
-    return create_client(url, key)
+    return supabase_client(url, key)
 
 
 def get_user_from_jwt():
@@ -0,0 +1,59 @@
+"""
+Benchmark: bytes sent to Whisper and finalize transcription latency, with and without normalization.
+
+For each recording in --data (as uploaded by the browser), measures the original size, the normalized
+16 kHz mono Opus size and transcode time, then transcribes both with the finalize engine (whisper-1
+unless --no-transcribe) and reports end-to-end time (normalize + transcribe) against the original.
+Run from backend/ with OPENAI_API_KEY set:
+  python bench/audio_normalize.py --data recordings/ --bitrate 24000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.audio_normalize import transcode_to_speech_opus  # noqa: E402
+from services.openai_service import transcribe_audio_words  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--data", required=True)
+    ap.add_argument("--bitrate", type=int, default=24000)
+    ap.add_argument("--no-transcribe", action="store_true")
+    args = ap.parse_args()
+
+    rows = []
+    for name in sorted(os.listdir(args.data)):
+        with open(os.path.join(args.data, name), "rb") as f:
+            original = f.read()
+        t0 = time.perf_counter()
+        normalized = transcode_to_speech_opus(original, args.bitrate)
+        t_norm = time.perf_counter() - t0
+        row = {"name": name, "orig": len(original), "norm": len(normalized), "t_norm": t_norm}
+        if not args.no_transcribe:
+            t0 = time.perf_counter()
+            transcribe_audio_words(original, name)
+            row["t_orig"] = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            transcribe_audio_words(normalized, "audio.ogg")
+            row["t_new"] = t_norm + (time.perf_counter() - t0)
+        rows.append(row)
+        print(f"{name}: {row['orig']} -> {row['norm']} bytes, transcode {t_norm:.2f}s"
+              + (f", finalize {row['t_orig']:.2f}s -> {row['t_new']:.2f}s" if "t_orig" in row else ""))
+
+    if not rows:
+        sys.exit("No recordings found")
+    total_orig = sum(r["orig"] for r in rows)
+    total_norm = sum(r["norm"] for r in rows)
+    print(f"\nbytes sent: {total_orig} -> {total_norm} ({100.0 * total_norm / total_orig:.0f}%)")
+    if not args.no_transcribe:
+        print(f"median finalize transcription: {statistics.median(r['t_orig'] for r in rows):.2f}s -> "
+              f"{statistics.median(r['t_new'] for r in rows):.2f}s (incl. transcode)")
+
+
+if __name__ == "__main__":
+    main()
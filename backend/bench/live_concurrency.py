@@ -0,0 +1,106 @@
+"""
+Benchmark: how many concurrent live recordings one backend instance can hold.
+
+Each simulated recording is one student (one bearer token) that starts a session and posts a chunk to
+/v2/homework/recordings/stream-chunk every --interval seconds, like the recording page does.
+A level passes when p95 chunk latency stays under --interval (the client would otherwise fall behind).
+
+Usage (against a running instance, e.g. started with GUNICORN_WORKER_CLASS=sync|gthread|gevent):
+  python bench/live_concurrency.py --url http://localhost:5000 --tokens tokens.txt --audio sample.webm \
+      --levels 1,5,10,20,40 --chunks 10
+
+tokens.txt: one Supabase access token per line (one test student per concurrent recording).
+"""
+import argparse
+import base64
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def _post(url, token, body, timeout):
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as r:
+        return json.loads(r.read() or b"{}")
+
+
+def _recording(base_url, token, audio_b64, chunks, interval, latencies, errors):
+    try:
+        start = _post(f"{base_url}/v2/homework/start", token, {}, 30)
+    except Exception:
+        errors.append("start")
+        return
+    session_id = start.get("session_id")
+    for seq in range(chunks):
+        t0 = time.perf_counter()
+        try:
+            _post(f"{base_url}/v2/homework/recordings/stream-chunk", token, {
+                "session_id": session_id,
+                "sequence_index": seq,
+                "audio_base64": audio_b64,
+                "duration_seconds": interval,
+            }, 60)
+            latencies.append(time.perf_counter() - t0)
+        except (urllib.error.URLError, TimeoutError, OSError):
+            errors.append("chunk")
+        time.sleep(max(0.0, interval - (time.perf_counter() - t0)))
+
+
+def run_level(base_url, tokens, audio_b64, chunks, interval):
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=_recording, args=(base_url, t, audio_b64, chunks, interval, latencies, errors))
+        for t in tokens
+    ]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    if not latencies:
+        return {"ok": 0, "errors": len(errors)}
+    lat = sorted(latencies)
+    return {
+        "ok": len(lat),
+        "errors": len(errors),
+        "p50": statistics.median(lat),
+        "p95": lat[min(len(lat) - 1, int(len(lat) * 0.95))],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://localhost:5000")
+    ap.add_argument("--tokens", required=True)
+    ap.add_argument("--audio", required=True, help="short WebM/Opus chunk, as MediaRecorder produces")
+    ap.add_argument("--levels", default="1,5,10,20")
+    ap.add_argument("--chunks", type=int, default=10)
+    ap.add_argument("--interval", type=float, default=3.0)
+    args = ap.parse_args()
+
+    with open(args.tokens) as f:
+        tokens = [line.strip() for line in f if line.strip()]
+    with open(args.audio, "rb") as f:
+        audio_b64 = base64.b64encode(f.read()).decode()
+
+    print(f"{'recordings':>10} {'ok':>6} {'errors':>6} {'p50 s':>8} {'p95 s':>8}  holds")
+    for level in (int(x) for x in args.levels.split(",")):
+        if level > len(tokens):
+            print(f"{level:>10} skipped: only {len(tokens)} tokens")
+            continue
+        r = run_level(args.url.rstrip("/"), tokens[:level], audio_b64, args.chunks, args.interval)
+        p50, p95 = r.get("p50"), r.get("p95")
+        holds = bool(p95 is not None and p95 < args.interval and not r["errors"])
+        print(f"{level:>10} {r['ok']:>6} {r['errors']:>6} "
+              f"{(p50 or 0):>8.2f} {(p95 or 0):>8.2f}  {'yes' if holds else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
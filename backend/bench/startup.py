@@ -0,0 +1,73 @@
+"""
+Benchmark: cold-start cost of the backend.
+
+Runs a fresh interpreter per measurement and reports
+- per-module cumulative import time for `import app` (python -X importtime), slowest first
+- time from interpreter start to the first /health response
+- time to the first request that touches each heavy SDK import (warm_up), for comparison
+Run from backend/:
+  python bench/startup.py --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_REQUEST = r"""
+import time
+t0 = time.perf_counter()
+from app import app
+t_import = time.perf_counter() - t0
+r = app.test_client().get("/health")
+t_health = time.perf_counter() - t0
+from app import warm_up
+warm_up()
+t_warm = time.perf_counter() - t0
+print(f"{t_import:.3f} {t_health:.3f} {t_warm:.3f} {r.status_code}")
+"""
+
+
+def import_times(top):
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=BACKEND, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            rows.append((int(cumulative.strip()), name.rstrip()))
+        except ValueError:
+            continue
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    print("cumulative import time (ms), `import app`:")
+    for us, name in import_times(args.top):
+        print(f"{us / 1000:>9.1f}  {name}")
+
+    results = []
+    for _ in range(args.runs):
+        p = subprocess.run([sys.executable, "-c", FIRST_REQUEST], cwd=BACKEND, capture_output=True, text=True, check=True)
+        results.append([float(x) for x in p.stdout.split()[:3]])
+    results.sort(key=lambda r: r[1])
+    t_import, t_health, t_warm = results[len(results) // 2]
+    print(f"\nmedian of {args.runs} fresh interpreters:")
+    print(f"  import app            {t_import * 1000:>8.1f} ms")
+    print(f"  first /health served  {t_health * 1000:>8.1f} ms")
+    print(f"  + warm_up (SDKs)      {t_warm * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
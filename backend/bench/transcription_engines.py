@@ -0,0 +1,82 @@
+"""
+Benchmark: hosted Whisper API vs local CPU engine — latency and word error rate.
+
+Dataset: a directory of audio files, each with a reference transcript next to it (clip.webm + clip.txt).
+Run from backend/ with OPENAI_API_KEY set and faster-whisper installed:
+  python bench/transcription_engines.py --data bench_audio/ --engines openai,local --local-model base
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.transcription import LocalWhisperEngine, OpenAIWhisperEngine  # noqa: E402
+
+AUDIO_EXT = (".webm", ".wav", ".mp3", ".m4a", ".ogg")
+
+
+def _words(text):
+    return re.findall(r"[a-z0-9']+", (text or "").lower())
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--data", required=True)
+    ap.add_argument("--engines", default="openai,local")
+    ap.add_argument("--local-model", default="base")
+    ap.add_argument("--compute-type", default="int8")
+    args = ap.parse_args()
+
+    clips = []
+    for name in sorted(os.listdir(args.data)):
+        base, ext = os.path.splitext(name)
+        ref_path = os.path.join(args.data, base + ".txt")
+        if ext.lower() in AUDIO_EXT and os.path.exists(ref_path):
+            with open(os.path.join(args.data, name), "rb") as f:
+                audio = f.read()
+            with open(ref_path) as f:
+                clips.append((name, audio, f.read()))
+    if not clips:
+        sys.exit("No audio/reference pairs found")
+
+    engines = {}
+    for e in args.engines.split(","):
+        if e == "openai":
+            engines[e] = OpenAIWhisperEngine()
+        elif e == "local":
+            t0 = time.perf_counter()
+            engines[e] = LocalWhisperEngine(model_size=args.local_model, compute_type=args.compute_type)
+            print(f"local model load: {time.perf_counter() - t0:.2f}s")
+
+    print(f"{'engine':>8} {'clips':>6} {'p50 s':>8} {'p95 s':>8} {'mean WER':>9}")
+    for name, engine in engines.items():
+        lat, wer = [], []
+        for clip_name, audio, ref in clips:
+            t0 = time.perf_counter()
+            hyp = engine.transcribe(audio, clip_name)
+            lat.append(time.perf_counter() - t0)
+            wer.append(word_error_rate(ref, hyp))
+        lat.sort()
+        p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+        print(f"{name:>8} {len(lat):>6} {statistics.median(lat):>8.2f} {p95:>8.2f} {statistics.mean(wer):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
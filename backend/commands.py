@@ -0,0 +1,44 @@
+"""
+Maintenance commands, registered on the app's CLI by create_app(). Run from backend/:
+  flask --app app rescore --dry-run
+  flask --app app sweep-finalize
+"""
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+
+@click.command("rescore")
+@click.option("--dry-run/--apply", default=True, help="Print a diff of changed scores (default) or write them.")
+@click.option("--page-size", default=500, show_default=True, help="Recordings fetched per keyset page.")
+@click.option("--workers", default=2, show_default=True, help="Processes counting fillers.")
+@click.option("--recompute-starting-metric", is_flag=True, help="Re-resolve starting metrics from current overrides and exercise defaults.")
+@click.option("--after", "after_id", default=None, help="Resume after this recording id (last_id from a progress line).")
+def rescore_command(dry_run, page_size, workers, recompute_starting_metric, after_id):
+    """Recompute filler counts and scores of stored recordings from their transcripts."""
+    from services import rescore
+
+    totals = rescore.run(
+        dry_run=dry_run,
+        page_size=page_size,
+        workers=workers,
+        recompute_starting_metric=recompute_starting_metric,
+        after_id=after_id,
+    )
+    verb = "would change" if dry_run else "updated"
+    click.echo(f"Scanned {totals['scanned']:,} recordings; {verb} {totals['changed']:,}.", err=True)
+
+
+@click.command("sweep-finalize")
+@with_appcontext
+def sweep_finalize_command():
+    """Resume (or give up on) finalizes stuck past FINALIZE_STUCK_AFTER_SEC, once."""
+    from services import finalize_sweeper
+
+    result = finalize_sweeper.sweep_once(current_app._get_current_object())
+    click.echo(f"Claimed {result['claimed']}, gave up on {result['abandoned']}; {finalize_sweeper.get_stats()}", err=True)
+
+
+def register(app):
+    app.cli.add_command(rescore_command)
+    app.cli.add_command(sweep_finalize_command)
@@ -4,6 +4,21 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _admission_defaults() -> dict:
+    """Default in-flight caps per route class, sized to the gunicorn worker's request threads."""
+    worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+    if worker_class == "gevent":
+        return {"live": 12, "finalize": 6, "read": 12, "events": 50, "poll": 50}
+    threads = int(os.environ.get("GUNICORN_THREADS", "16")) if worker_class == "gthread" else 1
+    quarter = max(1, threads // 4)
+    rest = max(0, threads - 3 * quarter)
+    # finalize, live and read get a quarter each; SSE and long-polls share what is left (0 = never held open)
+    return {"live": quarter, "finalize": quarter, "read": quarter, "events": rest // 2, "poll": rest - rest // 2}
+
+
+_ADMISSION_DEFAULTS = _admission_defaults()
+
+
 class Config:
     SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
     SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY", "")
@@ -15,4 +30,50 @@ class Config:
     SUPABASE_STORAGE_BUCKET = os.environ.get("SUPABASE_STORAGE_BUCKET", "audio_recordings")
     DEFAULT_STARTING_METRIC = int(os.environ.get("DEFAULT_STARTING_METRIC", "100"))
     POINTS_PER_FILLER = int(os.environ.get("POINTS_PER_FILLER", "5"))
-    FILLER_WORDS = ["um", "uh", "like", "you know", "so"]  # configurable later from DB if needed
+    FILLER_WORDS = ["um", "uh", "like", "you know", "so"]  # default; exercises can override (scoring profiles)
+    # Transcription engine policy: "openai" | "local" (faster-whisper on CPU) | "auto" (local if installed)
+    TRANSCRIBE_LIVE_ENGINE = os.environ.get("TRANSCRIBE_LIVE_ENGINE", "auto")
+    TRANSCRIBE_FINALIZE_ENGINE = os.environ.get("TRANSCRIBE_FINALIZE_ENGINE", "openai")
+    LOCAL_WHISPER_MODEL = os.environ.get("LOCAL_WHISPER_MODEL", "base")
+    LOCAL_WHISPER_COMPUTE_TYPE = os.environ.get("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+    LOCAL_WHISPER_CPU_THREADS = int(os.environ.get("LOCAL_WHISPER_CPU_THREADS", "0"))
+    LOCAL_WHISPER_WORKERS = int(os.environ.get("LOCAL_WHISPER_WORKERS", "2"))
+    # Voice-activity gate before live-window transcription
+    VAD_ENABLED = os.environ.get("VAD_ENABLED", "true").lower() == "true"
+    VAD_ENERGY_DBFS = float(os.environ.get("VAD_ENERGY_DBFS", "-45"))
+    VAD_MIN_SPEECH_MS = int(os.environ.get("VAD_MIN_SPEECH_MS", "200"))
+    VAD_PAD_MS = int(os.environ.get("VAD_PAD_MS", "200"))
+    # Finalize audio normalization (16 kHz mono Opus) before transcription
+    AUDIO_NORMALIZE_ENABLED = os.environ.get("AUDIO_NORMALIZE_ENABLED", "true").lower() == "true"
+    AUDIO_NORMALIZE_BITRATE = int(os.environ.get("AUDIO_NORMALIZE_BITRATE", "24000"))
+    AUDIO_NORMALIZE_WORKERS = int(os.environ.get("AUDIO_NORMALIZE_WORKERS", "2"))
+    AUDIO_NORMALIZE_TIMEOUT_SEC = float(os.environ.get("AUDIO_NORMALIZE_TIMEOUT_SEC", "30"))
+    # Per-session spool of streamed chunks for finalize's assemble_from_stream mode
+    SPOOL_DIR = os.environ.get("SPOOL_DIR", "")
+    SPOOL_TTL_SEC = int(os.environ.get("SPOOL_TTL_SEC", "86400"))  # finalize sweeper purges spools idle this long
+    # Admission control (per worker process): in-flight caps per route class, per-user stream-chunk rate.
+    # Under gthread/sync every admitted request, SSE stream and parked long-poll holds a worker thread, so the
+    # default caps split GUNICORN_THREADS between the classes (16 threads: 4/4/4/2/2) and a full class answers
+    # 503 instead of queueing behind idle streams. Under gevent, green threads are cheap and the caps are larger.
+    ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_MAX_LIVE = int(os.environ.get("ADMISSION_MAX_LIVE", _ADMISSION_DEFAULTS["live"]))
+    ADMISSION_MAX_FINALIZE = int(os.environ.get("ADMISSION_MAX_FINALIZE", _ADMISSION_DEFAULTS["finalize"]))
+    ADMISSION_MAX_READ = int(os.environ.get("ADMISSION_MAX_READ", _ADMISSION_DEFAULTS["read"]))
+    ADMISSION_MAX_EVENTS = int(os.environ.get("ADMISSION_MAX_EVENTS", _ADMISSION_DEFAULTS["events"]))
+    ADMISSION_MAX_POLL = int(os.environ.get("ADMISSION_MAX_POLL", _ADMISSION_DEFAULTS["poll"]))  # ?wait long-polls
+    ADMISSION_LIVE_RATE = float(os.environ.get("ADMISSION_LIVE_RATE", "1.0"))
+    ADMISSION_LIVE_BURST = float(os.environ.get("ADMISSION_LIVE_BURST", "5"))
+    # Finalize journal sweeper: resume finalizes whose worker died (see services/finalize_sweeper.py)
+    FINALIZE_SWEEPER_ENABLED = os.environ.get("FINALIZE_SWEEPER_ENABLED", "true").lower() == "true"
+    FINALIZE_STUCK_AFTER_SEC = int(os.environ.get("FINALIZE_STUCK_AFTER_SEC", "600"))
+    FINALIZE_SWEEP_INTERVAL_SEC = int(os.environ.get("FINALIZE_SWEEP_INTERVAL_SEC", "60"))
+    FINALIZE_SWEEP_BATCH = int(os.environ.get("FINALIZE_SWEEP_BATCH", "10"))
+    FINALIZE_SWEEP_CONCURRENCY = int(os.environ.get("FINALIZE_SWEEP_CONCURRENCY", "2"))
+    FINALIZE_MAX_ATTEMPTS = int(os.environ.get("FINALIZE_MAX_ATTEMPTS", "3"))
+    # /ready dependency probes (see services/readiness.py)
+    READY_REQUIRED = os.environ.get("READY_REQUIRED", "supabase,openai")
+    READY_PROBE_TIMEOUT_SEC = float(os.environ.get("READY_PROBE_TIMEOUT_SEC", "2"))
+    READY_CACHE_SEC = float(os.environ.get("READY_CACHE_SEC", "10"))
+    READY_WARM_UP_TIMEOUT_SEC = float(os.environ.get("READY_WARM_UP_TIMEOUT_SEC", "15"))
+    # Admin profiling endpoints (/v2/admin/profile/*); idle unless an admin starts one
+    PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "true").lower() == "true"
@@ -0,0 +1,56 @@
+"""
+Gunicorn settings, all overridable from env (Railway → Variables).
+
+Profiles (GUNICORN_WORKER_CLASS):
+- gthread (default): each worker runs GUNICORN_THREADS request threads. Requests spend most of their time
+  waiting on Supabase, OpenAI or Resend, which releases the GIL, so one slow Whisper call no longer blocks others.
+- gevent: green threads, GUNICORN_WORKER_CONNECTIONS per worker. Best for many long-polls / SSE streams. Never preloaded.
+- sync: the old one-request-per-worker model.
+
+Live metrics buffers and session events are per process, so keep WEB_CONCURRENCY=1 unless the proxy pins a
+student to one worker; scale with threads/connections first.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+threads = int(os.environ.get("GUNICORN_THREADS", "16"))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "200"))
+# Finalize runs Whisper + GPT inline; SSE streams stay open up to SSE_MAX_SEC.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+accesslog = os.environ.get("GUNICORN_ACCESSLOG", "-")
+# Load the app (and warm heavy SDK imports) once in the master; workers fork with it already imported.
+# Never with gevent: locks, conditions and executors created in the master before the workers monkey-patch
+# would stay native (a long-poll wait blocks the whole hub), and preloaded ssl breaks with RecursionError.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true" and worker_class != "gevent"
+
+
+def when_ready(server):
+    if worker_class != "gevent":
+        # Each admitted request, SSE stream and parked long-poll holds a thread: caps past the thread count
+        # queue requests inside the worker instead of answering 503
+        from config import Config
+        caps = sum(getattr(Config, f"ADMISSION_MAX_{name}") for name in ("LIVE", "FINALIZE", "READ", "EVENTS", "POLL"))
+        if Config.ADMISSION_ENABLED and caps > threads:
+            server.log.warning("ADMISSION_MAX_* caps add up to %d, more than the %d worker threads", caps, threads)
+    if preload_app:
+        from app import warm_up
+        warm_up()
+
+
+def post_fork(server, worker):
+    # Never share a parent's HTTP connection pools across processes
+    from services import clients
+    clients.reset()
+
+
+def post_worker_init(worker):
+    # After worker init (and gevent's monkey-patching): each worker runs its own stuck-finalize sweeper and
+    # opens its own dependency connections so /ready passes with hot pools
+    from app import app
+    from services import finalize_sweeper, readiness
+    finalize_sweeper.start(app)
+    readiness.warm_up(app)
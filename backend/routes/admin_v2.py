@@ -1,10 +1,18 @@
 """
-Admin routes: send homework, student context, task_1 pool, exercises, reports, feedback.
+Admin routes: send homework, student context, task_1 pool, exercises, reports, feedback, profiling.
 """
-from flask import Blueprint, jsonify, g, request
+from datetime import datetime, timedelta, timezone
+from flask import Blueprint, Response, current_app, jsonify, g, request, stream_with_context
 from auth import require_admin
 from services import db
 from services.email_service import send_homework_assignment, send_coach_feedback
+from services import vad
+from services import admission
+from services import report_export
+from services import scoring_profiles
+from services import homework_view
+from services import profiling
+from services.timeline_metrics import expand_timeline
 
 bp = Blueprint("admin_v2", __name__, url_prefix="/v2/admin")
 
@@ -16,6 +24,95 @@ def check():
     return jsonify({"ok": True})
 
 
+@bp.route("/live-stats", methods=["GET"])
+@require_admin
+def live_stats():
+    """Counters for this worker process: VAD windows checked/skipped/trimmed and seconds saved; admission in-flight
+    and shed counts; finalize sweeper claims and resumes."""
+    from services import finalize_sweeper
+    return jsonify({"vad": vad.get_stats(), "admission": admission.get_stats(), "finalize_sweeper": finalize_sweeper.get_stats()})
+
+
+def _profiling_disabled():
+    if not current_app.config.get("PROFILING_ENABLED", True):
+        return jsonify({"error": "Profiling disabled"}), 404
+    return None
+
+
+@bp.route("/profile/cpu", methods=["POST"])
+@require_admin
+def profile_cpu():
+    """
+    Sample this worker's thread stacks for ?seconds=N (default 10, max 30) at ?hz= (default 100).
+    Returns collapsed stacks as text (flamegraph.pl / speedscope); 409 if a profile is already running.
+    """
+    disabled = _profiling_disabled()
+    if disabled:
+        return disabled
+    try:
+        text, meta = profiling.sample_cpu(
+            request.args.get("seconds", 10, type=float),
+            request.args.get("hz", 100, type=int),
+        )
+    except profiling.ProfilerBusy:
+        return jsonify({"error": "A profile is already running in this worker"}), 409
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return Response(text, mimetype="text/plain", headers={
+        "Content-Disposition": f'attachment; filename="cpu-{stamp}.collapsed"',
+        "X-Profile-Samples": str(meta["samples"]),
+        "X-Profile-Stacks": str(meta["stacks"]),
+    })
+
+
+@bp.route("/profile/memory", methods=["GET"])
+@require_admin
+def profile_memory():
+    """tracemalloc state plus in-memory buffer stats (live-metrics audio, event channels, cached views)."""
+    disabled = _profiling_disabled()
+    if disabled:
+        return disabled
+    return jsonify({"tracemalloc": profiling.trace_status(), "buffers": profiling.buffer_stats()})
+
+
+@bp.route("/profile/memory/start", methods=["POST"])
+@require_admin
+def profile_memory_start():
+    """Start tracemalloc with ?frames= (default 10). Slows allocations while on; stop it when done."""
+    disabled = _profiling_disabled()
+    if disabled:
+        return disabled
+    return jsonify(profiling.trace_start(request.args.get("frames", 10, type=int)))
+
+
+@bp.route("/profile/memory/stop", methods=["POST"])
+@require_admin
+def profile_memory_stop():
+    disabled = _profiling_disabled()
+    if disabled:
+        return disabled
+    return jsonify(profiling.trace_stop())
+
+
+@bp.route("/profile/memory/snapshot", methods=["POST"])
+@require_admin
+def profile_memory_snapshot():
+    """
+    Take a tracemalloc snapshot: top ?limit= (default 25) sites grouped by ?group_by= lineno|filename|traceback,
+    or with ?diff=1 the growth since the previous snapshot. 409 if tracemalloc is not started.
+    """
+    disabled = _profiling_disabled()
+    if disabled:
+        return disabled
+    result = profiling.trace_snapshot(
+        limit=max(1, min(request.args.get("limit", 25, type=int), 200)),
+        group_by=request.args.get("group_by") or "lineno",
+        diff=request.args.get("diff") in ("1", "true"),
+    )
+    if result is None:
+        return jsonify({"error": "tracemalloc not started; POST /v2/admin/profile/memory/start first"}), 409
+    return jsonify(result)
+
+
 @bp.route("/students", methods=["GET"])
 @require_admin
 def list_students():
@@ -66,6 +163,12 @@ def send_homework():
     if exercise_id:
         exercise = db.get_exercise_by_id(exercise_id)
     session = db.create_session(student_id, recommended_exercise_id=exercise_id if exercise else None)
+    homework_view.set_session(
+        student_id,
+        session["id"],
+        "not_started",
+        {"id": exercise_id, "name": exercise.get("name"), "description": exercise.get("description")} if exercise else None,
+    )
     student_email = _get_user_email(student_id)
     student_name = "Student"
     profile = db.get_student_profile(student_id)
@@ -171,10 +274,14 @@ def create_exercise():
     name = data.get("name") or ""
     if not name:
         return jsonify({"error": "name required"}), 400
+    scoring, error = _scoring_fields(data)
+    if error:
+        return jsonify({"error": error}), 400
     item = db.create_exercise(
         name=name,
         description=data.get("description"),
         default_starting_metric=data.get("default_starting_metric", 100),
+        scoring=scoring,
     )
     return jsonify(item)
 
@@ -183,15 +290,52 @@ def create_exercise():
 @require_admin
 def update_exercise(exercise_id):
     data = request.get_json() or {}
+    scoring, error = _scoring_fields(data)
+    if error:
+        return jsonify({"error": error}), 400
     db.update_exercise(
         exercise_id,
         name=data.get("name"),
         description=data.get("description"),
         default_starting_metric=data.get("default_starting_metric"),
+        scoring=scoring,
     )
+    if scoring:
+        scoring_profiles.invalidate(exercise_id)
     return jsonify({"ok": True})
 
 
+def _scoring_fields(data):
+    """
+    Scoring-profile fields present in the body: filler_words (list or comma-separated string),
+    points_per_filler, target_wpm_min, target_wpm_max. null or "" clears an override.
+    Returns (fields, error).
+    """
+    fields = {}
+    if "filler_words" in data:
+        words = data["filler_words"]
+        if isinstance(words, str):
+            words = words.split(",")
+        if words is not None and not isinstance(words, list):
+            return None, "filler_words must be a list or comma-separated string"
+        words = [w.strip().lower() for w in (words or []) if isinstance(w, str) and w.strip()]
+        fields["filler_words"] = words or None
+    for key in ("points_per_filler", "target_wpm_min", "target_wpm_max"):
+        if key in data:
+            value = data[key]
+            if value in (None, ""):
+                fields[key] = None
+                continue
+            try:
+                fields[key] = int(value)
+            except (TypeError, ValueError):
+                return None, f"{key} must be an integer"
+    if (fields.get("target_wpm_min") is not None and fields.get("target_wpm_max") is not None
+            and fields["target_wpm_min"] > fields["target_wpm_max"]):
+        return None, "target_wpm_min must not exceed target_wpm_max"
+    return fields, None
+
+
 @bp.route("/reports", methods=["GET"])
 @require_admin
 def list_reports():
@@ -200,12 +344,131 @@ def list_reports():
     return jsonify(items)
 
 
+INBOX_MAX_LIMIT = 100
+INBOX_MAX_STUDENTS = 200
+
+
+@bp.route("/feedback-inbox", methods=["GET"])
+@require_admin
+def feedback_inbox():
+    """
+    Reports waiting for coach feedback, oldest first. Query: student_id, min_age_hours (only reports at least
+    this old), max_age_hours, limit (default 50), cursor (next_cursor from the previous page).
+    Also returns per-student pending counts (longest-waiting first, first INBOX_MAX_STUDENTS) and the total
+    pending across all students.
+    """
+    limit = max(1, min(request.args.get("limit", 50, type=int), INBOX_MAX_LIMIT))
+    cursor = None
+    if request.args.get("cursor"):
+        try:
+            created_at, report_id = request.args["cursor"].rsplit("_", 1)
+            cursor = (created_at, report_id)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+    now = datetime.now(timezone.utc)
+    min_age = request.args.get("min_age_hours", type=float)
+    max_age = request.args.get("max_age_hours", type=float)
+    items = db.list_feedback_inbox(
+        cursor=cursor,
+        limit=limit,
+        user_id=request.args.get("student_id") or None,
+        created_before=(now - timedelta(hours=min_age)).isoformat() if min_age else None,
+        created_after=(now - timedelta(hours=max_age)).isoformat() if max_age else None,
+    )
+    counts = db.get_feedback_pending_counts(limit=INBOX_MAX_STUDENTS)
+    last = items[-1] if len(items) == limit else None
+    return jsonify({
+        "items": items,
+        "next_cursor": f"{last['created_at']}_{last['id']}" if last else None,
+        "pending_by_student": counts,
+        "total_pending": db.get_feedback_pending_total(),
+    })
+
+
+@bp.route("/reports/export", methods=["GET"])
+@require_admin
+def export_reports():
+    """
+    Stream reports with recording metrics and student emails. Query: format=csv|ndjson, gzip=1,
+    from / to (ISO dates, to exclusive), student_id, exercise_id, include_transcript=1.
+    """
+    fmt = (request.args.get("format") or "csv").lower()
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    include_transcript = request.args.get("include_transcript") in ("1", "true")
+    compress = request.args.get("gzip") in ("1", "true")
+    pages = report_export.iter_pages(
+        _get_user_email,
+        include_transcript=include_transcript,
+        date_from=request.args.get("from") or None,
+        date_to=request.args.get("to") or None,
+        user_id=request.args.get("student_id") or None,
+        exercise_id=request.args.get("exercise_id") or None,
+    )
+    body = report_export.encode_csv(pages, include_transcript) if fmt == "csv" else report_export.encode_ndjson(pages)
+    filename = f"reports-{datetime.now(timezone.utc):%Y%m%d}.{fmt}"
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    if compress:
+        body = report_export.gzip_stream(body)
+        filename += ".gz"
+        mimetype = "application/gzip"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"},
+    )
+
+
+SEARCH_MAX_LIMIT = 100
+SEARCH_RANK_CANDIDATES = 2000  # order=rank ranks only this many of the most recent matches
+SEARCH_ORDERS = ("rank", "recent")
+
+
+@bp.route("/search", methods=["GET"])
+@require_admin
+def search_transcripts():
+    """
+    Search transcripts. Query: q (websearch syntax: "exact phrase", or, -word), student_id, exercise_id,
+    order (rank: best matches among the most recent SEARCH_RANK_CANDIDATES; recent: newest first),
+    limit (default 20), cursor (next_cursor from the previous page). Matches in snippets are wrapped in <mark>.
+    """
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "q is required"}), 400
+    order = request.args.get("order") or "rank"
+    if order not in SEARCH_ORDERS:
+        return jsonify({"error": "order must be rank or recent"}), 400
+    limit = max(1, min(request.args.get("limit", 20, type=int), SEARCH_MAX_LIMIT))
+    cursor = None
+    if request.args.get("cursor"):
+        try:
+            key, rec_id = request.args["cursor"].split("_", 1)
+            cursor = (float(key) if order == "rank" else datetime.fromisoformat(key).isoformat(), rec_id)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+    results = db.search_transcripts(
+        q,
+        user_id=request.args.get("student_id") or None,
+        exercise_id=request.args.get("exercise_id") or None,
+        limit=limit,
+        cursor=cursor,
+        order=order,
+        candidates=SEARCH_RANK_CANDIDATES,
+    )
+    last = results[-1] if len(results) == limit else None
+    next_cursor = None
+    if last:
+        next_cursor = f"{last['rank']!r}_{last['recording_id']}" if order == "rank" else f"{last['created_at']}_{last['recording_id']}"
+    return jsonify({"results": results, "next_cursor": next_cursor})
+
+
 @bp.route("/reports/<report_id>", methods=["GET"])
 @require_admin
 def get_report(report_id):
     report = db.get_report_by_id(report_id)
     if not report:
         return jsonify({"error": "Report not found"}), 404
+    recording = report.get("recordings_v2") if isinstance(report.get("recordings_v2"), dict) else {}
     return jsonify({
         "id": report["id"],
         "score": report.get("score"),
@@ -213,6 +476,8 @@ def get_report(report_id):
         "coach_feedback_text": report.get("coach_feedback_text"),
         "coach_feedback_sent_at": report.get("coach_feedback_sent_at"),
         "coach_reminder": "Your coach will contact you within 24 hours.",
+        "wpm": recording.get("wpm"),
+        "timeline": expand_timeline(recording.get("timeline")),
     })
 
 
@@ -221,15 +486,11 @@ def get_report(report_id):
 def submit_feedback(report_id):
     data = request.get_json() or {}
     text = data.get("coach_feedback_text") or ""
-    report = db.get_report_by_id(report_id)
+    report = db.submit_report_feedback(report_id, text)
     if not report:
         return jsonify({"error": "Report not found"}), 404
-    db.update_report_feedback(report_id, text)
-    sess = report.get("homework_sessions_v2")
-    user_id = (sess.get("user_id") if isinstance(sess, dict) else (sess[0].get("user_id") if isinstance(sess, list) and sess else None)) or report.get("user_id")
-    if not user_id and report.get("session_id"):
-        sess = db.get_session_by_id(report["session_id"])
-        user_id = sess.get("user_id") if sess else None
+    homework_view.update_session(report.get("session_id"), coach_feedback_text=text)
+    user_id = report.get("user_id")
     student_email = _get_user_email(user_id) if user_id else None
     if student_email:
         try:
@@ -2,60 +2,83 @@
 Student homework routes: status, start, report, finalize.
 """
 import base64
-from flask import Blueprint, jsonify, g, request
+import hashlib
+import json
+import time
+from flask import Blueprint, Response, current_app, jsonify, g, request
 from auth import require_auth
 from services import db
-from services.recording_1_job import process_recording_finalize
-from services.live_metrics import append_chunk, process_window, clear_buffer
+from services import session_events
+from services import audio_spool
+from services import admission
+from services import homework_view
+from services.audio_normalize import normalize_audio
+from services.recording_1_job import finalize_payload, process_recording_finalize
+from services.live_metrics import append_chunk, request_metrics, latest_metrics, clear_buffer
+from services.admission import admit
 
 bp = Blueprint("homework_v2", __name__, url_prefix="/v2/homework")
 
+LONG_POLL_MAX_SEC = 30.0  # cap for ?wait=N on /status and /report
+SSE_MAX_SEC = 300.0       # /events stream closes after this; client reconnects with Last-Event-ID
+SSE_HEARTBEAT_SEC = 15.0
+
+
+def _wait_seconds():
+    """Long-poll wait from ?wait=N, capped at LONG_POLL_MAX_SEC. 0 means answer immediately."""
+    return min(LONG_POLL_MAX_SEC, max(0.0, request.args.get("wait", 0, type=float)))
+
+
+def _conditional_json(payload, etag):
+    """JSON response with ETag; 304 with no body if the client's If-None-Match already matches."""
+    if request.if_none_match.contains(etag):
+        resp = current_app.response_class(status=304)
+    else:
+        resp = jsonify(payload)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
 
-def _session_to_step(session):
-    if not session:
-        return "landing", None
-    status = session.get("status") or "not_started"
-    if status == "not_started":
-        return "landing", session
-    if status == "recording":
-        return "recording", session
-    if status == "processing":
-        return "processing", session
-    if status == "completed":
-        return "report", session
-    return "landing", session
+
+def _wait_for_terminal(session_id, timeout):
+    """Block until report_ready/failed is published for the session or timeout passes."""
+    deadline = time.monotonic() + timeout
+    version = session_events.current_version(session_id)
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        events = session_events.wait_for_events(session_id, version, remaining)
+        if not events:
+            return False
+        if any(name in session_events.TERMINAL_EVENTS for _, name, _ in events):
+            return True
+        version = events[-1][0]
 
 
 @bp.route("/status", methods=["GET"])
 @require_auth
+@admit("read")
 def status():
-    """Current session state + recommended exercise. Step: landing | recording | processing | report."""
+    """
+    Current session state + recommended exercise. Step: landing | recording | processing | report.
+    Served from the cached per-student view (services/homework_view.py).
+    Supports If-None-Match (304). With ?wait=N and a matching If-None-Match, waits up to N seconds for a state change
+    (outside the read cap; answers at once if the long-poll cap is full).
+    """
     user_id = str(g.current_user.id)
-    session = db.get_current_session(user_id)
-    step, _ = _session_to_step(session)
-    payload = {"step": step}
-    if session:
-        payload["session_id"] = session["id"]
-        payload["status"] = session.get("status")
-        payload["exercise"] = _exercise_payload(session)
-    else:
-        payload["session_id"] = None
-        payload["status"] = None
-        payload["exercise"] = None
-    return jsonify(payload)
-
-
-def _exercise_payload(session):
-    ex = session.get("exercises_pool") if isinstance(session.get("exercises_pool"), dict) else None
-    eid = session.get("recommended_exercise_id")
-    if not eid and not ex:
-        return None
-    if ex:
-        return {"id": eid, "name": ex.get("name"), "description": ex.get("description")}
-    if eid:
-        exercise = db.get_exercise_by_id(str(eid))
-        return {"id": eid, "name": exercise.get("name") if exercise else None, "description": exercise.get("description") if exercise else None}
-    return None
+    view = homework_view.get(user_id)
+    payload = homework_view.status_payload(view)
+    etag = homework_view.etag(payload)
+    wait = _wait_seconds()
+    if wait and view["session_id"] and request.if_none_match.contains(etag):
+        version = session_events.current_version(view["session_id"])
+        with admission.long_poll("read") as may_wait:
+            changed = may_wait and session_events.wait_for_events(view["session_id"], version, wait)
+        if changed:
+            payload = homework_view.status_payload(homework_view.get(user_id))
+            etag = homework_view.etag(payload)
+    return _conditional_json(payload, etag)
 
 
 @bp.route("/start", methods=["POST"])
@@ -63,50 +86,113 @@ def _exercise_payload(session):
 def start():
     """Create or resume session; return session_id, exercise, step. Sets status to recording so client can show recording view."""
     user_id = str(g.current_user.id)
-    session = db.get_current_session(user_id)
-    if session and session.get("status") in ("not_started", "recording"):
-        if session.get("status") == "not_started":
-            db.update_session_status(session["id"], "recording")
-        step = "recording"
-        return jsonify({
-            "session_id": session["id"],
-            "step": step,
-            "exercise": _exercise_payload(session),
-        })
-    data = request.get_json() or {}
-    recommended_exercise_id = data.get("recommended_exercise_id")
-    session = db.create_session(user_id, recommended_exercise_id=recommended_exercise_id)
-    db.update_session_status(session["id"], "recording")
+    data = request.get_json(silent=True) or {}
+    result = db.start_or_resume_session(user_id, recommended_exercise_id=data.get("recommended_exercise_id"))
+    homework_view.set_session(user_id, result["session_id"], result.get("status") or "recording", result.get("exercise"))
     return jsonify({
-        "session_id": session["id"],
+        "session_id": result["session_id"],
         "step": "recording",
-        "exercise": _exercise_payload(session),
+        "exercise": result.get("exercise"),
     })
 
 
 @bp.route("/report", methods=["GET"])
 @require_auth
+@admit("read")
 def report():
-    """Get report for current session: score, summary, coach reminder."""
+    """
+    Get report for current session: score, summary, coach reminder. Served from the cached per-student view.
+    Supports If-None-Match (304). With ?wait=N while the session is still recording/processing,
+    waits up to N seconds for the report instead of returning 404 straight away.
+    """
     user_id = str(g.current_user.id)
-    session = db.get_current_session(user_id)
-    if not session or session.get("status") != "completed":
+    view = homework_view.get(user_id)
+    wait = _wait_seconds()
+    if wait and view["status"] in ("recording", "processing"):
+        with admission.long_poll("read") as may_wait:
+            done = may_wait and _wait_for_terminal(view["session_id"], wait)
+        if done:
+            view = homework_view.get(user_id)
+    if view["status"] != "completed":
         return jsonify({"error": "No report available"}), 404
-    report_row = db.get_report_by_session(session["id"])
-    if not report_row:
+    payload = homework_view.report_payload(view)
+    if not payload:
         return jsonify({"error": "Report not found"}), 404
-    return jsonify({
-        "score": report_row.get("score"),
-        "summary": report_row.get("summary"),
-        "coach_reminder": "Your coach will contact you within 24 hours.",
-        "coach_feedback_text": report_row.get("coach_feedback_text"),
-    })
+    return _conditional_json(payload, homework_view.etag(payload))
+
+
+@bp.route("/events", methods=["GET"])
+@require_auth
+def events():
+    """
+    Server-sent events for the current session: status (initial), processing, transcribed, scored,
+    report_ready, summary_delta (partial summary text), summary_ready, failed.
+    Closes after summary_ready/failed or SSE_MAX_SEC; resume with Last-Event-ID.
+    """
+    user_id = str(g.current_user.id)
+    session = db.get_current_session(user_id)
+    if not session:
+        return jsonify({"error": "No session"}), 404
+    session_id = str(session["id"])
+    initial_status = session.get("status")
+    last_id = request.headers.get("Last-Event-ID", type=int)
+    version = last_id if last_id is not None else session_events.current_version(session_id)
+
+    def _sse(name, data, event_id=None):
+        head = f"id: {event_id}\n" if event_id is not None else ""
+        return f"{head}event: {name}\ndata: {json.dumps(data)}\n\n"
+
+    if not admission.try_enter("events"):
+        return admission.busy_response("events")
+
+    def stream(version):
+        yield _sse("status", {"session_id": session_id, "status": initial_status})
+        if initial_status == "completed" and last_id is None:
+            yield _sse("report_ready", {})
+            if version == 0:
+                # Nothing buffered here for this session (other worker or older session): report is final
+                return
+            # Replay buffered events so a summary still streaming is picked up
+            version = 0
+        deadline = time.monotonic() + SSE_MAX_SEC
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            batch = session_events.wait_for_events(session_id, version, min(SSE_HEARTBEAT_SEC, remaining))
+            if not batch:
+                yield ": keepalive\n\n"
+                continue
+            for event_id, name, data in batch:
+                version = event_id
+                yield _sse(name, data, event_id)
+                if name in session_events.STREAM_END_EVENTS:
+                    return
+
+    return Response(
+        admission.ReleaseOnClose(stream(version), "events"),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _cached_live_metrics():
+    """Degraded stream-chunk answer: the session's last metrics, and a hint to back off."""
+    data = request.get_json(silent=True) or {}
+    session_id = data.get("session_id")
+    metrics = latest_metrics(str(session_id)) if session_id else {}
+    return {**metrics, "slow_down": True}
 
 
 @bp.route("/recordings/stream-chunk", methods=["POST"])
 @require_auth
+@admit("live", degraded=_cached_live_metrics)
 def stream_chunk():
-    """Send an audio chunk for live metrics. Body: session_id, sequence_index, audio_base64, duration_seconds (optional)."""
+    """
+    Send an audio chunk for live metrics. Body: session_id, sequence_index, audio_base64, duration_seconds (optional),
+    recording_key (optional; the Idempotency-Key the recording will be finalized with).
+    Chunks with a sequence_index are also spooled, per recording_key, for finalize's assemble_from_stream mode.
+    """
     user_id = str(g.current_user.id)
     session = db.get_current_session(user_id)
     if not session:
@@ -124,52 +210,207 @@ def stream_chunk():
     except Exception:
         return jsonify({"error": "Invalid audio_base64"}), 400
     duration_sec = float(data.get("duration_seconds", 3.0))
-    db.update_session_status(session_id, "recording")
-    append_chunk(session_id, audio_bytes, duration_sec)
-    metrics = process_window(session_id)
+    try:
+        sequence_index = int(data["sequence_index"]) if data.get("sequence_index") is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid sequence_index"}), 400
+    if sequence_index is not None:
+        # Keep every chunk so finalize can assemble the recording without a full re-upload
+        try:
+            if not data.get("recording_key") and sequence_index == 0:
+                # No recording key: chunk 0 is the only sign that a new recording started
+                audio_spool.reset_attempt(session_id)
+            audio_spool.write_chunk(session_id, sequence_index, audio_bytes, data.get("recording_key"))
+        except (OSError, ValueError):
+            pass  # finalize reports it as missing and the client re-sends it
+    if session.get("status") != "recording":
+        db.update_session_status(session_id, "recording")
+        homework_view.update_session(session_id, status="recording")
+    append_chunk(session_id, audio_bytes, duration_sec, sequence_index)
+    # Returns the latest finished metrics right away; transcription runs coalesced in the background
+    exercise = session.get("exercises_pool") or {}
+    metrics = request_metrics(session_id, session.get("recommended_exercise_id"), exercise.get("scoring_version"))
     return jsonify(metrics)
 
 
 @bp.route("/recordings/finalize", methods=["POST"])
 @require_auth
+@admit("finalize")
 def finalize():
-    """End recording: send full audio in body (binary or base64). Create recording row, run job, return report when done."""
+    """
+    End recording: send full audio in body (binary or base64). Create recording row, run job, return report when done.
+    Or assemble from stream: JSON {assemble_from_stream: true, total_chunks, duration_seconds,
+    chunks: [{sequence_index, audio_base64}] (tail and/or previously missing chunks)}; answers 409 with
+    "missing" sequence numbers if the spool has gaps. Chunks are read from the spool of the recording whose
+    recording_key equals the Idempotency-Key.
+    Idempotent: keyed by the Idempotency-Key header, else by session id + audio hash. A duplicate waits for the
+    in-flight attempt or gets the stored result; it never transcribes again.
+    """
     user_id = str(g.current_user.id)
-    session = db.get_current_session(user_id)
-    if not session:
-        return jsonify({"error": "No session"}), 400
-    if session.get("status") not in ("not_started", "recording"):
-        return jsonify({"error": "Session not in recordable state"}), 400
 
     # Accept binary body or JSON with base64 audio + duration_seconds
     content_type = request.content_type or ""
     if "application/json" in content_type:
-        data = request.get_json()
-        import base64
-        b64 = data.get("audio_base64")
+        data = request.get_json() or {}
         duration = float(data.get("duration_seconds", 0))
-        if not b64:
-            return jsonify({"error": "audio_base64 required"}), 400
-        audio_bytes = base64.b64decode(b64)
+        if data.get("assemble_from_stream"):
+            audio_bytes, error = _assemble_from_stream(user_id, data)
+            if error:
+                return error
+        else:
+            b64 = data.get("audio_base64")
+            if not b64:
+                return jsonify({"error": "audio_base64 required"}), 400
+            audio_bytes = base64.b64decode(b64)
     else:
         audio_bytes = request.get_data()
         duration = float(request.headers.get("X-Duration-Seconds", 0))
         if not audio_bytes:
             return jsonify({"error": "Audio body required"}), 400
 
-    db.update_session_status(session["id"], "recording")  # mark as was recording
-    recording = db.create_recording(session["id"])
-    session_id = session["id"]
+    idempotency_key = request.headers.get("Idempotency-Key") or None
+    audio_sha256 = hashlib.sha256(audio_bytes).hexdigest()
+    ctx = db.begin_finalize(user_id, idempotency_key=idempotency_key, audio_sha256=audio_sha256)
+    if ctx.get("error") == "no_session":
+        return jsonify({"error": "No session"}), 400
+    if ctx.get("error"):
+        return jsonify({"error": "Session not in recordable state"}), 400
+    if ctx.get("duplicate"):
+        # Same key (or same session + audio) already finalized or in flight: no second transcription
+        return _duplicate_finalize_response(ctx)
+    session_id = ctx["session_id"]
+    homework_view.update_session(session_id, status="processing")
+    session_events.publish(session_id, "processing")
+    starting_metric = ctx.get("starting_metric")
+    if starting_metric is None:
+        starting_metric = current_app.config.get("DEFAULT_STARTING_METRIC", 100)
+    params = {
+        "duration_seconds": duration,
+        "starting_metric": starting_metric,
+        "exercise_id": ctx.get("exercise_id"),
+        "scoring_version": ctx.get("scoring_version"),
+    }
     try:
-        result = process_recording_finalize(session_id, audio_bytes, duration)
-        return jsonify({
-            "step": "report",
-            "score": result["score"],
-            "summary": result["summary"],
-            "coach_reminder": "Your coach will contact you within 24 hours.",
-        })
+        # Normalize once, before archiving: the archive, the journal and every stage get the 16 kHz mono Opus
+        audio_bytes, params["audio_filename"] = normalize_audio(audio_bytes)
+        # Journal the job with its archived audio so the sweeper can resume it if this worker dies
+        try:
+            audio_ref = audio_spool.archive(session_id, audio_bytes)
+        except (OSError, ValueError):
+            audio_ref = None
+        db.journal_finalize_start(ctx["idempotency_key"], user_id, audio_ref, params)
+        result = process_recording_finalize(
+            session_id,
+            audio_bytes,
+            duration,
+            recording_id=ctx["recording_id"],
+            starting_metric=starting_metric,
+            exercise_id=ctx.get("exercise_id"),
+            scoring_version=ctx.get("scoring_version"),
+            journal_key=ctx["idempotency_key"],
+            audio_filename=params["audio_filename"],
+        )
     except Exception as e:
-        db.update_session_status(session_id, "not_started")
+        # The pipeline raises only before the report commit (see process_recording_finalize): back to recording
+        # so the student can resubmit; a failed key is replaced on the next attempt
+        _roll_back_finalize(ctx["idempotency_key"], session_id)
+        session_events.publish(session_id, "failed", {"error": str(e)})
         return jsonify({"error": str(e)}), 500
     finally:
         clear_buffer(session_id)
+    # The report is written and the session completed: bookkeeping failures from here on must not undo that
+    payload = finalize_payload(result)
+    _finish_finalize_bookkeeping(ctx["idempotency_key"], session_id, payload)
+    return jsonify(payload)
+
+
+FINALIZE_BOOKKEEPING_ATTEMPTS = 3
+
+
+def _roll_back_finalize(idempotency_key, session_id):
+    """Fail the journal row and reopen the session. Errors here are logged so the pipeline's error is the one returned."""
+    try:
+        db.finish_finalize_request(idempotency_key, "failed")
+    except Exception:
+        current_app.logger.exception("finalize %s: could not mark journal failed", idempotency_key)
+    try:
+        db.update_session_status(session_id, "recording")
+    except Exception:
+        # Left in processing: the sweeper resumes or gives up the job once its heartbeat goes stale
+        current_app.logger.exception("finalize %s: could not reopen session", idempotency_key)
+    homework_view.update_session(session_id, status="recording")
+
+
+def _finish_finalize_bookkeeping(idempotency_key, session_id, payload):
+    """
+    Mark the journal row completed (retried) and drop the spool. If the row can't be updated it stays
+    in_progress, and the finalize sweeper finishes it from the existing report once its heartbeat goes stale.
+    """
+    for attempt in range(FINALIZE_BOOKKEEPING_ATTEMPTS):
+        try:
+            db.finish_finalize_request(idempotency_key, "completed", payload)
+            break
+        except Exception:
+            if attempt == FINALIZE_BOOKKEEPING_ATTEMPTS - 1:
+                current_app.logger.exception("finalize %s: could not mark journal completed", idempotency_key)
+            else:
+                time.sleep(0.2 * (attempt + 1))
+    try:
+        audio_spool.discard(session_id)
+    except Exception:
+        current_app.logger.exception("finalize %s: could not discard spool", idempotency_key)
+
+
+FINALIZE_DUPLICATE_WAIT_SEC = 100.0  # stay under the gunicorn worker timeout
+
+
+def _assemble_from_stream(user_id, data):
+    """Build the full recording from spooled stream chunks. Returns (audio_bytes, None) or (None, error response)."""
+    session = db.get_current_session(user_id)
+    if not session:
+        return None, (jsonify({"error": "No session"}), 400)
+    if session.get("status") not in ("not_started", "recording"):
+        # Already finalized or in flight: nothing to assemble, let the idempotency check answer
+        return b"", None
+    session_id = session["id"]
+    total = int(data.get("total_chunks") or 0)
+    if total <= 0:
+        return None, (jsonify({"error": "total_chunks required"}), 400)
+    # Chunks were spooled under the recording's key (sent as recording_key with each stream chunk)
+    attempt = request.headers.get("Idempotency-Key") or None
+    try:
+        audio_spool.attempt_dir(session_id, attempt)
+    except ValueError:
+        return None, (jsonify({"error": "Invalid Idempotency-Key"}), 400)
+    try:
+        for chunk in data.get("chunks") or []:
+            audio_spool.write_chunk(session_id, int(chunk["sequence_index"]), base64.b64decode(chunk["audio_base64"]), attempt)
+    except (KeyError, TypeError, ValueError):
+        return None, (jsonify({"error": "Invalid chunks"}), 400)
+    missing = audio_spool.missing_chunks(session_id, total, attempt)
+    if missing:
+        return None, (jsonify({"error": "Missing chunks", "missing": missing}), 409)
+    return audio_spool.assemble(session_id, total, attempt), None
+
+
+def _duplicate_finalize_response(ctx):
+    """Wait for an in-flight finalize with the same key, or return the stored result of a completed one."""
+    key = ctx["idempotency_key"]
+    session_id = ctx["session_id"]
+    status, result = ctx.get("status"), ctx.get("result")
+    deadline = time.monotonic() + FINALIZE_DUPLICATE_WAIT_SEC
+    while status == "in_progress":
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return jsonify({"step": "processing", "session_id": session_id}), 202
+        # Woken early when the original request runs in this process; otherwise re-check the DB periodically
+        _wait_for_terminal(session_id, min(2.0, remaining))
+        row = db.get_finalize_request(key)
+        status, result = (row.get("status"), row.get("result")) if row else ("failed", None)
+    if status != "completed" or not result:
+        return jsonify({"error": "Previous finalize attempt failed; please resubmit"}), 409
+    if result.get("summary_pending"):
+        report_row = db.get_report_by_session(session_id)
+        if report_row and report_row.get("summary") is not None:
+            result = {**result, "summary": report_row["summary"], "summary_pending": False}
+    return jsonify({**result, "duplicate": True})
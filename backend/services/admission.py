@@ -0,0 +1,186 @@
+"""
+Admission control and load shedding, per worker process.
+
+Route classes have global in-flight caps: live (stream-chunk), finalize, read (status/report), events (SSE),
+and poll (status/report requests parked in a ?wait long-poll; they give their read slot back while waiting).
+stream-chunk also has a per-user token bucket. Live traffic degrades first: its effective cap shrinks as
+finalize load rises, so finalize and report routes keep their capacity under overload.
+Rejections are 429 (per-user rate) or 503 (capacity), both with Retry-After.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, jsonify
+
+_inflight = {"live": 0, "finalize": 0, "read": 0, "events": 0, "poll": 0}
+_lock = threading.Lock()
+
+# Per-user token buckets for stream-chunk: { user_id: [tokens, last_refill_monotonic] }
+_buckets: dict = {}
+MAX_BUCKETS = 10000
+
+_CAP_KEYS = {
+    "live": ("ADMISSION_MAX_LIVE", 12),
+    "finalize": ("ADMISSION_MAX_FINALIZE", 6),
+    "read": ("ADMISSION_MAX_READ", 12),
+    "events": ("ADMISSION_MAX_EVENTS", 50),
+    "poll": ("ADMISSION_MAX_POLL", 50),
+}
+_RETRY_AFTER_SEC = {"live": 3, "finalize": 5, "read": 1, "events": 5}
+
+_stats = {
+    "rate_limited": 0, "shed_live": 0, "rejected_finalize": 0, "rejected_read": 0, "rejected_events": 0,
+    "poll_declined": 0,
+}
+
+
+def _cap(route_class: str) -> int:
+    key, default = _CAP_KEYS[route_class]
+    return int(current_app.config.get(key, default))
+
+
+def _live_cap() -> int:
+    """Live cap shrinks to half as finalize approaches its own cap."""
+    finalize_load = min(1.0, _inflight["finalize"] / max(1, _cap("finalize")))
+    return max(1, int(_cap("live") * (1.0 - 0.5 * finalize_load)))
+
+
+def _take_token(user_id: str):
+    """Return 0 if a token was taken, else seconds until the next one."""
+    rate = float(current_app.config.get("ADMISSION_LIVE_RATE", 1.0))
+    burst = float(current_app.config.get("ADMISSION_LIVE_BURST", 5))
+    now = time.monotonic()
+    with _lock:
+        if len(_buckets) > MAX_BUCKETS:
+            # Drop idle buckets (refilled to full) to bound memory
+            for uid in [u for u, (t, ts) in _buckets.items() if t + (now - ts) * rate >= burst]:
+                del _buckets[uid]
+        tokens, last = _buckets.get(user_id, (burst, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+        if tokens >= 1.0:
+            _buckets[user_id] = [tokens - 1.0, now]
+            return 0.0
+        _buckets[user_id] = [tokens, now]
+        return (1.0 - tokens) / rate if rate > 0 else 60.0
+
+
+def try_enter(route_class: str) -> bool:
+    with _lock:
+        cap = _live_cap() if route_class == "live" else _cap(route_class)
+        if _inflight[route_class] >= cap:
+            return False
+        _inflight[route_class] += 1
+        return True
+
+
+def leave(route_class: str):
+    with _lock:
+        _inflight[route_class] -= 1
+
+
+def _reject(status: int, retry_after: float, body: dict):
+    resp = jsonify(body)
+    resp.status_code = status
+    resp.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return resp
+
+
+def busy_response(route_class: str, extra: dict = None):
+    """503 + Retry-After for a request turned away by its route-class cap."""
+    retry = _RETRY_AFTER_SEC[route_class]
+    with _lock:
+        _stats["shed_live" if route_class == "live" else f"rejected_{route_class}"] += 1
+    return _reject(503, retry, {"error": "Server busy; retry later", "retry_after": retry, **(extra or {})})
+
+
+class ReleaseOnClose:
+    """Wrap a streamed response body so its in-flight slot is released when the server closes it
+    (WSGI always calls close(), even if the client disconnects before the first chunk)."""
+
+    def __init__(self, iterable, route_class: str):
+        self._it = iter(iterable)
+        self._route_class = route_class
+        self._released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._it)
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            leave(self._route_class)
+        close = getattr(self._it, "close", None)
+        if close:
+            close()
+
+
+@contextmanager
+def long_poll(route_class: str = "read"):
+    """
+    Around a long-poll wait: moves the request's route_class slot to the poll class for the wait and takes it
+    back after, so parked pollers never use up the read cap. Yields False when the poll cap is full; the
+    caller then answers right away instead of waiting.
+    """
+    if g.get("admitted_class") != route_class:
+        yield True  # admission disabled for this request
+        return
+    with _lock:
+        moved = _inflight["poll"] < _cap("poll")
+        if moved:
+            _inflight[route_class] -= 1
+            _inflight["poll"] += 1
+        else:
+            _stats["poll_declined"] += 1
+    try:
+        yield moved
+    finally:
+        if moved:
+            with _lock:
+                # Back over the cap briefly is fine: the request only builds its response from here
+                _inflight["poll"] -= 1
+                _inflight[route_class] += 1
+
+
+def get_stats() -> dict:
+    with _lock:
+        return {"inflight": dict(_inflight), **_stats}
+
+
+def admit(route_class: str, degraded=None):
+    """
+    Decorator (place under require_auth). degraded: optional callable returning extra body fields for a shed
+    live request, e.g. the last cached metrics, so the client can keep displaying something.
+    A request counts as in flight until the view returns; streamed bodies (SSE) use try_enter/leave themselves.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            if not current_app.config.get("ADMISSION_ENABLED", True):
+                return f(*args, **kwargs)
+            if route_class == "live":
+                user = getattr(g, "current_user", None)
+                wait = _take_token(str(user.id)) if user else 0.0
+                if wait > 0:
+                    with _lock:
+                        _stats["rate_limited"] += 1
+                    return _reject(429, wait, {"error": "Too many chunks; slow down", "retry_after": math.ceil(wait)})
+            if not try_enter(route_class):
+                extra = None
+                if degraded is not None:
+                    try:
+                        extra = degraded()
+                    except Exception:
+                        extra = None
+                return busy_response(route_class, extra)
+            g.admitted_class = route_class
+            try:
+                return f(*args, **kwargs)
+            finally:
+                leave(route_class)
+        return wrapped
+    return decorator
@@ -0,0 +1,86 @@
+"""
+Normalize uploaded audio before transcription: 16 kHz mono Opus at a low speech bitrate.
+MediaRecorder output varies (48 kHz, stereo, 64-128 kbps); Whisper only needs 16 kHz mono speech,
+so smaller uploads mean faster transcription. Transcoding streams frame by frame through PyAV and runs
+on a bounded process pool so request threads only wait, they don't burn CPU or hold the GIL.
+Falls back to the original bytes if PyAV is missing, transcoding fails, or the result isn't smaller.
+Pool processes are spawned, not forked: forking a threaded (gthread) or monkey-patched (gevent) worker can copy
+a lock held by another thread and deadlock the child.
+"""
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+
+SAMPLE_RATE = 16000
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def transcode_to_speech_opus(audio_bytes: bytes, bitrate: int = 24000) -> bytes:
+    """Decode any input PyAV understands and re-encode as 16 kHz mono Opus in Ogg. Runs in a worker process."""
+    import av
+
+    inp = av.open(io.BytesIO(audio_bytes))
+    out_buf = io.BytesIO()
+    out = av.open(out_buf, mode="w", format="ogg")
+    stream = out.add_stream("libopus", rate=SAMPLE_RATE)
+    stream.layout = "mono"
+    stream.bit_rate = bitrate
+    resampler = av.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+    fifo = av.AudioFifo()
+
+    def _drain(final=False):
+        frame_size = stream.codec_context.frame_size or 320
+        while fifo.samples >= frame_size or (final and fifo.samples):
+            frame = fifo.read(min(frame_size, fifo.samples))
+            for packet in stream.encode(frame):
+                out.mux(packet)
+
+    try:
+        for frame in inp.decode(audio=0):
+            frame.pts = None
+            for resampled in resampler.resample(frame):
+                fifo.write(resampled)
+            _drain()
+        for resampled in resampler.resample(None):
+            fifo.write(resampled)
+        _drain(final=True)
+        for packet in stream.encode(None):
+            out.mux(packet)
+    finally:
+        out.close()
+        inp.close()
+    return out_buf.getvalue()
+
+
+def _get_pool(workers: int):
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def normalize_audio(audio_bytes: bytes, filename: str = "audio.webm"):
+    """Return (bytes, filename) to send to transcription: normalized Opus if it helps, else the input."""
+    cfg = current_app.config
+    if not cfg.get("AUDIO_NORMALIZE_ENABLED", True):
+        return audio_bytes, filename
+    try:
+        import av  # noqa: F401  (only to know whether the pool can do anything)
+    except ImportError:
+        return audio_bytes, filename
+    try:
+        fut = _get_pool(cfg.get("AUDIO_NORMALIZE_WORKERS", 2)).submit(
+            transcode_to_speech_opus, audio_bytes, cfg.get("AUDIO_NORMALIZE_BITRATE", 24000)
+        )
+        out = fut.result(timeout=cfg.get("AUDIO_NORMALIZE_TIMEOUT_SEC", 30))
+    except Exception:
+        return audio_bytes, filename
+    if not out or len(out) >= len(audio_bytes):
+        return audio_bytes, filename
+    return out, "audio.ogg"
@@ -0,0 +1,151 @@
+"""
+Per-session audio spool on local disk: streamed chunks are kept by sequence_index so finalize can
+assemble the full recording server-side instead of the client re-uploading it.
+Layout: <SPOOL_DIR>/<session_id>/<attempt>/<sequence_index:06d>.chunk (written atomically; re-sends overwrite).
+<attempt> is the client's per-recording key (the finalize Idempotency-Key), so a re-recording after a failed
+finalize never picks up the previous attempt's chunks; starting a new attempt drops the older ones.
+MediaRecorder timeslices concatenated in order form a valid WebM (only chunk 0 carries the header).
+Finalize also archives the full recording as <session_id>/final.audio so the sweeper can re-run a finalize
+whose worker died; point SPOOL_DIR at a persistent volume for that to survive a container restart.
+A successful finalize discards its session's spool; the finalize sweeper drops spools of given-up jobs and,
+via purge_stale, any spool untouched for SPOOL_TTL_SEC (abandoned or never-finalized recordings).
+"""
+import os
+import re
+import shutil
+import tempfile
+import time
+from flask import current_app
+
+_CHUNK_RE = re.compile(r"^(\d{6})\.chunk$")
+_ATTEMPT_RE = re.compile(r"[0-9A-Za-z_-]{1,64}")
+DEFAULT_ATTEMPT = "default"  # clients that send no recording key
+
+
+ARCHIVE_NAME = "final.audio"
+
+
+def _root():
+    return current_app.config.get("SPOOL_DIR") or os.path.join(tempfile.gettempdir(), "willab_spool")
+
+
+def spool_dir(session_id: str) -> str:
+    # session ids are UUIDs; refuse anything that could escape the spool root
+    sid = str(session_id)
+    if not re.fullmatch(r"[0-9a-fA-F-]{1,64}", sid):
+        raise ValueError("Invalid session id")
+    return os.path.join(_root(), sid)
+
+
+def attempt_dir(session_id: str, attempt: str = None) -> str:
+    attempt = attempt or DEFAULT_ATTEMPT
+    if not _ATTEMPT_RE.fullmatch(attempt):
+        raise ValueError("Invalid recording key")
+    return os.path.join(spool_dir(session_id), attempt)
+
+
+def _write_atomic(d: str, name: str, data: bytes) -> str:
+    os.makedirs(d, exist_ok=True)
+    final = os.path.join(d, name)
+    fd, tmp = tempfile.mkstemp(dir=d, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, final)
+    return final
+
+
+def write_chunk(session_id: str, sequence_index: int, audio_bytes: bytes, attempt: str = None):
+    d = attempt_dir(session_id, attempt)
+    if not os.path.isdir(d):
+        # First chunk of a new recording attempt: earlier attempts' chunks can never be finalized now
+        root = spool_dir(session_id)
+        if os.path.isdir(root):
+            for name in os.listdir(root):
+                if os.path.isdir(os.path.join(root, name)):
+                    shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    _write_atomic(d, f"{int(sequence_index):06d}.chunk", audio_bytes)
+
+
+def reset_attempt(session_id: str, attempt: str = None):
+    """Drop an attempt's chunks (stream-chunk calls it on chunk 0 from clients that send no recording key)."""
+    shutil.rmtree(attempt_dir(session_id, attempt), ignore_errors=True)
+
+
+def sequence_indexes(session_id: str, attempt: str = None):
+    d = attempt_dir(session_id, attempt)
+    if not os.path.isdir(d):
+        return []
+    out = []
+    for name in os.listdir(d):
+        m = _CHUNK_RE.match(name)
+        if m:
+            out.append(int(m.group(1)))
+    return sorted(out)
+
+
+def missing_chunks(session_id: str, total_chunks: int = None, attempt: str = None):
+    """Sequence numbers absent from 0..total_chunks-1 (or 0..highest seen if total unknown)."""
+    have = set(sequence_indexes(session_id, attempt))
+    upper = total_chunks if total_chunks is not None else (max(have) + 1 if have else 0)
+    return [i for i in range(upper) if i not in have]
+
+
+def assemble(session_id: str, total_chunks: int, attempt: str = None) -> bytes:
+    """Concatenate chunks 0..total_chunks-1 in order. Caller checks missing_chunks first."""
+    d = attempt_dir(session_id, attempt)
+    parts = []
+    for i in range(total_chunks):
+        with open(os.path.join(d, f"{i:06d}.chunk"), "rb") as f:
+            parts.append(f.read())
+    return b"".join(parts)
+
+
+def archive(session_id: str, audio_bytes: bytes) -> str:
+    """Keep the full finalize audio until the finalize completes. Returns the journal audio_ref."""
+    _write_atomic(spool_dir(session_id), ARCHIVE_NAME, audio_bytes)
+    return f"spool:{session_id}/{ARCHIVE_NAME}"
+
+
+def load_archive(session_id: str):
+    """The archived finalize audio, or None if it is gone."""
+    try:
+        with open(os.path.join(spool_dir(session_id), ARCHIVE_NAME), "rb") as f:
+            return f.read()
+    except (OSError, ValueError):
+        return None
+
+
+def discard(session_id: str):
+    shutil.rmtree(spool_dir(session_id), ignore_errors=True)
+
+
+def _last_modified(path: str) -> float:
+    """Newest mtime of a session spool dir and its attempt dirs (writing a chunk or the archive bumps these)."""
+    newest = os.stat(path).st_mtime
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                newest = max(newest, entry.stat(follow_symlinks=False).st_mtime)
+    return newest
+
+
+def purge_stale(max_age_sec: float) -> int:
+    """Delete session spools not written to for max_age_sec. Returns how many were removed."""
+    root = _root()
+    cutoff = time.time() - max_age_sec
+    removed = 0
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return 0
+    for entry in entries:
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        try:
+            if _last_modified(entry.path) >= cutoff:
+                continue
+        except OSError:
+            continue  # removed concurrently (finalize or another worker's sweep)
+        shutil.rmtree(entry.path, ignore_errors=True)
+        removed += 1
+    return removed
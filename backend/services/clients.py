@@ -0,0 +1,41 @@
+"""
+SDK clients, constructed lazily and cached per process. The heavy SDK imports (supabase, openai, resend)
+happen on first use instead of at app import, so a new worker can serve /health immediately.
+preload() imports them up front; gunicorn calls it in the master with preload_app so forked workers share it.
+"""
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4)
+def supabase_client(url: str, key: str):
+    from supabase import create_client
+    return create_client(url, key)
+
+
+@lru_cache(maxsize=4)
+def openai_client(api_key: str):
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+def resend_sdk(api_key: str):
+    import resend
+    resend.api_key = api_key
+    return resend
+
+
+def preload():
+    """Import heavy SDKs and optional native modules without opening any connections (safe before fork)."""
+    import importlib
+
+    for name in ("supabase", "openai", "resend", "numpy", "av"):
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def reset():
+    """Drop cached clients (after fork, so workers never share a parent's connection pool)."""
+    supabase_client.cache_clear()
+    openai_client.cache_clear()
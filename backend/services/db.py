@@ -1,9 +1,10 @@
 """
 Supabase database access for the simplified homework flow.
 """
-from supabase import create_client
+from datetime import datetime, timezone
 from flask import current_app
 import os
+from services.clients import supabase_client
 
 
 def get_supabase():
@@ -11,7 +12,7 @@ def get_supabase():
     key = os.environ.get("SUPABASE_SERVICE_KEY") or current_app.config.get("SUPABASE_SERVICE_KEY")
     if not url or not key:
         raise RuntimeError("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set")
-    return create_client(url, key)
+    return supabase_client(url, key)
 
 
 # ---- Homework sessions ----
@@ -21,7 +22,7 @@ def get_current_session(user_id: str):
     sb = get_supabase()
     r = (
         sb.table("homework_sessions_v2")
-        .select("*, exercises_pool(name, description, default_starting_metric)")
+        .select("*, exercises_pool(name, description, default_starting_metric, scoring_version)")
         .eq("user_id", user_id)
         .order("created_at", desc=True)
         .limit(1)
@@ -58,43 +59,130 @@ def update_session_status(session_id: str, status: str):
     sb.table("homework_sessions_v2").update({"status": status}).eq("id", session_id).execute()
 
 
-# ---- Recordings ----
+# ---- Session transitions (Postgres RPC: reads + writes in one round trip) ----
 
-def create_recording(session_id: str, storage_path: str = None):
+def start_or_resume_session(user_id: str, recommended_exercise_id: str = None):
+    """Resume latest not_started/recording session (set to recording) or create one. Returns session_id, status, exercise."""
     sb = get_supabase()
-    payload = {"session_id": session_id}
-    if storage_path:
-        payload["storage_path"] = storage_path
-    r = sb.table("recordings_v2").insert(payload).select().execute()
+    r = sb.rpc("hw_start_or_resume", {
+        "p_user_id": user_id,
+        "p_recommended_exercise_id": recommended_exercise_id,
+    }).execute()
+    return r.data
+
+
+def begin_finalize(user_id: str, storage_path: str = None, idempotency_key: str = None, audio_sha256: str = None):
+    """
+    Lock latest session, move to processing, create recording row and finalize_requests_v2 entry.
+    Returns session_id, recording_id, starting_metric, idempotency_key; or duplicate=True with the
+    existing request's status/result; or error.
+    """
+    sb = get_supabase()
+    r = sb.rpc("hw_begin_finalize", {
+        "p_user_id": user_id,
+        "p_storage_path": storage_path,
+        "p_idempotency_key": idempotency_key,
+        "p_audio_sha256": audio_sha256,
+    }).execute()
+    return r.data
+
+
+def get_finalize_request(idempotency_key: str):
+    sb = get_supabase()
+    r = sb.table("finalize_requests_v2").select("*").eq("idempotency_key", idempotency_key).execute()
     return r.data[0] if r.data else None
 
 
-def update_recording(
-    recording_id: str,
+def finish_finalize_request(idempotency_key: str, status: str, result: dict = None):
+    """Mark a finalize request completed (with its response payload) or failed."""
+    sb = get_supabase()
+    sb.table("finalize_requests_v2").update({"status": status, "result": result}).eq(
+        "idempotency_key", idempotency_key
+    ).execute()
+
+
+def journal_finalize_start(idempotency_key: str, user_id: str, audio_ref: str = None, params: dict = None):
+    """Record where the finalize audio is archived and what the pipeline needs to re-run it (journal stage 'started')."""
+    sb = get_supabase()
+    sb.table("finalize_requests_v2").update({
+        "user_id": user_id,
+        "audio_ref": audio_ref,
+        "params": params or {},
+    }).eq("idempotency_key", idempotency_key).execute()
+
+
+def checkpoint_finalize(idempotency_key: str, stage: str, checkpoint: dict = None):
+    """Journal a completed finalize stage (transcribed / scored / reported / summarized) and refresh its heartbeat."""
+    sb = get_supabase()
+    payload = {"stage": stage, "heartbeat_at": datetime.now(timezone.utc).isoformat()}
+    if checkpoint is not None:
+        payload["checkpoint"] = checkpoint
+    sb.table("finalize_requests_v2").update(payload).eq("idempotency_key", idempotency_key).execute()
+
+
+def note_finalize_error(idempotency_key: str, error: str):
+    sb = get_supabase()
+    sb.table("finalize_requests_v2").update({"last_error": error[:500]}).eq("idempotency_key", idempotency_key).execute()
+
+
+def claim_stuck_finalize(stale_sec: int, max_attempts: int, limit: int):
+    """Claim stale journal rows for the sweeper. Returns {claimed: [rows], abandoned: [{idempotency_key, session_id, ...}]}."""
+    sb = get_supabase()
+    r = sb.rpc("hw_claim_stuck_finalize", {
+        "p_stale_sec": stale_sec,
+        "p_max_attempts": max_attempts,
+        "p_limit": limit,
+    }).execute()
+    return r.data or {"claimed": [], "abandoned": []}
+
+
+def complete_session_with_report(
+    session_id: str,
+    recording_id: str = None,
     transcript: str = None,
     wpm: float = None,
-    voice_strength: float = None,
-    filler_count: int = None,
+    filler_count: int = 0,
     starting_metric: int = None,
     score: float = None,
+    summary: str = None,
+    timeline: dict = None,
 ):
+    """Update recording metrics, insert report and mark session completed. Returns the report row.
+    summary=None leaves homework_reports_v2.summary NULL (summary still being generated)."""
     sb = get_supabase()
-    payload = {}
-    if transcript is not None:
-        payload["transcript"] = transcript
-    if wpm is not None:
-        payload["wpm"] = wpm
-    if voice_strength is not None:
-        payload["voice_strength"] = voice_strength
-    if filler_count is not None:
-        payload["filler_count"] = filler_count
-    if starting_metric is not None:
-        payload["starting_metric"] = starting_metric
-    if score is not None:
-        payload["score"] = score
-    if not payload:
-        return
-    sb.table("recordings_v2").update(payload).eq("id", recording_id).execute()
+    r = sb.rpc("hw_complete_with_report", {
+        "p_session_id": session_id,
+        "p_recording_id": recording_id,
+        "p_transcript": transcript,
+        "p_wpm": wpm,
+        "p_filler_count": filler_count,
+        "p_starting_metric": starting_metric,
+        "p_score": score,
+        "p_summary": summary,
+        "p_timeline": timeline,
+    }).execute()
+    return r.data
+
+
+def submit_report_feedback(report_id: str, coach_feedback_text: str):
+    """Save coach feedback. Returns id, session_id, user_id, score, summary (None if report not found)."""
+    sb = get_supabase()
+    r = sb.rpc("hw_submit_feedback", {
+        "p_report_id": report_id,
+        "p_coach_feedback_text": coach_feedback_text,
+    }).execute()
+    return r.data
+
+
+# ---- Recordings ----
+
+def create_recording(session_id: str, storage_path: str = None):
+    sb = get_supabase()
+    payload = {"session_id": session_id}
+    if storage_path:
+        payload["storage_path"] = storage_path
+    r = sb.table("recordings_v2").insert(payload).select().execute()
+    return r.data[0] if r.data else None
 
 
 def get_recording_by_session(session_id: str):
@@ -112,28 +200,9 @@ def get_recording_by_session(session_id: str):
 
 # ---- Reports ----
 
-def create_report(session_id: str, recording_id: str = None, summary: str = None, score: float = None, starting_metric: int = None, filler_count: int = 0):
+def update_report_summary(report_id: str, summary: str):
     sb = get_supabase()
-    payload = {
-        "session_id": session_id,
-        "summary": summary or "",
-        "score": score,
-        "starting_metric": starting_metric,
-        "filler_count": filler_count,
-    }
-    if recording_id:
-        payload["recording_id"] = recording_id
-    r = sb.table("homework_reports_v2").insert(payload).select().execute()
-    return r.data[0] if r.data else None
-
-
-def update_report_feedback(report_id: str, coach_feedback_text: str):
-    sb = get_supabase()
-    from datetime import datetime, timezone
-    sb.table("homework_reports_v2").update({
-        "coach_feedback_text": coach_feedback_text,
-        "coach_feedback_sent_at": datetime.now(tz=timezone.utc).isoformat(),
-    }).eq("id", report_id).execute()
+    sb.table("homework_reports_v2").update({"summary": summary}).eq("id", report_id).execute()
 
 
 def get_report_by_session(session_id: str):
@@ -146,7 +215,7 @@ def get_report_by_id(report_id: str):
     sb = get_supabase()
     r = (
         sb.table("homework_reports_v2")
-        .select("*, homework_sessions_v2(user_id)")
+        .select("*, homework_sessions_v2(user_id), recordings_v2(wpm, timeline)")
         .eq("id", report_id)
         .single()
         .execute()
@@ -266,17 +335,29 @@ def get_exercise_by_id(exercise_id: str):
     return r.data
 
 
-def create_exercise(name: str, description: str = None, default_starting_metric: int = 100):
+# Scoring-profile columns an admin can set; a key given with None clears that override
+SCORING_FIELDS = ("filler_words", "points_per_filler", "target_wpm_min", "target_wpm_max")
+
+
+def create_exercise(name: str, description: str = None, default_starting_metric: int = 100, scoring: dict = None):
     sb = get_supabase()
     r = sb.table("exercises_pool").insert({
         "name": name,
         "description": description,
         "default_starting_metric": default_starting_metric,
+        **{k: v for k, v in (scoring or {}).items() if k in SCORING_FIELDS},
     }).select().execute()
     return r.data[0] if r.data else None
 
 
-def update_exercise(exercise_id: str, name: str = None, description: str = None, default_starting_metric: int = None):
+def update_exercise(
+    exercise_id: str,
+    name: str = None,
+    description: str = None,
+    default_starting_metric: int = None,
+    scoring: dict = None,
+):
+    """scoring: subset of SCORING_FIELDS to set (values may be None to clear an override)."""
     sb = get_supabase()
     payload = {}
     if name is not None:
@@ -285,6 +366,7 @@ def update_exercise(exercise_id: str, name: str = None, description: str = None,
         payload["description"] = description
     if default_starting_metric is not None:
         payload["default_starting_metric"] = default_starting_metric
+    payload.update({k: v for k, v in (scoring or {}).items() if k in SCORING_FIELDS})
     if payload:
         sb.table("exercises_pool").update(payload).eq("id", exercise_id).execute()
 
@@ -340,3 +422,167 @@ def get_starting_metric_for_user_and_exercise(user_id: str, exercise_id: str = N
             return ex["default_starting_metric"]
     from flask import current_app
     return current_app.config.get("DEFAULT_STARTING_METRIC", 100)
+
+
+# ---- Bulk re-scoring (flask rescore) ----
+
+def count_scored_recordings():
+    sb = get_supabase()
+    r = sb.table("recordings_v2").select("id", count="exact").not_.is_("transcript", "null").limit(1).execute()
+    return r.count or 0
+
+
+def list_recordings_for_rescore(after_id: str = None, limit: int = 500):
+    """One keyset page of recordings with a transcript, ordered by id (no OFFSET, so cost stays flat)."""
+    sb = get_supabase()
+    q = (
+        sb.table("recordings_v2")
+        .select("id, transcript, filler_count, starting_metric, score, homework_sessions_v2(user_id, recommended_exercise_id)")
+        .not_.is_("transcript", "null")
+        .order("id")
+        .limit(limit)
+    )
+    if after_id:
+        q = q.gt("id", after_id)
+    return q.execute().data or []
+
+
+def get_starting_metric_overrides(user_ids):
+    """{ user_id: starting_metric_override } for the given users (only those with an override)."""
+    if not user_ids:
+        return {}
+    sb = get_supabase()
+    r = (
+        sb.table("student_overrides_v2")
+        .select("user_id, starting_metric_override")
+        .in_("user_id", list(user_ids))
+        .not_.is_("starting_metric_override", "null")
+        .execute()
+    )
+    return {row["user_id"]: row["starting_metric_override"] for row in (r.data or [])}
+
+
+def apply_rescore_batch(rows):
+    """rows: [{recording_id, filler_count, starting_metric, score}]; updates recordings and their reports."""
+    if not rows:
+        return 0
+    sb = get_supabase()
+    r = sb.rpc("hw_rescore_batch", {"p_rows": rows}).execute()
+    return r.data or 0
+
+
+# ---- Admin: export (cursor-paged) ----
+
+EXPORT_SELECT = (
+    "id, created_at, score, starting_metric, filler_count, summary, coach_feedback_sent_at, "
+    "homework_sessions_v2!inner(user_id, recommended_exercise_id, exercises_pool(name)), "
+    "recordings_v2(wpm, voice_strength{transcript})"
+)
+
+
+def list_reports_for_export(
+    cursor=None,
+    limit: int = 500,
+    date_from: str = None,
+    date_to: str = None,
+    user_id: str = None,
+    exercise_id: str = None,
+    include_transcript: bool = False,
+):
+    """
+    One page of reports, newest first, with session and recording fields. cursor is the (created_at, id)
+    of the last row of the previous page; keyset paging on idx_homework_reports_v2_created_at_id.
+    The recording's transcript is only fetched with include_transcript.
+    """
+    sb = get_supabase()
+    q = sb.table("homework_reports_v2").select(EXPORT_SELECT.format(transcript=", transcript" if include_transcript else ""))
+    if date_from:
+        q = q.gte("created_at", date_from)
+    if date_to:
+        q = q.lt("created_at", date_to)
+    if user_id:
+        q = q.eq("homework_sessions_v2.user_id", user_id)
+    if exercise_id:
+        q = q.eq("homework_sessions_v2.recommended_exercise_id", exercise_id)
+    if cursor:
+        created_at, last_id = cursor
+        q = q.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{last_id})')
+    r = q.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+    return r.data or []
+
+
+# ---- Admin: coach feedback inbox ----
+
+INBOX_SELECT = "id, session_id, user_id, score, summary, created_at, homework_sessions_v2(recommended_exercise_id, exercises_pool(name))"
+
+
+def list_feedback_inbox(
+    cursor=None,
+    limit: int = 50,
+    user_id: str = None,
+    created_before: str = None,
+    created_after: str = None,
+):
+    """
+    One page of reports without coach feedback, oldest first. cursor is the (created_at, id) of the last row of
+    the previous page; keyset paging on the partial idx_homework_reports_v2_pending_feedback(_user) indexes.
+    """
+    sb = get_supabase()
+    q = sb.table("homework_reports_v2").select(INBOX_SELECT).is_("coach_feedback_sent_at", "null")
+    if user_id:
+        q = q.eq("user_id", user_id)
+    if created_before:
+        q = q.lt("created_at", created_before)
+    if created_after:
+        q = q.gte("created_at", created_after)
+    if cursor:
+        created_at, last_id = cursor
+        q = q.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{last_id})')
+    r = q.order("created_at").order("id").limit(limit).execute()
+    return r.data or []
+
+
+def get_feedback_pending_counts(limit: int = 200):
+    """Students with reports waiting for feedback (trigger-maintained counts), longest-waiting first."""
+    sb = get_supabase()
+    r = (
+        sb.table("feedback_pending_counts_v2")
+        .select("user_id, pending, oldest_pending_at")
+        .gt("pending", 0)
+        .order("oldest_pending_at")
+        .limit(limit)
+        .execute()
+    )
+    return r.data or []
+
+
+def get_feedback_pending_total() -> int:
+    """Reports waiting for feedback across all students (one aggregate over the trigger-maintained counts)."""
+    sb = get_supabase()
+    r = sb.rpc("hw_feedback_pending_total", {}).execute()
+    return r.data or 0
+
+
+# ---- Admin: transcript search ----
+
+def search_transcripts(query: str, user_id: str = None, exercise_id: str = None, limit: int = 20, cursor=None,
+                       order: str = "rank", candidates: int = 2000):
+    """
+    Transcript matches with highlighted snippets. order "rank": ranked among the `candidates` most recent
+    matches, cursor is the (rank, recording_id) of the last hit. order "recent": newest first, cursor is the
+    (created_at, recording_id) of the last hit.
+    """
+    sb = get_supabase()
+    after_key, after_id = cursor if cursor else (None, None)
+    r = sb.rpc("hw_search_transcripts", {
+        "p_query": query,
+        "p_user_id": user_id,
+        "p_exercise_id": exercise_id,
+        "p_limit": limit,
+        "p_after_rank": after_key if order == "rank" else None,
+        "p_after_id": after_id,
+        "p_order": order,
+        "p_after_created_at": after_key if order == "recent" else None,
+        "p_candidates": candidates,
+    }).execute()
+    return r.data or []
@@ -2,8 +2,8 @@
 Resend: homework assignment email and coach feedback email (with return link).
 """
 import os
-import resend
 from flask import current_app
+from services.clients import resend_sdk
 
 
 def _api_key():
@@ -24,7 +24,7 @@ def send_homework_assignment(
     homework_message: str = None,
 ):
     """Send email when coach assigns homework. Includes task_1, optional exercise, optional coach message, plus link to start."""
-    resend.api_key = _api_key()
+    resend = resend_sdk(_api_key())
     from_addr = current_app.config.get("EMAIL_FROM", "homework@willab.com")
     app_url = _app_url()
     body_lines = [f"Hi {student_name},"]
@@ -66,7 +66,7 @@ def send_coach_feedback(
     summary: str,
 ):
     """Send email with coach's written feedback and link back to app (step 0)."""
-    resend.api_key = _api_key()
+    resend = resend_sdk(_api_key())
     from_addr = current_app.config.get("EMAIL_FROM", "homework@willab.com")
     app_url = _app_url()
 
@@ -0,0 +1,110 @@
+"""
+Stuck-finalize sweeper: finds finalize journal rows (finalize_requests_v2) whose heartbeat is older than
+FINALIZE_STUCK_AFTER_SEC — the worker running them died — and resumes them from their last completed stage.
+Claims go through hw_claim_stuck_finalize (SKIP LOCKED), so every worker can run a sweeper safely.
+Each claim counts as an attempt; after FINALIZE_MAX_ATTEMPTS the job is given up and the session goes back
+to 'recording' so the student can resubmit (given-up jobs drop their audio spool). Each sweep also purges
+spools untouched for SPOOL_TTL_SEC. Runs as a daemon thread per worker (started from gunicorn's
+post_worker_init) and as a one-off command: `flask --app app sweep-finalize`.
+"""
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from services import audio_spool
+from services import db
+from services import homework_view
+from services import session_events
+from services.recording_1_job import FinalizeUnrecoverable, resume_finalize
+
+_thread = None
+_thread_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"sweeps": 0, "claimed": 0, "resumed": 0, "errors": 0, "abandoned": 0, "spools_purged": 0}
+
+
+def _count(key: str, n: int = 1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+def _give_up(job: dict, error: str):
+    """Fail the journal row, hand the session back to the student and drop its archived audio."""
+    db.note_finalize_error(job["idempotency_key"], error)
+    audio_spool.discard(job["session_id"])
+    if job.get("status") == "in_progress":
+        db.finish_finalize_request(job["idempotency_key"], "failed")
+        session = db.get_session_by_id(job["session_id"])
+        if session and session.get("status") == "processing":
+            db.update_session_status(job["session_id"], "recording")
+            homework_view.update_session(job["session_id"], status="recording")
+        session_events.publish(job["session_id"], "failed", {"error": error})
+
+
+def _resume(app, job: dict, max_attempts: int):
+    with app.app_context():
+        try:
+            resume_finalize(job)
+            _count("resumed")
+        except FinalizeUnrecoverable as e:
+            _count("errors")
+            _give_up(job, str(e))
+        except Exception as e:
+            _count("errors")
+            if job.get("attempts", 0) >= max_attempts:
+                _give_up(job, str(e))
+            else:
+                # Left in progress; claimed again once its heartbeat goes stale
+                db.note_finalize_error(job["idempotency_key"], str(e))
+
+
+def sweep_once(app) -> dict:
+    """Claim and resume one batch of stuck finalizes, FINALIZE_SWEEP_CONCURRENCY at a time."""
+    cfg = app.config
+    max_attempts = cfg.get("FINALIZE_MAX_ATTEMPTS", 3)
+    with app.app_context():
+        batch = db.claim_stuck_finalize(
+            cfg.get("FINALIZE_STUCK_AFTER_SEC", 600),
+            max_attempts,
+            cfg.get("FINALIZE_SWEEP_BATCH", 10),
+        )
+        for job in batch.get("abandoned") or []:
+            audio_spool.discard(job["session_id"])
+            if job.get("status") == "failed":
+                homework_view.invalidate(session_id=job["session_id"])
+                session_events.publish(job["session_id"], "failed", {"error": "Processing did not finish; please resubmit"})
+        _count("spools_purged", audio_spool.purge_stale(cfg.get("SPOOL_TTL_SEC", 86400)))
+    claimed = batch.get("claimed") or []
+    _count("sweeps")
+    _count("claimed", len(claimed))
+    _count("abandoned", len(batch.get("abandoned") or []))
+    if claimed:
+        with ThreadPoolExecutor(max_workers=cfg.get("FINALIZE_SWEEP_CONCURRENCY", 2), thread_name_prefix="finalize-sweep") as pool:
+            for job in claimed:
+                pool.submit(_resume, app, job, max_attempts)
+    return {"claimed": len(claimed), "abandoned": len(batch.get("abandoned") or [])}
+
+
+def _loop(app):
+    interval = app.config.get("FINALIZE_SWEEP_INTERVAL_SEC", 60)
+    stop = threading.Event()
+    while not stop.wait(interval * random.uniform(0.8, 1.2)):  # jitter so workers don't sweep in lockstep
+        try:
+            sweep_once(app)
+        except Exception:
+            _count("errors")
+
+
+def start(app):
+    """Start this process's sweeper thread once (no-op when FINALIZE_SWEEPER_ENABLED is false)."""
+    global _thread
+    if not app.config.get("FINALIZE_SWEEPER_ENABLED", True):
+        return
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_loop, args=(app,), name="finalize-sweeper", daemon=True)
+            _thread.start()
+
+
+def get_stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
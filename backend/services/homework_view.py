@@ -0,0 +1,217 @@
+"""
+Per-student "current homework" read model for /v2/homework/status and /report.
+One denormalized view per user — step, session id, status, exercise payload and the report (score, summary,
+coach feedback) — kept in an in-process LRU. The write paths (start, stream-chunk status change, finalize,
+summary, send-homework, coach feedback, finalize sweeper) update or drop the entry before publishing their
+session event, so a long-poll woken by the event reads the new view. A miss rebuilds from the DB.
+Views are per process, so a write made by another worker goes unseen until the entry expires: VIEW_TTL_SEC for
+settled views (landing, report), VIEW_TRANSIENT_TTL_SEC while the session is recording or processing.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from services import db
+
+VIEW_TTL_SEC = 30.0
+VIEW_TRANSIENT_TTL_SEC = 2.0
+MAX_VIEWS = 10000
+COACH_REMINDER = "Your coach will contact you within 24 hours."
+_TRANSIENT = ("recording", "processing")
+
+_views: "OrderedDict[str, tuple]" = OrderedDict()  # user_id -> (view, expires_at)
+_session_users: dict = {}  # session_id -> user_id, so session-keyed writers can find the view
+# Write marks: the sequence number of the last write per "u:<user_id>" / "s:<session_id>", so a DB rebuild is
+# dropped only when its own user or session was written while it ran
+_seq = 0
+_last_write: "OrderedDict[str, int]" = OrderedDict()
+_forgotten = 0  # highest mark evicted from _last_write; rebuilds older than it are not cached
+MAX_WRITE_MARKS = 20000
+_lock = threading.Lock()
+
+_STEPS = {"not_started": "landing", "recording": "recording", "processing": "processing", "completed": "report"}
+
+
+def _exercise_payload(session):
+    ex = session.get("exercises_pool") if isinstance(session.get("exercises_pool"), dict) else None
+    eid = session.get("recommended_exercise_id")
+    if ex:
+        return {"id": eid, "name": ex.get("name"), "description": ex.get("description")}
+    if eid:
+        exercise = db.get_exercise_by_id(str(eid))
+        return {"id": eid, "name": exercise.get("name") if exercise else None, "description": exercise.get("description") if exercise else None}
+    return None
+
+
+def _report_payload(report_row):
+    if not report_row:
+        return None
+    return {
+        "id": report_row.get("id"),
+        "score": report_row.get("score"),
+        "summary": report_row.get("summary"),
+        "coach_feedback_text": report_row.get("coach_feedback_text"),
+    }
+
+
+def _compose(session, report_row=None):
+    if not session:
+        return {"step": "landing", "session_id": None, "status": None, "exercise": None, "report": None}
+    status = session.get("status") or "not_started"
+    return {
+        "step": _STEPS.get(status, "landing"),
+        "session_id": str(session["id"]),
+        "status": status,
+        "exercise": _exercise_payload(session),
+        "report": _report_payload(report_row) if status == "completed" else None,
+    }
+
+
+def _expires_at(view: dict) -> float:
+    ttl = VIEW_TRANSIENT_TTL_SEC if view.get("status") in _TRANSIENT else VIEW_TTL_SEC
+    return time.monotonic() + ttl
+
+
+def _mark_write(*keys):
+    """Record a write to these user/session keys. Call with _lock held."""
+    global _seq, _forgotten
+    _seq += 1
+    for key in keys:
+        _last_write[key] = _seq
+        _last_write.move_to_end(key)
+    while len(_last_write) > MAX_WRITE_MARKS:
+        _, mark = _last_write.popitem(last=False)
+        _forgotten = max(_forgotten, mark)
+
+
+def _written_since(read_at: int, *keys) -> bool:
+    return _forgotten > read_at or any(_last_write.get(key, 0) > read_at for key in keys)
+
+
+def _store(user_id: str, view: dict, read_at: int = None):
+    """Cache a view. read_at: _seq when a DB rebuild started; skip caching if its user or session was written since."""
+    with _lock:
+        if read_at is None:
+            _mark_write(f"u:{user_id}", f"s:{view.get('session_id')}")
+        elif _written_since(read_at, f"u:{user_id}", f"s:{view.get('session_id')}"):
+            return
+        previous = _views.get(user_id)
+        if previous and previous[0].get("session_id") != view.get("session_id"):
+            _session_users.pop(previous[0].get("session_id"), None)
+        _views[user_id] = (view, _expires_at(view))
+        _views.move_to_end(user_id)
+        if view.get("session_id"):
+            _session_users[view["session_id"]] = user_id
+        while len(_views) > MAX_VIEWS:
+            old_user, (old_view, _) = _views.popitem(last=False)
+            _session_users.pop(old_view.get("session_id"), None)
+
+
+def load(user_id: str) -> dict:
+    """
+    Rebuild the view from the DB (current session + its report) and cache it, unless a write path touched this
+    user or session while the DB was being read (the rebuild may predate that write; the next read rebuilds again).
+    """
+    with _lock:
+        read_at = _seq
+    session = db.get_current_session(user_id)
+    report_row = db.get_report_by_session(session["id"]) if session and session.get("status") == "completed" else None
+    view = _compose(session, report_row)
+    _store(user_id, view, read_at)
+    return view
+
+
+def get(user_id: str) -> dict:
+    """The student's current view: one dict lookup when cached and fresh. Treat the result as read-only."""
+    with _lock:
+        hit = _views.get(user_id)
+        if hit and hit[1] > time.monotonic():
+            _views.move_to_end(user_id)
+            return hit[0]
+    return load(user_id)
+
+
+def set_session(user_id: str, session_id: str, status: str, exercise=None):
+    """A session was started or created (start, send-homework): the view points at it with no report."""
+    _store(str(user_id), {
+        "step": _STEPS.get(status, "landing"),
+        "session_id": str(session_id),
+        "status": status,
+        "exercise": exercise,
+        "report": None,
+    })
+
+
+def update_session(session_id: str, status: str = None, report: dict = None, **report_fields):
+    """
+    Apply a write to the view that holds session_id (no-op if it isn't cached here; the next read rebuilds).
+    An expired view is dropped rather than refreshed, so its other fields can't outlive their TTL.
+    status: new session status. report: full report row (finalize). report_fields: e.g. summary=...,
+    coach_feedback_text=... merged into the cached report.
+    """
+    with _lock:
+        user_id = _session_users.get(str(session_id))
+        _mark_write(f"s:{session_id}", *([f"u:{user_id}"] if user_id else []))
+        hit = _views.get(user_id) if user_id else None
+        if not hit or hit[0].get("session_id") != str(session_id):
+            return
+        if hit[1] <= time.monotonic():
+            del _views[user_id]
+            _session_users.pop(str(session_id), None)
+            return
+        view = dict(hit[0])
+        if status is not None:
+            view["status"] = status
+            view["step"] = _STEPS.get(status, "landing")
+        if report is not None:
+            view["report"] = _report_payload(report)
+        if report_fields and view.get("report"):
+            view["report"] = {**view["report"], **report_fields}
+        _views[user_id] = (view, _expires_at(view))
+
+
+def invalidate(user_id: str = None, session_id: str = None):
+    """Drop a view (by user, or by the session it holds) so the next read rebuilds from the DB."""
+    with _lock:
+        if user_id is None and session_id is not None:
+            user_id = _session_users.get(str(session_id))
+        _mark_write(*([f"s:{session_id}"] if session_id is not None else []), *([f"u:{user_id}"] if user_id else []))
+        if user_id is None:
+            return
+        hit = _views.pop(str(user_id), None)
+        if hit:
+            _session_users.pop(hit[0].get("session_id"), None)
+
+
+def status_payload(view: dict) -> dict:
+    return {
+        "step": view["step"],
+        "session_id": view["session_id"],
+        "status": view["status"],
+        "exercise": view["exercise"],
+    }
+
+
+def report_payload(view: dict):
+    """/report body, or None when there is no report for the current session."""
+    report = view.get("report")
+    if view.get("status") != "completed" or not report:
+        return None
+    return {
+        "score": report.get("score"),
+        "summary": report.get("summary"),
+        "summary_pending": report.get("summary") is None,
+        "coach_reminder": COACH_REMINDER,
+        "coach_feedback_text": report.get("coach_feedback_text"),
+    }
+
+
+def etag(payload) -> str:
+    """Weak validator for a response body built from the view."""
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def get_stats() -> dict:
+    with _lock:
+        return {"views": len(_views), "sessions": len(_session_users), "write_marks": len(_last_write)}
@@ -1,31 +1,74 @@
 """
 Live metrics during recording: process a short audio window and return transcript, WPM, fillers.
 Uses in-memory per-session buffer; processes last ~15s for each chunk.
+request_metrics coalesces: at most one transcription in flight per session, chunks arriving meanwhile
+fold into the next run, and the caller gets the latest finished metrics immediately.
 """
 import base64
 import threading
-from services.openai_service import transcribe_audio
-from services.metrics_v2 import count_fillers, compute_wpm
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from services.transcription import transcribe
+from services.vad import gate_window
+from services.metrics_v2 import compute_wpm
+from services.scoring_profiles import get_profile
 
-# Per-session buffer: { session_id: { "chunks": [bytes], "durations_sec": [float] } }
+# Per-session buffer: { session_id: { "chunks": [bytes], "durations_sec": [float], "header": bytes | None,
+#   "latest": dict | None, "running": bool, "pending": bool, "next_at": float, "latency": float,
+#   "exercise_id": str | None, "scoring_version": int | None, "generation": int } }
 _buffers: dict = {}
 _lock = threading.Lock()
+_generation = 0  # stamped on each new buffer; a run scheduled for a cleared buffer doesn't touch its successor
 
 WINDOW_SEC = 15.0  # process last N seconds
 MAX_CHUNKS = 10   # cap buffer size
 
+MAX_INFLIGHT = 8           # live transcriptions running at once across all sessions
+MIN_INTERVAL_SEC = 2.0     # never re-run a session's window more often than this
+
+_executor = ThreadPoolExecutor(max_workers=MAX_INFLIGHT, thread_name_prefix="live-metrics")
+_inflight = 0  # sessions with a run scheduled or executing (guarded by _lock)
+
+_EMPTY = {"transcript_segment": "", "wpm": 0.0, "voice_strength": 0, "filler_count": 0, "window_id": 0}
+
 
 def _get_buffer(session_id: str):
+    global _generation
     with _lock:
         if session_id not in _buffers:
-            _buffers[session_id] = {"chunks": [], "durations_sec": []}
+            _generation += 1
+            _buffers[session_id] = {
+                "chunks": [],
+                "durations_sec": [],
+                "header": None,
+                "latest": None,
+                "running": False,
+                "pending": False,
+                "next_at": 0.0,
+                "latency": 0.0,
+                "exercise_id": None,
+                "scoring_version": None,
+                "generation": _generation,
+            }
         return _buffers[session_id]
 
 
-def append_chunk(session_id: str, audio_bytes: bytes, duration_sec: float):
-    """Append a chunk; trim to last WINDOW_SEC."""
+def append_chunk(session_id: str, audio_bytes: bytes, duration_sec: float, sequence_index: int = None):
+    """
+    Append a chunk; trim to last WINDOW_SEC. Only a recording's first chunk (sequence_index 0, or the first one
+    buffered when the client sends no index) carries the WebM header, so it is kept aside for decoding later
+    windows once it has been trimmed out.
+    """
     buf = _get_buffer(session_id)
     with _lock:
+        if sequence_index == 0:
+            # A new recording: earlier chunks belong to the previous one
+            buf["chunks"].clear()
+            buf["durations_sec"].clear()
+            buf["header"] = audio_bytes
+        elif buf["header"] is None and sequence_index is None and not buf["chunks"]:
+            buf["header"] = audio_bytes
         buf["chunks"].append(audio_bytes)
         buf["durations_sec"].append(duration_sec)
         total_sec = sum(buf["durations_sec"])
@@ -39,35 +82,151 @@ def append_chunk(session_id: str, audio_bytes: bytes, duration_sec: float):
 
 def process_window(session_id: str):
     """
-    Run Whisper on the current buffer and return transcript_segment, wpm, filler_count for that window.
+    Transcribe the current buffer (live engine) and return transcript_segment, wpm, filler_count for that window.
     voice_strength is 0 (would need PCM decode for WebM).
     """
-    buf = _get_buffer(session_id)
     with _lock:
+        buf = _buffers.get(session_id)
+        if buf is None:
+            # Cleared by finalize before a queued or delayed run fired; don't re-create it
+            return {"transcript_segment": "", "wpm": 0.0, "voice_strength": 0, "filler_count": 0}
         chunks = list(buf["chunks"])
         durations = list(buf["durations_sec"])
+        header = buf["header"] if chunks and buf["header"] is not None and chunks[0] is not buf["header"] else None
+        exercise_id, scoring_version = buf["exercise_id"], buf["scoring_version"]
     if not chunks:
         return {"transcript_segment": "", "wpm": 0.0, "voice_strength": 0, "filler_count": 0}
     combined = b"".join(chunks)
     duration_sec = sum(durations)
     if len(combined) < 100:
         return {"transcript_segment": "", "wpm": 0.0, "voice_strength": 0, "filler_count": 0}
+    audio, filename = gate_window(combined, "chunk.webm", header=header)
+    if audio is None:
+        # No speech in the window: skip transcription entirely
+        return {"transcript_segment": "", "wpm": 0.0, "voice_strength": 0, "filler_count": 0}
     try:
-        transcript = transcribe_audio(combined, "chunk.webm")
+        transcript = transcribe(audio, filename, purpose="live")
     except Exception:
         return {"transcript_segment": "", "wpm": 0.0, "voice_strength": 0, "filler_count": 0}
     word_count = len(transcript.split()) if transcript else 0
     wpm = compute_wpm(word_count, duration_sec) if duration_sec > 0 else 0.0
-    filler_count = count_fillers(transcript or "")
+    profile = get_profile(exercise_id, scoring_version)
+    filler_count = profile.count_fillers(transcript or "")
     return {
         "transcript_segment": transcript or "",
         "wpm": round(wpm, 1),
         "voice_strength": 0,  # would need PCM decode for WebM
         "filler_count": filler_count,
+        "pace": profile.pace(wpm),
     }
 
 
+def _cadence(latency: float) -> float:
+    """Seconds to wait before a session's next run: slower when transcription is slow or many sessions are live."""
+    load = _inflight / MAX_INFLIGHT
+    return max(MIN_INTERVAL_SEC, latency * (1.0 + load))
+
+
+def _submit(app, session_id: str, generation: int, delay: float):
+    if delay > 0:
+        t = threading.Timer(delay, _executor.submit, args=(_run, app, session_id, generation))
+        t.daemon = True
+        t.start()
+    else:
+        _executor.submit(_run, app, session_id, generation)
+
+
+def _run(app, session_id: str, generation: int):
+    global _inflight
+    with _lock:
+        buf = _buffers.get(session_id)
+        if buf is None or buf["generation"] != generation:
+            # Cleared (finalize) before this run fired; a newer buffer schedules its own runs
+            _inflight -= 1
+            return
+    t0 = time.monotonic()
+    try:
+        with app.app_context():
+            metrics = process_window(session_id)
+    except Exception:
+        metrics = None
+    latency = time.monotonic() - t0
+    with _lock:
+        buf = _buffers.get(session_id)
+        if buf is None or buf["generation"] != generation:
+            # Cleared (finalize) while running
+            _inflight -= 1
+            return
+        if metrics is not None:
+            buf["window_id"] = buf.get("window_id", 0) + 1
+            buf["latest"] = {**metrics, "window_id": buf["window_id"]}
+        buf["latency"] = latency
+        buf["next_at"] = time.monotonic() + _cadence(latency)
+        rerun = buf["pending"]
+        buf["pending"] = False
+        if not rerun:
+            buf["running"] = False
+            _inflight -= 1
+            return
+        delay = buf["next_at"] - time.monotonic()
+    _submit(app, session_id, generation, delay)
+
+
+def latest_metrics(session_id: str) -> dict:
+    """Last finished metrics for the session without scheduling a run (used when shedding load)."""
+    with _lock:
+        buf = _buffers.get(session_id)
+        return dict((buf and buf["latest"]) or _EMPTY)
+
+
+def request_metrics(session_id: str, exercise_id: str = None, scoring_version: int = None) -> dict:
+    """
+    Schedule a window run for the session (or fold into the one in flight) and return the latest
+    finished metrics without waiting. "pending" is true while a newer result is on its way;
+    "window_id" increases with each finished run so clients can tell a repeat from a new window.
+    exercise_id / scoring_version select the cached scoring profile used for the window.
+    """
+    global _inflight
+    app = current_app._get_current_object()
+    buf = _get_buffer(session_id)
+    with _lock:
+        buf["exercise_id"], buf["scoring_version"] = exercise_id, scoring_version
+        latest = dict(buf["latest"] or _EMPTY)
+        if buf["running"]:
+            buf["pending"] = True
+            latest["pending"] = True
+            return latest
+        buf["running"] = True
+        _inflight += 1
+        delay = buf["next_at"] - time.monotonic()
+        generation = buf["generation"]
+    _submit(app, session_id, generation, delay)
+    latest["pending"] = True
+    return latest
+
+
 def clear_buffer(session_id: str):
     with _lock:
         if session_id in _buffers:
             del _buffers[session_id]
+
+
+def get_stats(top: int = 10) -> dict:
+    """Buffer occupancy for this worker: sessions, chunks and audio bytes held, plus the largest buffers."""
+    with _lock:
+        sizes = [
+            (session_id, len(buf["chunks"]), sum(len(c) for c in buf["chunks"]), buf["running"], buf["pending"])
+            for session_id, buf in _buffers.items()
+        ]
+        inflight = _inflight
+    sizes.sort(key=lambda s: s[2], reverse=True)
+    return {
+        "sessions": len(sizes),
+        "chunks": sum(s[1] for s in sizes),
+        "bytes": sum(s[2] for s in sizes),
+        "inflight": inflight,
+        "largest": [
+            {"session_id": s[0], "chunks": s[1], "bytes": s[2], "running": s[3], "pending": s[4]}
+            for s in sizes[:top]
+        ],
+    }
@@ -2,6 +2,7 @@
 Scoring and metrics: WPM, voice strength, filler count, score = starting_metric - 5 * fillers.
 """
 import re
+from functools import lru_cache
 from flask import current_app
 
 
@@ -12,16 +13,23 @@ def get_filler_words():
     return current_app.config.get("FILLER_WORDS", ["um", "uh", "like", "you know", "so"])
 
 
-def count_fillers(transcript: str) -> int:
+@lru_cache(maxsize=64)
+def filler_matcher(words: tuple):
+    """Compiled patterns for a filler vocabulary, cached by the (hashable) word tuple."""
+    # Word boundaries so "um" doesn't match "drum"; one pattern per word so overlapping fillers each count
+    return tuple(re.compile(rf"\b{re.escape(w.lower())}\b") for w in words)
+
+
+def count_fillers_with(transcript: str, words) -> int:
+    """count_fillers for an explicit vocabulary; needs no app context (safe in worker processes)."""
     if not transcript or not transcript.strip():
         return 0
-    words = get_filler_words()
     text = transcript.lower()
-    count = 0
-    for w in words:
-        # Word boundaries so "um" doesn't match "drum"
-        count += len(re.findall(rf"\b{re.escape(w)}\b", text))
-    return count
+    return sum(len(p.findall(text)) for p in filler_matcher(tuple(words)))
+
+
+def count_fillers(transcript: str) -> int:
+    return count_fillers_with(transcript, get_filler_words())
 
 
 def compute_wpm(word_count: int, duration_seconds: float) -> float:
@@ -45,7 +53,8 @@ def compute_voice_strength_rms(audio_bytes: bytes) -> float:
         return 0.0
 
 
-def compute_score(starting_metric: int, filler_count: int) -> float:
-    points = current_app.config.get("POINTS_PER_FILLER", POINTS_PER_FILLER)
+def compute_score(starting_metric: int, filler_count: int, points: int = None) -> float:
+    if points is None:
+        points = current_app.config.get("POINTS_PER_FILLER", POINTS_PER_FILLER)
     score = starting_metric - (points * filler_count)
     return max(0.0, float(score))
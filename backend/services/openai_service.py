@@ -1,16 +1,19 @@
 """
 OpenAI: Whisper transcription and GPT summary generation.
 """
+import hashlib
 import os
-from openai import OpenAI
+import threading
+from collections import OrderedDict
 from flask import current_app
+from services.clients import openai_client
 
 
 def get_client():
     key = os.environ.get("OPENAI_API_KEY") or current_app.config.get("OPENAI_API_KEY")
     if not key:
         raise RuntimeError("OPENAI_API_KEY not set")
-    return OpenAI(api_key=key)
+    return openai_client(key)
 
 
 def transcribe_audio(audio_bytes: bytes, filename: str = "audio.webm") -> str:
@@ -23,21 +26,108 @@ def transcribe_audio(audio_bytes: bytes, filename: str = "audio.webm") -> str:
     return r.text or ""
 
 
+def transcribe_audio_words(audio_bytes: bytes, filename: str = "audio.webm"):
+    """Whisper verbose JSON with word timestamps. Returns (text, [(word, start_sec, end_sec), ...])."""
+    client = get_client()
+    import io
+    file_like = io.BytesIO(audio_bytes)
+    file_like.name = filename
+    r = client.audio.transcriptions.create(
+        model="whisper-1",
+        file=file_like,
+        response_format="verbose_json",
+        timestamp_granularities=["word"],
+    )
+    words = [(w.word, float(w.start), float(w.end)) for w in (getattr(r, "words", None) or [])]
+    return r.text or "", words
+
+
+SUMMARY_MODEL = "gpt-4o-mini"
+SUMMARY_CACHE_SIZE = 256
+
+# Summaries keyed by transcript hash so finalize retries on the same audio don't pay twice
+_summary_cache: "OrderedDict[str, str]" = OrderedDict()
+_summary_cache_lock = threading.Lock()
+
+
+def _summary_key(transcript: str, max_sentences: int) -> str:
+    return hashlib.sha256(f"{SUMMARY_MODEL}:{max_sentences}:{transcript}".encode()).hexdigest()
+
+
+def get_cached_summary(transcript: str, max_sentences: int = 3):
+    key = _summary_key(transcript, max_sentences)
+    with _summary_cache_lock:
+        if key in _summary_cache:
+            _summary_cache.move_to_end(key)
+            return _summary_cache[key]
+    return None
+
+
+def _cache_summary(transcript: str, max_sentences: int, summary: str):
+    with _summary_cache_lock:
+        _summary_cache[_summary_key(transcript, max_sentences)] = summary
+        while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+
+
+def _summary_messages(transcript: str):
+    return [
+        {"role": "system", "content": "You are a concise assistant. Output only the summary, no preamble."},
+        {"role": "user", "content": f"Transcript:\n{transcript[:8000]}"},
+    ]
+
+
+def _trim_sentences(text: str, max_sentences: int) -> str:
+    # Truncate to roughly max_sentences if model returned more
+    sentences = text.strip().replace("..", ".").split(".")
+    sentences = [s.strip() for s in sentences if s.strip()]
+    return ". ".join(sentences[:max_sentences]) + ("." if sentences else "")
+
+
 def generate_summary(transcript: str, max_sentences: int = 3) -> str:
     if not transcript or not transcript.strip():
         return "No transcript available."
+    cached = get_cached_summary(transcript, max_sentences)
+    if cached is not None:
+        return cached
     client = get_client()
-    prompt = f"""Summarize this speech transcript in at most {max_sentences} sentences. Be concise and focus on clarity and delivery."""
     r = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a concise assistant. Output only the summary, no preamble."},
-            {"role": "user", "content": f"Transcript:\n{transcript[:8000]}"},
-        ],
+        model=SUMMARY_MODEL,
+        messages=_summary_messages(transcript),
         max_tokens=200,
     )
-    text = (r.choices[0].message.content or "").strip()
-    # Truncate to roughly 3 sentences if model returned more
-    sentences = text.replace("..", ".").split(".")
-    sentences = [s.strip() for s in sentences if s.strip()]
-    return ". ".join(sentences[:max_sentences]) + ("." if sentences else "")
+    summary = _trim_sentences(r.choices[0].message.content or "", max_sentences)
+    _cache_summary(transcript, max_sentences, summary)
+    return summary
+
+
+def stream_summary(transcript: str, max_sentences: int = 3):
+    """
+    Yield the summary as it is generated (each value is the full partial text so far, sentence-trimmed).
+    The last value is the final summary, which is also cached.
+    """
+    if not transcript or not transcript.strip():
+        yield "No transcript available."
+        return
+    cached = get_cached_summary(transcript, max_sentences)
+    if cached is not None:
+        yield cached
+        return
+    client = get_client()
+    stream = client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=_summary_messages(transcript),
+        max_tokens=200,
+        stream=True,
+    )
+    text = ""
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content or ""
+        if delta:
+            text += delta
+            yield text.strip()
+    summary = _trim_sentences(text, max_sentences)
+    _cache_summary(transcript, max_sentences, summary)
+    yield summary
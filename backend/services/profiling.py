@@ -0,0 +1,141 @@
+"""
+On-demand diagnostics for admins: a sampling CPU profiler, tracemalloc snapshots and in-memory buffer stats.
+Nothing runs until an admin asks: the sampler loops in the admin's request thread for the requested N seconds, and
+tracemalloc is off unless started (it slows allocation-heavy code while on, so stop it when done).
+The sampler reads sys._current_frames(), so it sees OS threads only; under gevent, greenlets show up
+in the hub's stack.
+"""
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+MAX_PROFILE_SEC = 30.0   # stay well under the gunicorn worker timeout
+MAX_SAMPLE_HZ = 1000
+MAX_TRACE_FRAMES = 25
+
+_profile_lock = threading.Lock()  # one CPU profile at a time per process
+_trace_lock = threading.Lock()
+_baseline = None  # last tracemalloc snapshot, for diffs
+
+
+class ProfilerBusy(Exception):
+    """A CPU profile is already running in this process."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+
+def _collapse(frame, thread_name: str) -> str:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.append(thread_name)
+    return ";".join(reversed(stack))
+
+
+def sample_cpu(seconds: float, hz: int = 100) -> tuple:
+    """
+    Sample every thread's stack hz times a second for seconds. Returns (collapsed_text, meta): one
+    "thread;module:func:line;... count" line per distinct stack (flamegraph.pl / speedscope input).
+    Raises ProfilerBusy if another profile is running.
+    """
+    seconds = min(MAX_PROFILE_SEC, max(0.1, seconds))
+    interval = 1.0 / min(MAX_SAMPLE_HZ, max(1, hz))
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy()
+    try:
+        own = threading.get_ident()
+        counts = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    counts[_collapse(frame, names.get(ident, f"thread-{ident}"))] += 1
+            samples += 1
+            time.sleep(interval)
+    finally:
+        _profile_lock.release()
+    text = "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
+    return text, {"seconds": seconds, "samples": samples, "stacks": len(counts)}
+
+
+def trace_start(frames: int = 10) -> dict:
+    with _trace_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(min(MAX_TRACE_FRAMES, max(1, frames)))
+        return trace_status()
+
+
+def trace_stop() -> dict:
+    global _baseline
+    with _trace_lock:
+        tracemalloc.stop()
+        _baseline = None
+        return trace_status()
+
+
+def trace_status() -> dict:
+    if not tracemalloc.is_tracing():
+        return {"tracing": False}
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "tracing": True,
+        "frames": tracemalloc.get_traceback_limit(),
+        "traced_bytes": current,
+        "peak_bytes": peak,
+        "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+    }
+
+
+def trace_snapshot(limit: int = 25, group_by: str = "lineno", diff: bool = False) -> dict:
+    """
+    Take a snapshot and return the top allocation sites, or (diff=True) the top growth since the previous
+    snapshot. The snapshot becomes the new baseline. Returns None when tracemalloc is not running.
+    """
+    global _baseline
+    if group_by not in ("lineno", "filename", "traceback"):
+        group_by = "lineno"
+    with _trace_lock:
+        if not tracemalloc.is_tracing():
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        baseline, _baseline = _baseline, snapshot
+    if diff and baseline is not None:
+        stats = snapshot.compare_to(baseline, group_by)[:limit]
+        rows = [{
+            "where": [str(f) for f in s.traceback.format()] if group_by == "traceback" else str(s.traceback[0]),
+            "size_bytes": s.size,
+            "size_diff_bytes": s.size_diff,
+            "count": s.count,
+            "count_diff": s.count_diff,
+        } for s in stats]
+    else:
+        stats = snapshot.statistics(group_by)[:limit]
+        rows = [{
+            "where": [str(f) for f in s.traceback.format()] if group_by == "traceback" else str(s.traceback[0]),
+            "size_bytes": s.size,
+            "count": s.count,
+        } for s in stats]
+    return {**trace_status(), "diff": bool(diff and baseline is not None), "group_by": group_by, "top": rows}
+
+
+def buffer_stats() -> dict:
+    """What this worker holds in memory: live-metrics audio buffers, session event channels, cached views."""
+    from services import homework_view, live_metrics, session_events
+    return {
+        "live_metrics": live_metrics.get_stats(),
+        "session_events": session_events.get_stats(),
+        "homework_view": homework_view.get_stats(),
+        "threads": threading.active_count(),
+    }
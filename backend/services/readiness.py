@@ -0,0 +1,120 @@
+"""
+Readiness: warm each dependency's connection pool at worker start, then probe with short timeouts and cache
+the result for READY_CACHE_SEC. /ready answers 503 until warm-up has finished, and afterwards 200 only while
+every required dependency (READY_REQUIRED) passes; /health stays a no-I/O liveness check.
+Probes run in a small thread pool so one hung dependency costs at most READY_PROBE_TIMEOUT_SEC.
+"""
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import current_app
+from services import db
+from services import openai_service
+
+RESEND_API_URL = "https://api.resend.com/"
+
+_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="ready-probe")
+_lock = threading.Lock()        # one probe round at a time; others read the cached result
+_warm = threading.Event()
+_warm_started = False
+_last = {"checked_at": 0.0, "checks": {}}
+
+
+def _probe_supabase(timeout: float):
+    # Cheapest indexed read, sent on the cached client's PostgREST session (warms its pool) with a per-request
+    # timeout: the client's own default is minutes, longer than the probe is allowed to take
+    session = db.get_supabase().postgrest.session
+    session.get("exercises_pool", params={"select": "id", "limit": "1"}, timeout=timeout).raise_for_status()
+
+
+def _probe_openai(timeout: float):
+    # Shares the cached client's HTTP pool, so a pass leaves a warm TLS connection behind
+    openai_service.get_client().with_options(timeout=timeout, max_retries=0).models.retrieve("whisper-1")
+
+
+def _probe_resend(timeout: float):
+    if not (os.environ.get("RESEND_API_KEY") or current_app.config.get("RESEND_API_KEY")):
+        raise RuntimeError("RESEND_API_KEY not set")
+    try:
+        urllib.request.urlopen(urllib.request.Request(RESEND_API_URL, method="HEAD"), timeout=timeout).close()
+    except urllib.error.HTTPError:
+        pass  # any HTTP answer means DNS, TCP and TLS are fine
+
+
+PROBES = {"supabase": _probe_supabase, "openai": _probe_openai, "resend": _probe_resend}
+
+
+def _required(cfg) -> set:
+    return {name.strip() for name in cfg.get("READY_REQUIRED", "supabase,openai").split(",") if name.strip()}
+
+
+def _timed(app, probe, timeout):
+    with app.app_context():
+        start = time.perf_counter()
+        probe(timeout)
+        return round((time.perf_counter() - start) * 1000, 1)
+
+
+def run_checks(app, timeout: float = None) -> dict:
+    """Probe every dependency concurrently; returns {name: {ok, required, latency_ms, error}} and caches it."""
+    cfg = app.config
+    timeout = timeout or cfg.get("READY_PROBE_TIMEOUT_SEC", 2.0)
+    required = _required(cfg)
+    futures = {name: _executor.submit(_timed, app, probe, timeout) for name, probe in PROBES.items()}
+    deadline = time.monotonic() + timeout
+    checks = {}
+    for name, future in futures.items():
+        check = {"ok": False, "required": name in required, "latency_ms": None}
+        try:
+            check["latency_ms"] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            check["ok"] = True
+        except FutureTimeout:
+            check["error"] = f"timed out after {timeout}s"
+        except Exception as e:
+            check["error"] = str(e)[:200]
+        checks[name] = check
+    _last.update(checked_at=time.time(), checks=checks)
+    return checks
+
+
+def warm_up(app):
+    """
+    Open dependency connections in the background, once per process (gunicorn post_worker_init, or the
+    first /ready when run another way); /ready can pass once this round is done.
+    """
+    global _warm_started
+    with _lock:
+        if _warm_started:
+            return
+        _warm_started = True
+
+    def _run():
+        try:
+            # First contact pays for DNS, TLS and client construction, so allow longer than a steady-state probe
+            run_checks(app, app.config.get("READY_WARM_UP_TIMEOUT_SEC", 15.0))
+        finally:
+            _warm.set()
+
+    threading.Thread(target=_run, name="ready-warm-up", daemon=True).start()
+
+
+def status(app) -> tuple:
+    """(payload, ready) for /ready, probing again only when the cached result is older than READY_CACHE_SEC."""
+    if not _warm.is_set():
+        warm_up(app)
+        return {"status": "warming", "checks": _last["checks"]}, False
+    if time.time() - _last["checked_at"] >= app.config.get("READY_CACHE_SEC", 10.0) and _lock.acquire(blocking=False):
+        try:
+            run_checks(app)
+        finally:
+            _lock.release()
+    checks = _last["checks"]
+    ready = all(c["ok"] for c in checks.values() if c["required"])
+    return {
+        "status": "ready" if ready else "unavailable",
+        "checked_at": _last["checked_at"],
+        "checks": checks,
+    }, ready
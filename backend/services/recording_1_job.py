@@ -1,59 +1,255 @@
 """
 Background job for finalizing a recording: full Whisper, metrics, score, report.
 Called after client sends finalize (sync or async).
+The summary is off the critical path: the report is written with score/metrics first, then the summary
+streams in the background (summary_delta events) and is saved to homework_reports_v2.summary.
+With a journal_key, each completed stage is checkpointed on finalize_requests_v2 (transcribed -> scored ->
+reported -> summarized) so the sweeper can resume an interrupted finalize via resume_finalize.
 """
+import time
+from concurrent.futures import ThreadPoolExecutor
 from services.db import (
     get_session_by_id,
     get_starting_metric_for_user_and_exercise,
     update_session_status,
-    update_recording,
-    create_report,
     get_recording_by_session,
+    get_report_by_session,
+    complete_session_with_report,
+    update_report_summary,
+    checkpoint_finalize,
+    finish_finalize_request,
 )
-from services.openai_service import transcribe_audio, generate_summary
-from services.metrics_v2 import count_fillers, compute_wpm, compute_score
+from services.openai_service import get_cached_summary, stream_summary
+from services.transcription import transcribe_words
+from services.metrics_v2 import compute_wpm
+from services.scoring_profiles import get_profile
+from services.timeline_metrics import compute_timeline
+from services.audio_normalize import normalize_audio
+from services.session_events import publish
+from services import audio_spool
+from services import homework_view
+from services.homework_view import COACH_REMINDER
 from flask import current_app
 
+SUMMARY_SENTENCES = 3
+SUMMARY_PUBLISH_INTERVAL_SEC = 0.25  # throttle summary_delta events
+SUMMARY_UNAVAILABLE = "Summary unavailable."
 
-def process_recording_finalize(session_id: str, full_audio_bytes: bytes, duration_seconds: float):
+_summary_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="summary")
+
+
+class FinalizeUnrecoverable(Exception):
+    """A journaled finalize cannot be resumed (e.g. its archived audio is gone)."""
+
+
+def _checkpoint(journal_key, stage, checkpoint=None):
+    if journal_key:
+        checkpoint_finalize(journal_key, stage, checkpoint)
+
+
+def _after_report(fn, *args, **kwargs):
+    """Run a step that follows the report commit; a failure is logged instead of failing the finalize."""
+    try:
+        fn(*args, **kwargs)
+    except Exception:
+        current_app.logger.exception("finalize: %s failed after the report was saved", getattr(fn, "__name__", fn))
+
+
+def _generate_summary_job(app, session_id: str, report_id: str, transcript: str, journal_key: str = None):
+    """Stream the GPT summary, publishing partial text, then save the final text to the report."""
+    with app.app_context():
+        summary = ""
+        last_publish = 0.0
+        try:
+            for partial in stream_summary(transcript, max_sentences=SUMMARY_SENTENCES):
+                summary = partial
+                now = time.monotonic()
+                if now - last_publish >= SUMMARY_PUBLISH_INTERVAL_SEC:
+                    publish(session_id, "summary_delta", {"text": partial})
+                    last_publish = now
+        except Exception:
+            pass
+        # An empty or failed stream still settles the report, so /report stops showing summary_pending
+        summary = summary or SUMMARY_UNAVAILABLE
+        try:
+            if report_id:
+                update_report_summary(report_id, summary)
+                homework_view.update_session(session_id, summary=summary)
+            _checkpoint(journal_key, "summarized")
+        finally:
+            # Listeners always get summary_ready; if the save failed the journal isn't checkpointed and the sweeper retries
+            publish(session_id, "summary_ready", {"summary": summary})
+
+
+def finalize_payload(result: dict) -> dict:
+    """Response body for a finished finalize (also stored on the journal row for duplicate requests)."""
+    return {
+        "step": "report",
+        "score": result["score"],
+        "summary": result["summary"],
+        "summary_pending": result["summary_pending"],
+        "pace": result.get("pace"),
+        "wpm_target": result.get("wpm_target"),
+        "coach_reminder": COACH_REMINDER,
+    }
+
+
+def process_recording_finalize(
+    session_id: str,
+    full_audio_bytes: bytes,
+    duration_seconds: float,
+    recording_id: str = None,
+    starting_metric: int = None,
+    exercise_id: str = None,
+    scoring_version: int = None,
+    journal_key: str = None,
+    checkpoint: dict = None,
+    run_summary_inline: bool = False,
+    audio_filename: str = None,
+):
     """
     Run full pipeline: transcribe -> filler count -> WPM -> score -> report.
     Caller is responsible for creating the recording row and uploading to storage if needed.
+    When called after db.begin_finalize, pass its recording_id, starting_metric, exercise_id and
+    scoring_version to skip the lookups (session is already in processing).
+    journal_key / checkpoint: journal each stage as it completes and skip stages already in checkpoint
+    (full_audio_bytes may be None once the transcript is checkpointed).
+    audio_filename: set when full_audio_bytes is already normalized (its filename, e.g. "audio.ogg"); otherwise
+    the audio is normalized here.
+    Raises only before the report is committed; failures after it (checkpoint, view, events) are logged, so a
+    caller can safely roll the session back on any exception.
     """
-    session = get_session_by_id(session_id)
-    if not session:
-        raise ValueError(f"Session {session_id} not found")
-    user_id = session["user_id"]
-    exercise_id = session.get("recommended_exercise_id")
-    starting_metric = get_starting_metric_for_user_and_exercise(user_id, exercise_id)
-
-    update_session_status(session_id, "processing")
-
-    transcript = transcribe_audio(full_audio_bytes)
-    filler_count = count_fillers(transcript)
-    word_count = len(transcript.split()) if transcript else 0
-    wpm = compute_wpm(word_count, duration_seconds) if duration_seconds > 0 else None
-    score = compute_score(starting_metric, filler_count)
-    summary = generate_summary(transcript, max_sentences=3)
-
-    recording = get_recording_by_session(session_id)
-    if recording:
-        update_recording(
-            recording["id"],
-            transcript=transcript,
-            wpm=wpm,
-            filler_count=filler_count,
-            starting_metric=starting_metric,
-            score=score,
-        )
-
-    create_report(
+    if recording_id is None or starting_metric is None:
+        session = get_session_by_id(session_id)
+        if not session:
+            raise ValueError(f"Session {session_id} not found")
+        exercise_id = exercise_id or session.get("recommended_exercise_id")
+        if starting_metric is None:
+            starting_metric = get_starting_metric_for_user_and_exercise(
+                session["user_id"], session.get("recommended_exercise_id")
+            )
+        if recording_id is None:
+            update_session_status(session_id, "processing")
+            homework_view.update_session(session_id, status="processing")
+            recording = get_recording_by_session(session_id)
+            recording_id = recording["id"] if recording else None
+
+    cp = dict(checkpoint or {})
+    if "transcript" in cp:
+        transcript, words = cp["transcript"], [tuple(w) for w in cp.get("words") or []]
+    else:
+        if audio_filename:
+            audio, filename = full_audio_bytes, audio_filename
+        else:
+            audio, filename = normalize_audio(full_audio_bytes)
+        transcript, words = transcribe_words(audio, filename, purpose="finalize")
+        cp.update(transcript=transcript, words=[list(w) for w in words])
+        _checkpoint(journal_key, "transcribed", cp)
+    publish(session_id, "transcribed")
+
+    profile = get_profile(exercise_id, scoring_version)
+    if "score" in cp:
+        filler_count, wpm, score, pace, timeline = cp["filler_count"], cp["wpm"], cp["score"], cp["pace"], cp["timeline"]
+    else:
+        filler_count = profile.count_fillers(transcript)
+        word_count = len(transcript.split()) if transcript else 0
+        timeline = compute_timeline(words, profile.filler_words)
+        if duration_seconds > 0:
+            wpm = compute_wpm(word_count, duration_seconds)
+        else:
+            # No client duration: fall back to the spoken span from word timestamps
+            wpm = timeline["wpm"] if timeline else None
+        score = profile.score(starting_metric, filler_count)
+        pace = profile.pace(wpm)
+        cp.update(filler_count=filler_count, wpm=wpm, score=score, pace=pace, timeline=timeline)
+        _checkpoint(journal_key, "scored", cp)
+    publish(session_id, "scored", {"score": score, "filler_count": filler_count, "wpm": wpm, "pace": pace})
+    # Cached (e.g. retry on the same audio) -> write it with the report; otherwise generate after
+    summary = get_cached_summary(transcript, SUMMARY_SENTENCES) if transcript and transcript.strip() else "No transcript available."
+
+    report = complete_session_with_report(
         session_id=session_id,
-        recording_id=recording["id"] if recording else None,
-        summary=summary,
-        score=score,
-        starting_metric=starting_metric,
+        recording_id=recording_id,
+        transcript=transcript,
+        wpm=wpm,
         filler_count=filler_count,
+        starting_metric=starting_metric,
+        score=score,
+        summary=summary,
+        timeline=timeline,
+    )
+    report_id = (report or {}).get("id")
+    # The report is committed: nothing below may raise, or a caller would roll back a completed session
+    _after_report(_checkpoint, journal_key, "reported" if summary is None else "summarized", {**cp, "report_id": report_id})
+    if report:
+        _after_report(homework_view.update_session, session_id, status="completed", report=report)
+    else:
+        _after_report(homework_view.invalidate, session_id=session_id)
+    _after_report(publish, session_id, "report_ready", {"score": score, "summary": summary})
+    if summary is None:
+        args = (current_app._get_current_object(), session_id, report_id, transcript, journal_key)
+        if run_summary_inline:
+            # The sweeper's own retry covers a failed summary save (the journal stays at "reported")
+            _generate_summary_job(*args)
+        else:
+            _after_report(_summary_executor.submit, _generate_summary_job, *args)
+    else:
+        _after_report(publish, session_id, "summary_ready", {"summary": summary})
+    return {
+        "score": score,
+        "summary": summary,
+        "summary_pending": summary is None,
+        "filler_count": filler_count,
+        "pace": pace,
+        "wpm_target": profile.targets(),
+    }
+
+
+def resume_finalize(job: dict):
+    """
+    Resume a journaled finalize claimed by the sweeper from its last completed stage.
+    job is a finalize_requests_v2 row. Raises FinalizeUnrecoverable when it cannot be resumed.
+    """
+    key = job["idempotency_key"]
+    session_id = job["session_id"]
+    cp = job.get("checkpoint") or {}
+    params = job.get("params") or {}
+
+    report = get_report_by_session(session_id)
+    if report and (job.get("stage") == "reported" or str(report.get("recording_id")) == str(job.get("recording_id"))):
+        # Report already written (possibly just before the worker died): only the summary can be missing
+        homework_view.invalidate(session_id=session_id)
+        if report.get("summary") is None and cp.get("transcript"):
+            _generate_summary_job(current_app._get_current_object(), session_id, report["id"], cp["transcript"], key)
+        else:
+            _checkpoint(key, "summarized")
+        if job.get("status") == "in_progress":
+            finish_finalize_request(key, "completed", finalize_payload({
+                "score": report.get("score"),
+                "summary": report.get("summary"),
+                "summary_pending": report.get("summary") is None,
+                "pace": cp.get("pace"),
+            }))
+        audio_spool.discard(session_id)
+        return
+
+    audio = None
+    if "transcript" not in cp:
+        audio = audio_spool.load_archive(session_id) if job.get("audio_ref") else None
+        if audio is None:
+            raise FinalizeUnrecoverable("Archived audio missing")
+    result = process_recording_finalize(
+        session_id,
+        audio,
+        float(params.get("duration_seconds") or 0),
+        recording_id=job.get("recording_id"),
+        starting_metric=params.get("starting_metric"),
+        exercise_id=params.get("exercise_id"),
+        scoring_version=params.get("scoring_version"),
+        journal_key=key,
+        checkpoint=cp,
+        run_summary_inline=True,
+        audio_filename=params.get("audio_filename"),
     )
-    update_session_status(session_id, "completed")
-    return {"score": score, "summary": summary, "filler_count": filler_count}
+    finish_finalize_request(key, "completed", finalize_payload(result))
+    audio_spool.discard(session_id)
@@ -0,0 +1,90 @@
+"""
+Streaming export of reports joined with recording metrics and student emails, as CSV or NDJSON.
+Rows are fetched a page at a time with a (created_at, id) cursor and encoded page by page, so memory
+stays flat whatever the export size. Optional gzip compresses the stream incrementally.
+"""
+import csv
+import io
+import json
+import zlib
+from services import db
+
+PAGE_SIZE = 500
+
+COLUMNS = [
+    "report_id", "created_at", "student_id", "student_email", "exercise_id", "exercise_name",
+    "score", "starting_metric", "filler_count", "wpm", "voice_strength", "coach_feedback_sent_at", "summary",
+]
+
+
+def _flatten(report, email_for, include_transcript):
+    session = report.get("homework_sessions_v2") or {}
+    recording = report.get("recordings_v2") if isinstance(report.get("recordings_v2"), dict) else {}
+    user_id = session.get("user_id")
+    row = {
+        "report_id": report["id"],
+        "created_at": report.get("created_at"),
+        "student_id": user_id,
+        "student_email": email_for(user_id) if user_id else None,
+        "exercise_id": session.get("recommended_exercise_id"),
+        "exercise_name": (session.get("exercises_pool") or {}).get("name"),
+        "score": report.get("score"),
+        "starting_metric": report.get("starting_metric"),
+        "filler_count": report.get("filler_count"),
+        "wpm": recording.get("wpm"),
+        "voice_strength": recording.get("voice_strength"),
+        "coach_feedback_sent_at": report.get("coach_feedback_sent_at"),
+        "summary": report.get("summary"),
+    }
+    if include_transcript:
+        row["transcript"] = recording.get("transcript")
+    return row
+
+
+def iter_pages(email_lookup, include_transcript=False, page_size=PAGE_SIZE, **filters):
+    """Yield lists of flat row dicts. email_lookup(user_id) is called once per distinct student."""
+    emails = {}
+
+    def email_for(user_id):
+        if user_id not in emails:
+            emails[user_id] = email_lookup(user_id)
+        return emails[user_id]
+
+    cursor = None
+    while True:
+        page = db.list_reports_for_export(cursor=cursor, limit=page_size, include_transcript=include_transcript, **filters)
+        if not page:
+            return
+        yield [_flatten(r, email_for, include_transcript) for r in page]
+        if len(page) < page_size:
+            return
+        cursor = (page[-1]["created_at"], page[-1]["id"])
+
+
+def encode_csv(pages, include_transcript=False):
+    columns = COLUMNS + (["transcript"] if include_transcript else [])
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    for rows in pages:
+        writer.writerows(rows)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def encode_ndjson(pages):
+    for rows in pages:
+        yield "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in rows).encode("utf-8")
+
+
+def gzip_stream(chunks):
+    """Compress an iterable of bytes into one gzip member, chunk by chunk."""
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
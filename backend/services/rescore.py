@@ -0,0 +1,116 @@
+"""
+Bulk re-scoring of stored recordings after filler vocabulary, points-per-filler or starting-metric changes
+(FILLER_WORDS / POINTS_PER_FILLER or an exercise's scoring profile).
+Walks recordings_v2 by id with keyset pagination (one page in memory at a time), re-counts fillers from the
+stored transcript on a process pool, and writes changed rows back per page with one RPC (hw_rescore_batch),
+which also updates the matching homework_reports_v2 rows. Whisper is not re-run.
+Run via the CLI: `flask --app app rescore --help`.
+"""
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from services import db
+from services.metrics_v2 import count_fillers_with
+from services.scoring_profiles import get_profile
+
+PAGE_SIZE = 500
+
+
+def _count_chunk(items):
+    """Worker-process entry: filler counts for (transcript, filler_words) pairs (matchers cached per process)."""
+    return [count_fillers_with(t, words) for t, words in items]
+
+
+def _split(items, parts):
+    size = max(1, -(-len(items) // parts))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _fmt_duration(sec):
+    sec = int(sec)
+    return f"{sec // 60}m{sec % 60:02d}s" if sec >= 60 else f"{sec}s"
+
+
+class _StartingMetrics:
+    """Starting metric per (user, exercise) with the same precedence as finalize, fetched once per page."""
+
+    def __init__(self):
+        self._exercise_defaults = {}
+        self._default = current_app.config.get("DEFAULT_STARTING_METRIC", 100)
+
+    def for_page(self, rows):
+        sessions = [r.get("homework_sessions_v2") or {} for r in rows]
+        overrides = db.get_starting_metric_overrides({s["user_id"] for s in sessions if s.get("user_id")})
+        out = []
+        for s in sessions:
+            uid, ex_id = s.get("user_id"), s.get("recommended_exercise_id")
+            if uid in overrides:
+                out.append(overrides[uid])
+                continue
+            if ex_id and ex_id not in self._exercise_defaults:
+                ex = db.get_exercise_by_id(ex_id)
+                self._exercise_defaults[ex_id] = ex.get("default_starting_metric") if ex else None
+            default = self._exercise_defaults.get(ex_id) if ex_id else None
+            out.append(default if default is not None else self._default)
+        return out
+
+
+def run(dry_run=True, page_size=PAGE_SIZE, workers=2, recompute_starting_metric=False, after_id=None,
+        diff_out=sys.stdout, progress_out=sys.stderr):
+    """
+    Re-score every recording with a transcript. dry_run prints one diff line per changed recording instead
+    of writing. after_id resumes from the last_id printed in a progress line. Returns the totals dict.
+    """
+    starting = _StartingMetrics() if recompute_starting_metric else None
+    default_start = current_app.config.get("DEFAULT_STARTING_METRIC", 100)  # same fallback as finalize
+    total = db.count_scored_recordings()
+    totals = {"scanned": 0, "changed": 0, "written": 0, "last_id": after_id}
+    t0 = time.monotonic()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        page = db.list_recordings_for_rescore(after_id, page_size)
+        while page:
+            # Each recording is scored with its exercise's profile (loaded once per exercise, then cached)
+            profiles = [get_profile((r.get("homework_sessions_v2") or {}).get("recommended_exercise_id")) for r in page]
+            items = [(r.get("transcript") or "", p.filler_words) for r, p in zip(page, profiles)]
+            futures = [pool.submit(_count_chunk, chunk) for chunk in _split(items, workers)]
+            # Fetch the next page while the pool counts this one
+            next_page = db.list_recordings_for_rescore(page[-1]["id"], page_size) if len(page) == page_size else []
+            counts = [c for f in futures for c in f.result()]
+            metrics = starting.for_page(page) if starting else [r.get("starting_metric") for r in page]
+
+            updates = []
+            for row, profile, fillers, start in zip(page, profiles, counts, metrics):
+                start = int(start if start is not None else default_start)
+                score = profile.score(start, fillers)
+                old_score = float(row["score"]) if row.get("score") is not None else None
+                if fillers == row.get("filler_count") and start == row.get("starting_metric") and old_score == score:
+                    continue
+                updates.append({"recording_id": row["id"], "filler_count": fillers, "starting_metric": start, "score": score})
+                if dry_run:
+                    print(
+                        f"{row['id']}\tfillers {row.get('filler_count')} -> {fillers}"
+                        f"\tstart {row.get('starting_metric')} -> {start}\tscore {old_score} -> {score}",
+                        file=diff_out,
+                    )
+            if updates and not dry_run:
+                db.apply_rescore_batch(updates)
+                totals["written"] += len(updates)
+
+            totals["scanned"] += len(page)
+            totals["changed"] += len(updates)
+            totals["last_id"] = page[-1]["id"]
+            elapsed = time.monotonic() - t0
+            rate = totals["scanned"] / elapsed if elapsed > 0 else 0.0
+            eta = (total - totals["scanned"]) / rate if rate > 0 and total > totals["scanned"] else 0
+            pct = 100.0 * totals["scanned"] / total if total else 100.0
+            print(
+                f"{totals['scanned']:,}/{total:,} ({pct:.1f}%)  changed {totals['changed']:,}  "
+                f"{rate:,.0f} rec/s  eta {_fmt_duration(eta)}  last_id={totals['last_id']}",
+                file=progress_out,
+                flush=True,
+            )
+            page = next_page
+
+    return totals
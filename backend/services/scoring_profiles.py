@@ -0,0 +1,114 @@
+"""
+Per-exercise scoring profiles: filler vocabulary, points per filler and pace targets (WPM min/max).
+A profile is compiled once (filler patterns included) and cached per process by exercise id + scoring_version;
+callers pass the version they already have from the session row or begin_finalize, so the hot paths
+(process_window, process_recording_finalize) do no DB lookups or regex compilation.
+Admin edits call invalidate(); other workers reload when they see the bumped scoring_version.
+Exercises without overrides (and sessions without an exercise) use FILLER_WORDS / POINTS_PER_FILLER.
+"""
+import threading
+import time
+from flask import current_app
+from services import db
+from services.metrics_v2 import POINTS_PER_FILLER, filler_matcher, get_filler_words
+
+# Entries looked up without a version are re-read after this long, so a stale profile can't live forever
+UNVERSIONED_MAX_AGE_SEC = 300
+
+_profiles: dict = {}  # exercise_id -> ScoringProfile
+_lock = threading.Lock()
+
+
+class ScoringProfile:
+    def __init__(self, exercise_id=None, version=0, filler_words=(), points_per_filler=POINTS_PER_FILLER,
+                 wpm_min=None, wpm_max=None):
+        self.exercise_id = exercise_id
+        self.version = version
+        self.filler_words = tuple(w.lower() for w in filler_words if w and w.strip())
+        self.points_per_filler = points_per_filler
+        self.wpm_min = wpm_min
+        self.wpm_max = wpm_max
+        self.loaded_at = time.monotonic()
+        self._patterns = filler_matcher(self.filler_words)
+
+    def count_fillers(self, transcript: str) -> int:
+        if not transcript or not transcript.strip():
+            return 0
+        text = transcript.lower()
+        return sum(len(p.findall(text)) for p in self._patterns)
+
+    def score(self, starting_metric: int, filler_count: int) -> float:
+        return max(0.0, float(starting_metric - self.points_per_filler * filler_count))
+
+    def pace(self, wpm):
+        """Pace against the exercise's WPM targets: "slow", "on_target" or "fast"; None without targets or WPM."""
+        if not wpm or (self.wpm_min is None and self.wpm_max is None):
+            return None
+        if self.wpm_min is not None and wpm < self.wpm_min:
+            return "slow"
+        if self.wpm_max is not None and wpm > self.wpm_max:
+            return "fast"
+        return "on_target"
+
+    def targets(self):
+        return {"min": self.wpm_min, "max": self.wpm_max}
+
+
+def _default_profile():
+    words = tuple(get_filler_words())
+    points = current_app.config.get("POINTS_PER_FILLER", POINTS_PER_FILLER)
+    with _lock:
+        p = _profiles.get(None)
+        if p is None or p.filler_words != tuple(w.lower() for w in words) or p.points_per_filler != points:
+            p = _profiles[None] = ScoringProfile(None, 0, words, points)
+        return p
+
+
+def _compile(exercise: dict) -> ScoringProfile:
+    return ScoringProfile(
+        exercise_id=exercise["id"],
+        version=exercise.get("scoring_version") or 1,
+        filler_words=exercise.get("filler_words") or get_filler_words(),
+        points_per_filler=(
+            exercise["points_per_filler"] if exercise.get("points_per_filler") is not None
+            else current_app.config.get("POINTS_PER_FILLER", POINTS_PER_FILLER)
+        ),
+        wpm_min=exercise.get("target_wpm_min"),
+        wpm_max=exercise.get("target_wpm_max"),
+    )
+
+
+def get_profile(exercise_id: str = None, version: int = None) -> ScoringProfile:
+    """
+    Compiled profile for the exercise. Pass the scoring_version you have (session embed or begin_finalize)
+    so a newer version triggers one reload; without it a cached entry is trusted for UNVERSIONED_MAX_AGE_SEC.
+    """
+    if not exercise_id:
+        return _default_profile()
+    key = str(exercise_id)
+    with _lock:
+        p = _profiles.get(key)
+    if p is not None:
+        if version is not None and p.version >= version:
+            return p
+        if version is None and time.monotonic() - p.loaded_at < UNVERSIONED_MAX_AGE_SEC:
+            return p
+    try:
+        exercise = db.get_exercise_by_id(key)
+    except Exception:
+        exercise = None
+    if not exercise:
+        return p or _default_profile()
+    p = _compile(exercise)
+    with _lock:
+        _profiles[key] = p
+    return p
+
+
+def invalidate(exercise_id: str = None):
+    """Drop the cached profile for one exercise (or all) after an admin edit."""
+    with _lock:
+        if exercise_id is None:
+            _profiles.clear()
+        else:
+            _profiles.pop(str(exercise_id), None)
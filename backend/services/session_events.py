@@ -0,0 +1,69 @@
+"""
+In-process session state events for long-poll and SSE
+(processing, transcribed, scored, report_ready, summary_delta, summary_ready, failed).
+Finalize publishes; /status, /report and /events wait on them. Events are per worker process: a waiter on
+another worker simply times out and re-reads the DB, so this only speeds delivery, never decides correctness.
+"""
+import threading
+import time
+
+# { session_id: { "version": int, "events": [(version, name, data)], "touched": float } }
+_channels: dict = {}
+_cond = threading.Condition()
+# Versions come from one process-wide counter seeded from the clock (ms), so a channel recreated after eviction,
+# or a restarted worker, never hands out an id at or below one a client already saw (SSE Last-Event-ID)
+_seq = int(time.time() * 1000)
+
+MAX_EVENTS = 20      # recent events kept per session
+MAX_CHANNELS = 1000  # oldest channels evicted past this
+
+TERMINAL_EVENTS = ("report_ready", "failed")        # report exists (or never will)
+STREAM_END_EVENTS = ("summary_ready", "failed")     # nothing more will be published
+
+
+def publish(session_id: str, event: str, data: dict = None):
+    """Record an event for the session and wake all waiters."""
+    global _seq
+    session_id = str(session_id)
+    with _cond:
+        ch = _channels.get(session_id)
+        if ch is None:
+            if len(_channels) >= MAX_CHANNELS:
+                oldest = min(_channels, key=lambda k: _channels[k]["touched"])
+                del _channels[oldest]
+            ch = _channels[session_id] = {"version": 0, "events": [], "touched": 0.0}
+        _seq += 1
+        ch["version"] = _seq
+        ch["events"].append((ch["version"], event, data or {}))
+        del ch["events"][:-MAX_EVENTS]
+        ch["touched"] = time.monotonic()
+        _cond.notify_all()
+
+
+def current_version(session_id: str) -> int:
+    with _cond:
+        ch = _channels.get(str(session_id))
+        return ch["version"] if ch else 0
+
+
+def wait_for_events(session_id: str, after_version: int, timeout: float):
+    """
+    Block until the session has events newer than after_version or timeout passes.
+    Returns a list of (version, name, data); empty on timeout.
+    """
+    session_id = str(session_id)
+    deadline = time.monotonic() + max(0.0, timeout)
+    with _cond:
+        while True:
+            ch = _channels.get(session_id)
+            if ch and ch["version"] > after_version:
+                return [e for e in ch["events"] if e[0] > after_version]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            _cond.wait(remaining)
+
+
+def get_stats() -> dict:
+    with _cond:
+        return {"channels": len(_channels), "events": sum(len(ch["events"]) for ch in _channels.values())}
@@ -0,0 +1,95 @@
+"""
+Timeline metrics from word timestamps: pacing timeline, pauses, filler positions, pace variance.
+Computed in one vectorized NumPy pass and stored compactly on recordings_v2.timeline
+(times in integer ms, position arrays delta-encoded).
+"""
+import re
+
+BUCKET_SEC = 10          # pacing timeline resolution
+PAUSE_MIN_SEC = 0.3      # gaps shorter than this are normal articulation
+PAUSE_BIN_EDGES = [0.3, 0.5, 1.0, 2.0, 3.0]  # last bin is open-ended
+LONGEST_PAUSES = 3
+TIMELINE_VERSION = 1
+
+
+def _delta_encode(values):
+    out, prev = [], 0
+    for v in values:
+        out.append(v - prev)
+        prev = v
+    return out
+
+
+def _delta_decode(deltas):
+    out, acc = [], 0
+    for d in deltas:
+        acc += d
+        out.append(acc)
+    return out
+
+
+def compute_timeline(words, filler_words):
+    """
+    words: list of (word, start_sec, end_sec) in spoken order. filler_words: filler phrases ("um", "you know").
+    Returns the compact timeline dict, or None when there are no timestamps.
+    """
+    import numpy as np
+
+    if not words:
+        return None
+    starts = np.fromiter((w[1] for w in words), dtype=np.float64, count=len(words))
+    ends = np.fromiter((w[2] for w in words), dtype=np.float64, count=len(words))
+    tokens = np.array([re.sub(r"[^\w']", "", w[0].lower()) for w in words])
+    n = tokens.size
+
+    # Pauses: gaps between consecutive words
+    gaps = starts[1:] - ends[:-1]
+    pause_idx = np.flatnonzero(gaps >= PAUSE_MIN_SEC)
+    pauses = gaps[pause_idx]
+    hist, _ = np.histogram(pauses, bins=PAUSE_BIN_EDGES + [np.inf])
+    top = pause_idx[np.argsort(pauses)[::-1][:LONGEST_PAUSES]]
+
+    # Pacing: words started in each bucket, scaled to words per minute
+    buckets = (starts // BUCKET_SEC).astype(np.int64)
+    per_bucket = np.bincount(buckets, minlength=int(buckets[-1]) + 1)
+    wpm_timeline = per_bucket * (60.0 / BUCKET_SEC)
+    # Last bucket is usually partial; leave it out of the variance
+    full = wpm_timeline[:-1] if wpm_timeline.size > 1 else wpm_timeline
+
+    # Filler positions: match each phrase over shifted token windows
+    filler_mask = np.zeros(n, dtype=bool)
+    for phrase in filler_words:
+        parts = phrase.lower().split()
+        k = len(parts)
+        if not k or k > n:
+            continue
+        hit = np.ones(n - k + 1, dtype=bool)
+        for i, p in enumerate(parts):
+            hit &= tokens[i:n - k + 1 + i] == p
+        filler_mask[: n - k + 1] |= hit
+
+    speaking_sec = float(ends[-1] - starts[0])
+    filler_ms = np.round(starts[filler_mask] * 1000).astype(np.int64)
+    return {
+        "v": TIMELINE_VERSION,
+        "bucket_sec": BUCKET_SEC,
+        "word_count": int(n),
+        "speaking_sec": round(speaking_sec, 2),
+        "wpm": round(n / (speaking_sec / 60.0), 1) if speaking_sec > 0 else 0.0,
+        "wpm_timeline": [int(round(x)) for x in wpm_timeline],
+        "pace_std": round(float(np.std(full)), 1),
+        "pause_count": int(pauses.size),
+        "pause_total_sec": round(float(pauses.sum()), 2),
+        "pause_hist": {"edges": PAUSE_BIN_EDGES, "counts": [int(c) for c in hist]},
+        "longest_pauses_ms": [[int(round(ends[i] * 1000)), int(round(gaps[i] * 1000))] for i in top],
+        "filler_pos_ms_delta": _delta_encode(int(x) for x in filler_ms),
+    }
+
+
+def expand_timeline(timeline):
+    """Decode the stored form for API output (delta arrays -> absolute positions)."""
+    if not timeline:
+        return None
+    out = dict(timeline)
+    out["filler_pos_ms"] = _delta_decode(out.pop("filler_pos_ms_delta", []))
+    return out
@@ -0,0 +1,135 @@
+"""
+Transcription engines: hosted Whisper API or a local CPU model (faster-whisper), chosen per purpose.
+Policy: TRANSCRIBE_LIVE_ENGINE for live windows, TRANSCRIBE_FINALIZE_ENGINE for the full recording.
+Values: "openai", "local", or "auto" (local if faster-whisper is installed and loads, else openai).
+"""
+import io
+import queue
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from flask import current_app
+from services.openai_service import transcribe_audio as _openai_transcribe
+from services.openai_service import transcribe_audio_words as _openai_transcribe_words
+
+
+class TranscriptionEngine(ABC):
+    """An engine must implement transcribe; one that doesn't fails when constructed, not on first request."""
+    name = "base"
+
+    @abstractmethod
+    def transcribe(self, audio_bytes: bytes, filename: str = "audio.webm") -> str:
+        ...
+
+    def transcribe_words(self, audio_bytes: bytes, filename: str = "audio.webm"):
+        """(text, [(word, start_sec, end_sec), ...]); engines without timestamps return no words."""
+        return self.transcribe(audio_bytes, filename), []
+
+
+class OpenAIWhisperEngine(TranscriptionEngine):
+    """Hosted whisper-1 via the OpenAI API."""
+    name = "openai"
+
+    def transcribe(self, audio_bytes: bytes, filename: str = "audio.webm") -> str:
+        return _openai_transcribe(audio_bytes, filename)
+
+    def transcribe_words(self, audio_bytes: bytes, filename: str = "audio.webm"):
+        return _openai_transcribe_words(audio_bytes, filename)
+
+
+class LocalWhisperEngine(TranscriptionEngine):
+    """
+    faster-whisper (CTranslate2) on CPU with quantized weights. The model is loaded once per process and
+    shared; requests from all sessions go through one queue drained by `workers` threads, which map onto
+    the model's own `num_workers` so several windows decode in parallel on the same weights.
+    """
+    name = "local"
+
+    def __init__(self, model_size: str = "base", compute_type: str = "int8", cpu_threads: int = 0, workers: int = 2):
+        from faster_whisper import WhisperModel  # optional dependency; ImportError handled by get_engine
+
+        self._model = WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=workers,
+        )
+        self._queue: queue.Queue = queue.Queue()
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"local-whisper-{i}", daemon=True).start()
+
+    def _worker(self):
+        while True:
+            audio_bytes, with_words, fut = self._queue.get()
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                segments, _info = self._model.transcribe(
+                    io.BytesIO(audio_bytes), beam_size=1, vad_filter=False, word_timestamps=with_words
+                )
+                segments = list(segments)
+                text = " ".join(s.text.strip() for s in segments).strip()
+                words = [(w.word, w.start, w.end) for s in segments for w in (s.words or [])] if with_words else []
+                fut.set_result((text, words))
+            except Exception as e:
+                fut.set_exception(e)
+
+    def _submit(self, audio_bytes: bytes, with_words: bool):
+        fut: Future = Future()
+        self._queue.put((audio_bytes, with_words, fut))
+        return fut.result()
+
+    def transcribe(self, audio_bytes: bytes, filename: str = "audio.webm") -> str:
+        return self._submit(audio_bytes, False)[0]
+
+    def transcribe_words(self, audio_bytes: bytes, filename: str = "audio.webm"):
+        return self._submit(audio_bytes, True)
+
+
+_openai_engine = OpenAIWhisperEngine()
+_local_engine = None
+_local_error = None
+_local_lock = threading.Lock()
+
+
+def _get_local_engine():
+    """Load the local model once per process; remember a failure so we don't retry on every call."""
+    global _local_engine, _local_error
+    if _local_engine is not None or _local_error is not None:
+        return _local_engine
+    cfg = current_app.config
+    with _local_lock:
+        if _local_engine is None and _local_error is None:
+            try:
+                _local_engine = LocalWhisperEngine(
+                    model_size=cfg.get("LOCAL_WHISPER_MODEL", "base"),
+                    compute_type=cfg.get("LOCAL_WHISPER_COMPUTE_TYPE", "int8"),
+                    cpu_threads=cfg.get("LOCAL_WHISPER_CPU_THREADS", 0),
+                    workers=cfg.get("LOCAL_WHISPER_WORKERS", 2),
+                )
+            except Exception as e:
+                _local_error = e
+    return _local_engine
+
+
+def get_engine(purpose: str = "finalize") -> TranscriptionEngine:
+    """Engine for "live" (short windows during recording) or "finalize" (full recording)."""
+    key = "TRANSCRIBE_LIVE_ENGINE" if purpose == "live" else "TRANSCRIBE_FINALIZE_ENGINE"
+    choice = (current_app.config.get(key) or "openai").lower()
+    if choice in ("local", "auto"):
+        engine = _get_local_engine()
+        if engine is not None:
+            return engine
+        if choice == "local":
+            raise RuntimeError(f"Local transcription engine unavailable: {_local_error}")
+    return _openai_engine
+
+
+def transcribe(audio_bytes: bytes, filename: str = "audio.webm", purpose: str = "finalize") -> str:
+    return get_engine(purpose).transcribe(audio_bytes, filename)
+
+
+def transcribe_words(audio_bytes: bytes, filename: str = "audio.webm", purpose: str = "finalize"):
+    """(text, [(word, start_sec, end_sec), ...]) from the engine for this purpose."""
+    return get_engine(purpose).transcribe_words(audio_bytes, filename)
@@ -0,0 +1,136 @@
+"""
+Voice-activity gate for live windows: decode to 16 kHz mono PCM, find speech by frame energy,
+skip windows with no speech and trim leading/trailing silence from the rest.
+Decoding uses PyAV (`av` in requirements.txt); without it, or if a window can't be decoded,
+the gate passes the original bytes through unchanged.
+"""
+import io
+import threading
+import wave
+from flask import current_app
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FLOOR_SPREAD_DB = 15.0  # p90 - p10 frame level above which the window's quietest frames count as a noise floor
+
+_stats = {
+    "windows_checked": 0,
+    "windows_skipped": 0,
+    "windows_trimmed": 0,
+    "windows_undecodable": 0,
+    "seconds_skipped": 0.0,
+    "seconds_trimmed": 0.0,
+}
+_stats_lock = threading.Lock()
+
+
+def _count(**deltas):
+    with _stats_lock:
+        for k, v in deltas.items():
+            _stats[k] += v
+
+
+def get_stats() -> dict:
+    with _stats_lock:
+        out = dict(_stats)
+    out["seconds_skipped"] = round(out["seconds_skipped"], 1)
+    out["seconds_trimmed"] = round(out["seconds_trimmed"], 1)
+    return out
+
+
+def decode_pcm16k(audio_bytes: bytes):
+    """Decode any container PyAV understands to int16 mono 16 kHz samples; None if not decodable."""
+    try:
+        import av
+        import numpy as np
+    except ImportError:
+        return None
+    try:
+        container = av.open(io.BytesIO(audio_bytes))
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+        parts = []
+        for frame in container.decode(audio=0):
+            for out in resampler.resample(frame):
+                parts.append(out.to_ndarray().reshape(-1))
+        for out in resampler.resample(None):
+            parts.append(out.to_ndarray().reshape(-1))
+        container.close()
+    except Exception:
+        return None
+    if not parts:
+        return None
+    return np.concatenate(parts).astype(np.int16, copy=False)
+
+
+def speech_bounds(samples, threshold_dbfs: float = -45.0, min_speech_ms: int = 200, pad_ms: int = 200):
+    """
+    (start, end) sample indices of the speech region, or None if no speech.
+    A frame is speech if its RMS is above threshold_dbfs and, when the window has a real quiet floor (its 10th and
+    90th percentile frame levels are more than FLOOR_SPREAD_DB apart), also above that floor + 10 dB. In a window
+    of continuous speech the quietest frames are speech too, so only the absolute threshold applies.
+    """
+    import numpy as np
+
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    n = samples.size // frame
+    if n == 0:
+        return None
+    x = samples[: n * frame].astype(np.float32).reshape(n, frame) / 32768.0
+    db = 20.0 * np.log10(np.sqrt(np.mean(x * x, axis=1)) + 1e-10)
+    p10, p90 = (float(v) for v in np.percentile(db, [10, 90]))
+    threshold = max(threshold_dbfs, p10 + 10.0) if p90 - p10 > FLOOR_SPREAD_DB else threshold_dbfs
+    voiced = np.flatnonzero(db > threshold)
+    if voiced.size * FRAME_MS < min_speech_ms:
+        return None
+    pad = pad_ms // FRAME_MS
+    start = max(0, int(voiced[0]) - pad) * frame
+    end = min(n, int(voiced[-1]) + 1 + pad) * frame
+    return start, end
+
+
+def _to_wav(samples) -> bytes:
+    out = io.BytesIO()
+    with wave.open(out, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(samples.tobytes())
+    return out.getvalue()
+
+
+def gate_window(audio_bytes: bytes, filename: str = "chunk.webm", header: bytes = None):
+    """
+    Return (audio_bytes, filename) to transcribe, or (None, None) if the window holds no speech.
+    Trimmed windows are re-encoded as 16 kHz mono WAV; if trimming saves under 1 s the original bytes are kept.
+    header: the recording's first chunk, when the window starts after it. WebM clusters past the first chunk
+    can't be decoded on their own, so the window is decoded behind the header and the header's own audio is cut
+    off again; such a window is always returned as WAV (or, if undecodable, as header + window).
+    """
+    cfg = current_app.config
+    if not cfg.get("VAD_ENABLED", True):
+        return (header + audio_bytes if header else audio_bytes), filename
+    _count(windows_checked=1)
+    samples = decode_pcm16k(header + audio_bytes if header else audio_bytes)
+    if samples is None:
+        _count(windows_undecodable=1)
+        return (header + audio_bytes if header else audio_bytes), filename
+    if header:
+        header_samples = decode_pcm16k(header)
+        samples = samples[header_samples.size if header_samples is not None else 0:]
+    total_sec = samples.size / SAMPLE_RATE
+    bounds = speech_bounds(
+        samples,
+        threshold_dbfs=cfg.get("VAD_ENERGY_DBFS", -45.0),
+        min_speech_ms=cfg.get("VAD_MIN_SPEECH_MS", 200),
+        pad_ms=cfg.get("VAD_PAD_MS", 200),
+    )
+    if bounds is None:
+        _count(windows_skipped=1, seconds_skipped=total_sec)
+        return None, None
+    start, end = bounds
+    trimmed_sec = (samples.size - (end - start)) / SAMPLE_RATE
+    if trimmed_sec < 1.0 and not header:
+        return audio_bytes, filename
+    if trimmed_sec >= 1.0:
+        _count(windows_trimmed=1, seconds_trimmed=trimmed_sec)
+    return _to_wav(samples[start:end]), "chunk.wav"
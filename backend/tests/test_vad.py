@@ -0,0 +1,83 @@
+"""
+speech_bounds on synthetic windows. Run from backend/: python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from services.vad import SAMPLE_RATE, speech_bounds
+
+
+def _am_noise(seconds: float, floor: float, level: float = 0.3, rate_hz: float = 4.0, seed: int = 0):
+    """Noise amplitude-modulated between floor*level and level, like a syllable envelope."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = floor + (1.0 - floor) * 0.5 * (1.0 + np.sin(2 * np.pi * rate_hz * t))
+    return (rng.standard_normal(t.size) * level * envelope * 32767).clip(-32768, 32767).astype(np.int16)
+
+
+@pytest.mark.parametrize("floor", [0.2, 0.3, 0.4, 0.5])
+def test_continuous_speech_is_detected(floor):
+    samples = _am_noise(6.0, floor)
+    assert speech_bounds(samples) == (0, samples.size - samples.size % (SAMPLE_RATE * 30 // 1000))
+
+
+def test_silence_is_skipped():
+    samples = (np.random.default_rng(1).standard_normal(6 * SAMPLE_RATE) * 10).astype(np.int16)  # about -70 dBFS
+    assert speech_bounds(samples) is None
+
+
+def test_speech_between_quiet_floor_is_trimmed():
+    quiet = (np.random.default_rng(2).standard_normal(2 * SAMPLE_RATE) * 60).astype(np.int16)  # about -55 dBFS
+    speech = _am_noise(2.0, 0.3, seed=3)
+    samples = np.concatenate([quiet, speech, quiet])
+    start, end = speech_bounds(samples)
+    assert 0 < start <= 2 * SAMPLE_RATE
+    assert 4 * SAMPLE_RATE <= end < samples.size
+
+
+def _webm_clusters(samples):
+    """Encode to WebM/Opus; returns the file split at its Cluster boundaries (the first part carries the header)."""
+    av = pytest.importorskip("av")
+    import io
+
+    out = io.BytesIO()
+    container = av.open(out, "w", format="webm")
+    stream = container.add_stream("libopus", rate=48000)
+    stream.layout = "mono"
+    upsampled = np.repeat(samples, 3)
+    for i in range(0, upsampled.size, 960):
+        frame = av.AudioFrame.from_ndarray(upsampled[i:i + 960].reshape(1, -1), format="s16", layout="mono")
+        frame.rate = 48000
+        for packet in stream.encode(frame):
+            container.mux(packet)
+    for packet in stream.encode(None):
+        container.mux(packet)
+    container.close()
+    data = out.getvalue()
+    starts = [i for i in range(len(data)) if data[i:i + 4] == b"\x1f\x43\xb6\x75"]
+    bounds = [0] + starts[1:] + [len(data)]
+    return [data[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+@pytest.fixture
+def app_ctx():
+    from flask import Flask
+
+    app = Flask(__name__)
+    app.config.update(VAD_ENABLED=True)
+    with app.app_context():
+        yield
+
+
+def test_window_after_header_is_gated(app_ctx):
+    from services.vad import decode_pcm16k, gate_window
+
+    quiet = (np.random.default_rng(4).standard_normal(6 * SAMPLE_RATE) * 10).astype(np.int16)
+    header, *rest = _webm_clusters(np.concatenate([_am_noise(6.0, 0.3, seed=5), quiet, quiet]))
+    assert len(rest) >= 2
+    tail = rest[-1]
+    assert decode_pcm16k(tail) is None  # later clusters alone have no header
+    assert gate_window(tail, "chunk.webm", header=header) == (None, None)  # silent window is skipped
+    audio, filename = gate_window(b"".join(rest), "chunk.webm", header=header)
+    assert filename == "chunk.wav"
+    assert audio.startswith(b"RIFF")
@@ -12,14 +12,35 @@ import {
   createExercise,
   updateExercise,
   getReportsList,
+  getFeedbackInbox,
+  downloadReportsExport,
   getReportById,
   submitReportFeedback,
 } from "@/lib/admin-api";
-import type { Student } from "@/lib/admin-api";
+import type { Student, InboxItem, PendingCount } from "@/lib/admin-api";
 import * as Dialog from "@radix-ui/react-dialog";
+import { TranscriptSearch } from "@/components/TranscriptSearch";
 
 type Task1 = { id: string; title: string; body?: string; active: boolean; sort_order?: number };
-type Exercise = { id: string; name: string; description?: string; default_starting_metric: number };
+type Exercise = {
+  id: string;
+  name: string;
+  description?: string;
+  default_starting_metric: number;
+  filler_words?: string[] | null;
+  points_per_filler?: number | null;
+  target_wpm_min?: number | null;
+  target_wpm_max?: number | null;
+};
+
+function scoringSummary(e: Exercise): string {
+  const parts = [
+    e.filler_words?.length ? e.filler_words.join(", ") : "default fillers",
+    e.points_per_filler != null ? `${e.points_per_filler} pts/filler` : null,
+    e.target_wpm_min != null || e.target_wpm_max != null ? `${e.target_wpm_min ?? "…"}–${e.target_wpm_max ?? "…"} wpm` : null,
+  ];
+  return parts.filter(Boolean).join(" · ");
+}
 type ReportRow = {
   id: string;
   session_id: string;
@@ -35,6 +56,12 @@ export default function AdminPage() {
   const [task1Pool, setTask1Pool] = useState<Task1[]>([]);
   const [exercises, setExercises] = useState<Exercise[]>([]);
   const [reports, setReports] = useState<ReportRow[]>([]);
+  const [inbox, setInbox] = useState<InboxItem[]>([]);
+  const [inboxCursor, setInboxCursor] = useState<string | null>(null);
+  const [inboxStudent, setInboxStudent] = useState("");
+  const [inboxMinAge, setInboxMinAge] = useState("");
+  const [pendingCounts, setPendingCounts] = useState<PendingCount[]>([]);
+  const [totalPending, setTotalPending] = useState(0);
 
   const [studentId, setStudentId] = useState("");
   const [task1Id, setTask1Id] = useState("");
@@ -56,6 +83,10 @@ export default function AdminPage() {
   const [exEditName, setExEditName] = useState("");
   const [exEditDescription, setExEditDescription] = useState("");
   const [exEditMetric, setExEditMetric] = useState(100);
+  const [exEditFillers, setExEditFillers] = useState("");
+  const [exEditPoints, setExEditPoints] = useState("");
+  const [exEditWpmMin, setExEditWpmMin] = useState("");
+  const [exEditWpmMax, setExEditWpmMax] = useState("");
 
   const [error, setError] = useState("");
   const [reportModal, setReportModal] = useState<ReportRow | null>(null);
@@ -75,10 +106,32 @@ export default function AdminPage() {
     getReportsList().then(setReports).catch(() => setReports([]));
   }
 
+  function loadInbox(cursor: string | null = null) {
+    getFeedbackInbox({
+      student_id: inboxStudent || undefined,
+      min_age_hours: inboxMinAge ? Number(inboxMinAge) : undefined,
+      cursor,
+    })
+      .then((res) => {
+        setInbox((prev) => (cursor ? [...prev, ...res.items] : res.items));
+        setInboxCursor(res.next_cursor);
+        setPendingCounts(res.pending_by_student);
+        setTotalPending(res.total_pending);
+      })
+      .catch(() => {
+        if (!cursor) setInbox([]);
+        setInboxCursor(null);
+      });
+  }
+
   useEffect(() => {
     loadData();
   }, []);
 
+  useEffect(() => {
+    loadInbox();
+  }, [inboxStudent, inboxMinAge]);
+
   useEffect(() => {
     if (!reportModal) return;
     getReportById(reportModal.id).then(setReportDetail).catch(() => setReportDetail(null));
@@ -176,6 +229,10 @@ export default function AdminPage() {
     setExEditName(e.name);
     setExEditDescription(e.description || "");
     setExEditMetric(e.default_starting_metric);
+    setExEditFillers((e.filler_words || []).join(", "));
+    setExEditPoints(e.points_per_filler != null ? String(e.points_per_filler) : "");
+    setExEditWpmMin(e.target_wpm_min != null ? String(e.target_wpm_min) : "");
+    setExEditWpmMax(e.target_wpm_max != null ? String(e.target_wpm_max) : "");
   }
 
   async function saveEditExercise() {
@@ -186,6 +243,11 @@ export default function AdminPage() {
         name: exEditName,
         description: exEditDescription || undefined,
         default_starting_metric: exEditMetric,
+        // Empty fields clear the override (falls back to the global filler list / points)
+        filler_words: exEditFillers,
+        points_per_filler: exEditPoints === "" ? null : Number(exEditPoints),
+        target_wpm_min: exEditWpmMin === "" ? null : Number(exEditWpmMin),
+        target_wpm_max: exEditWpmMax === "" ? null : Number(exEditWpmMax),
       });
       setExEditId(null);
       loadData();
@@ -202,6 +264,7 @@ export default function AdminPage() {
       const res = await submitReportFeedback(reportModal.id, feedbackText);
       setReportModal(null);
       loadData();
+      loadInbox();
       if (res.warning) setError(res.warning);
     } catch (e) {
       setError(e instanceof Error ? e.message : "Failed");
@@ -238,6 +301,11 @@ export default function AdminPage() {
         </ul>
       </section>
 
+      <section>
+        <h2 className="text-lg font-medium mb-3">Search transcripts</h2>
+        <TranscriptSearch students={students} exercises={exercises} />
+      </section>
+
       <section>
         <h2 className="text-lg font-medium mb-3">Send homework (quick)</h2>
         <form onSubmit={handleSendHomework} className="space-y-3 max-w-md">
@@ -430,6 +498,7 @@ export default function AdminPage() {
                 <th className="text-left p-2">Name</th>
                 <th className="text-left p-2">Description</th>
                 <th className="text-left p-2">Starting metric</th>
+                <th className="text-left p-2">Scoring</th>
                 <th className="text-left p-2"></th>
               </tr>
             </thead>
@@ -472,6 +541,46 @@ export default function AdminPage() {
                       e.default_starting_metric
                     )}
                   </td>
+                  <td className="p-2 max-w-xs">
+                    {exEditId === e.id ? (
+                      <div className="space-y-1">
+                        <input
+                          value={exEditFillers}
+                          onChange={(ev) => setExEditFillers(ev.target.value)}
+                          className="w-full px-2 py-1 border rounded"
+                          placeholder="Filler words, comma-separated (empty = default)"
+                        />
+                        <div className="flex gap-1">
+                          <input
+                            type="number"
+                            value={exEditPoints}
+                            onChange={(ev) => setExEditPoints(ev.target.value)}
+                            className="w-20 px-2 py-1 border rounded"
+                            placeholder="Pts"
+                            min={0}
+                          />
+                          <input
+                            type="number"
+                            value={exEditWpmMin}
+                            onChange={(ev) => setExEditWpmMin(ev.target.value)}
+                            className="w-20 px-2 py-1 border rounded"
+                            placeholder="WPM min"
+                            min={0}
+                          />
+                          <input
+                            type="number"
+                            value={exEditWpmMax}
+                            onChange={(ev) => setExEditWpmMax(ev.target.value)}
+                            className="w-20 px-2 py-1 border rounded"
+                            placeholder="WPM max"
+                            min={0}
+                          />
+                        </div>
+                      </div>
+                    ) : (
+                      <span className="text-gray-600">{scoringSummary(e)}</span>
+                    )}
+                  </td>
                   <td className="p-2">
                     {exEditId === e.id ? (
                       <button type="button" onClick={saveEditExercise} className="text-blue-600 hover:underline">
@@ -494,7 +603,110 @@ export default function AdminPage() {
       </section>
 
       <section>
-        <h2 className="text-lg font-medium mb-3">Historical reports</h2>
+        <div className="flex items-center justify-between mb-3">
+          <h2 className="text-lg font-medium">Awaiting feedback ({totalPending})</h2>
+          <div className="flex gap-3 text-sm">
+            <select
+              value={inboxStudent}
+              onChange={(e) => setInboxStudent(e.target.value)}
+              className="px-2 py-1 border rounded"
+            >
+              <option value="">All students</option>
+              {pendingCounts.map((c) => (
+                <option key={c.user_id} value={c.user_id}>
+                  {students.find((s) => s.id === c.user_id)?.email || c.user_id} ({c.pending})
+                </option>
+              ))}
+            </select>
+            <select
+              value={inboxMinAge}
+              onChange={(e) => setInboxMinAge(e.target.value)}
+              className="px-2 py-1 border rounded"
+            >
+              <option value="">Any age</option>
+              <option value="24">Older than 1 day</option>
+              <option value="72">Older than 3 days</option>
+              <option value="168">Older than 1 week</option>
+            </select>
+          </div>
+        </div>
+        <div className="border rounded overflow-hidden">
+          <table className="w-full text-sm">
+            <thead className="bg-gray-50">
+              <tr>
+                <th className="text-left p-2">Date</th>
+                <th className="text-left p-2">Student</th>
+                <th className="text-left p-2">Exercise</th>
+                <th className="text-left p-2">Score</th>
+                <th className="text-left p-2"></th>
+              </tr>
+            </thead>
+            <tbody>
+              {inbox.map((r) => (
+                <tr key={r.id} className="border-t">
+                  <td className="p-2">{new Date(r.created_at).toLocaleDateString()}</td>
+                  <td className="p-2">{students.find((s) => s.id === r.user_id)?.email || r.user_id}</td>
+                  <td className="p-2">{r.homework_sessions_v2?.exercises_pool?.name ?? "—"}</td>
+                  <td className="p-2">{r.score}</td>
+                  <td className="p-2">
+                    <button
+                      type="button"
+                      onClick={() =>
+                        setReportModal({
+                          id: r.id,
+                          session_id: r.session_id,
+                          score: r.score ?? 0,
+                          summary: r.summary ?? "",
+                          coach_feedback_sent_at: null,
+                          created_at: r.created_at,
+                        })
+                      }
+                      className="text-blue-600 hover:underline"
+                    >
+                      Review
+                    </button>
+                  </td>
+                </tr>
+              ))}
+              {inbox.length === 0 && (
+                <tr>
+                  <td colSpan={5} className="p-2 text-gray-500">Nothing waiting for feedback.</td>
+                </tr>
+              )}
+            </tbody>
+          </table>
+        </div>
+        {inboxCursor && (
+          <button
+            type="button"
+            onClick={() => loadInbox(inboxCursor)}
+            className="mt-2 text-sm text-blue-600 hover:underline"
+          >
+            Load more
+          </button>
+        )}
+      </section>
+
+      <section>
+        <div className="flex items-center justify-between mb-3">
+          <h2 className="text-lg font-medium">Historical reports</h2>
+          <div className="flex gap-3 text-sm">
+            <button
+              type="button"
+              onClick={() => downloadReportsExport({ format: "csv" }).catch((e) => setError(e instanceof Error ? e.message : "Export failed"))}
+              className="text-blue-600 hover:underline"
+            >
+              Export CSV
+            </button>
+            <button
+              type="button"
+              onClick={() => downloadReportsExport({ format: "ndjson", gzip: true, include_transcript: true }).catch((e) => setError(e instanceof Error ? e.message : "Export failed"))}
+              className="text-blue-600 hover:underline"
+            >
+              Export NDJSON (gzip, with transcripts)
+            </button>
+          </div>
+        </div>
         <div className="border rounded overflow-hidden">
           <table className="w-full text-sm">
             <thead className="bg-gray-50">
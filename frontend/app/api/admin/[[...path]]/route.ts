@@ -14,6 +14,14 @@ export async function GET(req: NextRequest, { params }: { params: Promise<{ path
   const url = new URL(`/v2/admin/${pathStr}`, BACKEND);
   req.nextUrl.searchParams.forEach((v, k) => url.searchParams.set(k, v));
   const res = await fetch(url.toString(), { headers: { ...(auth && { Authorization: auth }) } });
+  const contentType = res.headers.get("content-type") || "";
+  if (res.ok && !contentType.includes("application/json")) {
+    // Streamed downloads (reports export): pass the body through without buffering
+    const headers = new Headers({ "Content-Type": contentType });
+    const disposition = res.headers.get("content-disposition");
+    if (disposition) headers.set("Content-Disposition", disposition);
+    return new Response(res.body, { status: res.status, headers });
+  }
   const data = await res.json().catch(() => ({}));
   return NextResponse.json(data, { status: res.status });
 }
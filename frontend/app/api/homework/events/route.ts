@@ -0,0 +1,22 @@
+import { NextRequest } from "next/server";
+
+const BACKEND = process.env.NEXT_PUBLIC_API_URL || "http://localhost:5000";
+
+export const dynamic = "force-dynamic";
+
+// Pass the backend SSE stream through untouched (session events: processing, transcribed, scored, report_ready).
+export async function GET(req: NextRequest) {
+  const auth = req.headers.get("authorization") || "";
+  const lastEventId = req.headers.get("last-event-id") || "";
+  const res = await fetch(`${BACKEND}/v2/homework/events`, {
+    headers: { ...(auth && { Authorization: auth }), ...(lastEventId && { "Last-Event-ID": lastEventId }) },
+    cache: "no-store",
+  });
+  return new Response(res.body, {
+    status: res.status,
+    headers: {
+      "Content-Type": res.headers.get("content-type") || "text/event-stream",
+      "Cache-Control": "no-cache",
+    },
+  });
+}
@@ -4,10 +4,15 @@ const BACKEND = process.env.NEXT_PUBLIC_API_URL || "http://localhost:5000";
 
 export async function POST(req: NextRequest) {
   const auth = req.headers.get("authorization");
+  const idempotencyKey = req.headers.get("idempotency-key");
   const body = await req.json().catch(() => ({}));
   const res = await fetch(`${BACKEND}/v2/homework/recordings/finalize`, {
     method: "POST",
-    headers: { "Content-Type": "application/json", ...(auth ? { Authorization: auth } : {}) },
+    headers: {
+      "Content-Type": "application/json",
+      ...(auth ? { Authorization: auth } : {}),
+      ...(idempotencyKey ? { "Idempotency-Key": idempotencyKey } : {}),
+    },
     body: JSON.stringify(body),
   });
   const data = await res.json().catch(() => ({}));
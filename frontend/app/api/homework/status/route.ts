@@ -4,9 +4,17 @@ const BACKEND = process.env.NEXT_PUBLIC_API_URL || "http://localhost:5000";
 
 export async function GET(req: NextRequest) {
   const auth = req.headers.get("authorization") || "";
-  const res = await fetch(`${BACKEND}/v2/homework/status`, {
-    headers: { ...(auth && { Authorization: auth }) },
+  const ifNoneMatch = req.headers.get("if-none-match") || "";
+  const url = new URL("/v2/homework/status", BACKEND);
+  req.nextUrl.searchParams.forEach((v, k) => url.searchParams.set(k, v));
+  const res = await fetch(url.toString(), {
+    headers: { ...(auth && { Authorization: auth }), ...(ifNoneMatch && { "If-None-Match": ifNoneMatch }) },
+    cache: "no-store",
   });
+  const etag = res.headers.get("etag");
+  if (res.status === 304) {
+    return new NextResponse(null, { status: 304, headers: etag ? { ETag: etag } : {} });
+  }
   const data = await res.json().catch(() => ({}));
-  return NextResponse.json(data, { status: res.status });
+  return NextResponse.json(data, { status: res.status, headers: etag ? { ETag: etag } : {} });
 }
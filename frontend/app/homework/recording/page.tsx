@@ -2,7 +2,8 @@
 
 import { useEffect, useRef, useState } from "react";
 import { useRouter } from "next/navigation";
-import { getStatus, finalizeRecording, sendStreamChunk } from "@/lib/api";
+import { getStatus, finalizeRecording, finalizeFromStream, sendStreamChunk } from "@/lib/api";
+import type { Pace } from "@/lib/api";
 
 function arrayBufferToBase64(buf: ArrayBuffer): string {
   const bytes = new Uint8Array(buf);
@@ -21,6 +22,7 @@ export default function RecordingPage() {
   const [error, setError] = useState("");
   const [liveTranscript, setLiveTranscript] = useState("");
   const [wpm, setWpm] = useState<number>(0);
+  const [pace, setPace] = useState<Pace | null>(null);
   const [voiceStrength, setVoiceStrength] = useState<number>(0);
   const [fillerCount, setFillerCount] = useState<number>(0);
   const [metricsUnavailable, setMetricsUnavailable] = useState(false);
@@ -29,6 +31,9 @@ export default function RecordingPage() {
   const chunksRef = useRef<Blob[]>([]);
   const startTimeRef = useRef<number>(0);
   const sequenceRef = useRef<number>(0);
+  const lastWindowIdRef = useRef<number>(0);
+  const finalizeKeyRef = useRef<string>("");
+  const streamedRef = useRef<Blob[]>([]); // chunks sent via stream-chunk, indexed by sequence_index
   const voiceMeterRef = useRef<{ rafId: number; ctx: AudioContext } | null>(null);
   const maxDurationTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
   const router = useRouter();
@@ -96,20 +101,32 @@ export default function RecordingPage() {
 
       const recorder = new MediaRecorder(stream);
       chunksRef.current = [];
+      streamedRef.current = [];
+      sequenceRef.current = 0;
       startTimeRef.current = Date.now();
+      // One key per recording so a retried or double-submitted finalize is deduplicated server-side
+      finalizeKeyRef.current = crypto.randomUUID();
       recorder.ondataavailable = async (e) => {
         if (e.data.size === 0) return;
         chunksRef.current.push(e.data);
         if (!sid) return;
+        // Assign the sequence number before any await so finalize sees the final chunk count
+        const blob = e.data;
+        const seq = sequenceRef.current++;
+        const recordingKey = finalizeKeyRef.current;
+        streamedRef.current[seq] = blob;
         try {
-          const blob = e.data;
           const buf = await blob.arrayBuffer();
           const base64 = arrayBufferToBase64(buf);
-          const seq = sequenceRef.current++;
           const durationSeconds = 3; // 3s timeslice
-          const metrics = await sendStreamChunk(sid, base64, seq, durationSeconds);
+          const metrics = await sendStreamChunk(sid, base64, seq, durationSeconds, recordingKey);
+          if (metrics.window_id !== undefined) {
+            if (metrics.window_id === lastWindowIdRef.current) return;
+            lastWindowIdRef.current = metrics.window_id;
+          }
           setLiveTranscript((prev) => (prev ? `${prev} ${metrics.transcript_segment}` : metrics.transcript_segment).trim());
           setWpm(metrics.wpm);
+          setPace(metrics.pace ?? null);
           setFillerCount(metrics.filler_count);
           setMetricsUnavailable(false);
         } catch {
@@ -140,11 +157,33 @@ export default function RecordingPage() {
         setProcessing(true);
         setError("");
         try {
-          const blob = new Blob(chunksRef.current, { type: recorder.mimeType || "audio/webm" });
-          const buf = await blob.arrayBuffer();
-          const base64 = arrayBufferToBase64(buf);
           const durationSeconds = (Date.now() - startTimeRef.current) / 1000;
-          await finalizeRecording(base64, durationSeconds);
+          // Server already has the streamed chunks: finalize from them, re-sending only what it reports missing
+          let assembled = false;
+          const total = sequenceRef.current;
+          if (sid && total > 0 && total === chunksRef.current.length) {
+            try {
+              let r = await finalizeFromStream(total, durationSeconds, finalizeKeyRef.current, []);
+              if ("missing" in r) {
+                const chunks = await Promise.all(
+                  r.missing.map(async (i) => ({
+                    sequence_index: i,
+                    audio_base64: arrayBufferToBase64(await streamedRef.current[i].arrayBuffer()),
+                  }))
+                );
+                r = await finalizeFromStream(total, durationSeconds, finalizeKeyRef.current, chunks);
+              }
+              assembled = !("missing" in r);
+            } catch {
+              assembled = false;
+            }
+          }
+          if (!assembled) {
+            const blob = new Blob(chunksRef.current, { type: recorder.mimeType || "audio/webm" });
+            const buf = await blob.arrayBuffer();
+            const base64 = arrayBufferToBase64(buf);
+            await finalizeRecording(base64, durationSeconds, finalizeKeyRef.current);
+          }
           setStep("report");
           router.push("/homework/report");
         } catch (e) {
@@ -201,6 +240,11 @@ export default function RecordingPage() {
         <div className="rounded-lg border p-4 bg-gray-50">
           <p className="text-sm font-medium text-gray-500">Pacing (WPM)</p>
           <p className="text-2xl font-bold text-gray-900">{wpm}</p>
+          {pace && (
+            <p className={`text-sm ${pace === "on_target" ? "text-green-700" : "text-amber-700"}`}>
+              {pace === "on_target" ? "On target" : pace === "slow" ? "A bit slow" : "A bit fast"}
+            </p>
+          )}
         </div>
         <div className="rounded-lg border p-4 bg-gray-50">
           <p className="text-sm font-medium text-gray-500">Voice strength</p>
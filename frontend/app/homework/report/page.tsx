@@ -1,7 +1,7 @@
 "use client";
 
 import { useEffect, useState } from "react";
-import { getReport, type ReportResponse } from "@/lib/api";
+import { getReport, subscribeSessionEvents, type ReportResponse } from "@/lib/api";
 
 export default function ReportPage() {
   const [report, setReport] = useState<ReportResponse | null>(null);
@@ -9,10 +9,27 @@ export default function ReportPage() {
   const [error, setError] = useState("");
 
   useEffect(() => {
+    const controller = new AbortController();
     getReport()
-      .then(setReport)
+      .then((r) => {
+        setReport(r);
+        if (!r.summary_pending) return;
+        // Summary is still being generated: show partial text as it streams in
+        subscribeSessionEvents(({ event, data }) => {
+          const text = (event === "summary_delta" ? data.text : event === "summary_ready" ? data.summary : null) as
+            | string
+            | null;
+          if (typeof text === "string") {
+            setReport((prev) => (prev ? { ...prev, summary: text, summary_pending: event !== "summary_ready" } : prev));
+          }
+        }, controller.signal)
+          .catch(() => {}) // SSE refused (busy, or off for this server): fall back to one report reload
+          .then(() => getReport().then(setReport))
+          .catch(() => {});
+      })
       .catch((e) => setError(e.message))
       .finally(() => setLoading(false));
+    return () => controller.abort();
   }, []);
 
   if (loading) return <div className="py-8 text-center text-gray-500">Loading report…</div>;
@@ -24,7 +41,9 @@ export default function ReportPage() {
       <h1 className="text-xl font-semibold">Your result</h1>
       <div className="rounded-lg border p-6 bg-gray-50">
         <p className="text-3xl font-bold text-gray-900">Score: {report.score}</p>
-        <p className="mt-4 text-gray-700">{report.summary}</p>
+        <p className="mt-4 text-gray-700">
+          {report.summary || (report.summary_pending ? "Writing your summary…" : "")}
+        </p>
         <p className="mt-4 text-sm text-gray-600">{report.coach_reminder}</p>
         {report.coach_feedback_text && (
           <div className="mt-4 pt-4 border-t">
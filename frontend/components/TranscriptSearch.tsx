@@ -0,0 +1,114 @@
+"use client";
+
+import { useState } from "react";
+import Link from "next/link";
+import { searchTranscripts } from "@/lib/admin-api";
+import type { Student, TranscriptHit } from "@/lib/admin-api";
+
+type TranscriptSearchProps = {
+  students: Student[];
+  exercises: { id: string; name: string }[];
+};
+
+/** Render a snippet's <mark> spans as highlights; everything else stays plain (escaped) text. */
+function Snippet({ text }: { text: string }) {
+  const parts = text.split(/<mark>|<\/mark>/);
+  return (
+    <span>
+      {parts.map((part, i) => (i % 2 === 1 ? <mark key={i}>{part}</mark> : <span key={i}>{part}</span>))}
+    </span>
+  );
+}
+
+/**
+ * Full-text search over student transcripts. Supports "quoted phrases", or, and -exclusions.
+ */
+export function TranscriptSearch({ students, exercises }: TranscriptSearchProps) {
+  const [query, setQuery] = useState("");
+  const [studentId, setStudentId] = useState("");
+  const [exerciseId, setExerciseId] = useState("");
+  const [results, setResults] = useState<TranscriptHit[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [searched, setSearched] = useState(false);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState("");
+
+  const emailFor = (userId: string) => students.find((s) => s.id === userId)?.email || userId;
+
+  async function run(cursor: string | null) {
+    if (!query.trim()) return;
+    setLoading(true);
+    setError("");
+    try {
+      const page = await searchTranscripts({ q: query, student_id: studentId, exercise_id: exerciseId, cursor });
+      setResults((prev) => (cursor ? [...prev, ...page.results] : page.results));
+      setNextCursor(page.next_cursor);
+      setSearched(true);
+    } catch (e) {
+      setError(e instanceof Error ? e.message : "Search failed");
+    } finally {
+      setLoading(false);
+    }
+  }
+
+  return (
+    <div className="space-y-3">
+      <form
+        onSubmit={(e) => {
+          e.preventDefault();
+          run(null);
+        }}
+        className="flex flex-wrap gap-2"
+      >
+        <input
+          value={query}
+          onChange={(e) => setQuery(e.target.value)}
+          placeholder='e.g. "you know" or pricing -demo'
+          className="flex-1 min-w-[12rem] px-3 py-2 border rounded"
+        />
+        <select value={studentId} onChange={(e) => setStudentId(e.target.value)} className="px-3 py-2 border rounded">
+          <option value="">All students</option>
+          {students.map((s) => (
+            <option key={s.id} value={s.id}>{s.email || s.id}</option>
+          ))}
+        </select>
+        <select value={exerciseId} onChange={(e) => setExerciseId(e.target.value)} className="px-3 py-2 border rounded">
+          <option value="">All exercises</option>
+          {exercises.map((ex) => (
+            <option key={ex.id} value={ex.id}>{ex.name}</option>
+          ))}
+        </select>
+        <button
+          type="submit"
+          disabled={loading}
+          className="px-4 py-2 bg-gray-900 text-white rounded hover:bg-gray-800 disabled:opacity-50"
+        >
+          {loading ? "Searching…" : "Search"}
+        </button>
+      </form>
+      {error && <p className="text-sm text-red-600">{error}</p>}
+      <ul className="border rounded divide-y overflow-hidden">
+        {results.map((hit) => (
+          <li key={hit.recording_id} className="px-4 py-3 text-sm">
+            <div className="text-gray-500 mb-1">
+              <Link href={`/admin/students/${hit.user_id}`} className="text-blue-600 hover:underline">
+                {emailFor(hit.user_id)}
+              </Link>
+              {" · "}
+              {new Date(hit.created_at).toLocaleDateString()}
+              {hit.exercise_name && ` · ${hit.exercise_name}`}
+              {hit.score != null && ` · score ${hit.score}`}
+            </div>
+            <Snippet text={hit.snippet} />
+          </li>
+        ))}
+        {searched && results.length === 0 && <li className="px-4 py-3 text-gray-500">No matches.</li>}
+      </ul>
+      {nextCursor && (
+        <button type="button" onClick={() => run(nextCursor)} disabled={loading} className="text-blue-600 hover:underline text-sm">
+          Load more
+        </button>
+      )}
+    </div>
+  );
+}
@@ -106,7 +106,9 @@ export async function getExercises() {
   return res.json();
 }
 
-export async function createExercise(body: { name: string; description?: string; default_starting_metric?: number }) {
+export async function createExercise(
+  body: { name: string; description?: string; default_starting_metric?: number } & ExerciseScoring
+) {
   const res = await fetchWithAuth(`${API_BASE}/exercises`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
@@ -116,7 +118,18 @@ export async function createExercise(body: { name: string; description?: string;
   return res.json();
 }
 
-export async function updateExercise(id: string, body: { name?: string; description?: string; default_starting_metric?: number }) {
+/** Per-exercise scoring profile overrides; null clears one (global FILLER_WORDS / POINTS_PER_FILLER apply). */
+export type ExerciseScoring = {
+  filler_words?: string[] | string | null;
+  points_per_filler?: number | null;
+  target_wpm_min?: number | null;
+  target_wpm_max?: number | null;
+};
+
+export async function updateExercise(
+  id: string,
+  body: { name?: string; description?: string; default_starting_metric?: number } & ExerciseScoring
+) {
   const res = await fetchWithAuth(`${API_BASE}/exercises/${id}`, {
     method: "PUT",
     headers: { "Content-Type": "application/json" },
@@ -132,6 +145,106 @@ export async function getReportsList(limit = 50) {
   return res.json();
 }
 
+export type InboxItem = {
+  id: string;
+  session_id: string;
+  user_id: string;
+  score: number | null;
+  summary: string | null;
+  created_at: string;
+  homework_sessions_v2?: { recommended_exercise_id: string | null; exercises_pool?: { name: string } | null };
+};
+
+export type PendingCount = { user_id: string; pending: number; oldest_pending_at: string | null };
+
+export type FeedbackInbox = {
+  items: InboxItem[];
+  next_cursor: string | null;
+  pending_by_student: PendingCount[];
+  total_pending: number;
+};
+
+/** Reports waiting for coach feedback, oldest first, with per-student pending counts. */
+export async function getFeedbackInbox(params: {
+  student_id?: string;
+  min_age_hours?: number;
+  max_age_hours?: number;
+  limit?: number;
+  cursor?: string | null;
+} = {}): Promise<FeedbackInbox> {
+  const qs = new URLSearchParams();
+  if (params.student_id) qs.set("student_id", params.student_id);
+  if (params.min_age_hours) qs.set("min_age_hours", String(params.min_age_hours));
+  if (params.max_age_hours) qs.set("max_age_hours", String(params.max_age_hours));
+  if (params.limit) qs.set("limit", String(params.limit));
+  if (params.cursor) qs.set("cursor", params.cursor);
+  const res = await fetchWithAuth(`${API_BASE}/feedback-inbox?${qs.toString()}`);
+  if (!res.ok) throw new Error(await res.text());
+  return res.json();
+}
+
+export type ReportsExportParams = {
+  format?: "csv" | "ndjson";
+  gzip?: boolean;
+  from?: string;
+  to?: string;
+  student_id?: string;
+  exercise_id?: string;
+  include_transcript?: boolean;
+};
+
+/** Download the streamed reports export and hand it to the browser as a file. */
+export async function downloadReportsExport(params: ReportsExportParams = {}) {
+  const qs = new URLSearchParams();
+  Object.entries(params).forEach(([k, v]) => {
+    if (v === undefined || v === "" || v === false) return;
+    qs.set(k, v === true ? "1" : String(v));
+  });
+  const res = await fetchWithAuth(`${API_BASE}/reports/export?${qs.toString()}`);
+  if (!res.ok) throw new Error(await res.text());
+  const match = /filename="([^"]+)"/.exec(res.headers.get("content-disposition") || "");
+  const url = URL.createObjectURL(await res.blob());
+  const a = document.createElement("a");
+  a.href = url;
+  a.download = match ? match[1] : "reports.csv";
+  a.click();
+  URL.revokeObjectURL(url);
+}
+
+export type TranscriptHit = {
+  recording_id: string;
+  session_id: string;
+  user_id: string;
+  exercise_id: string | null;
+  exercise_name: string | null;
+  report_id: string | null;
+  score: number | null;
+  created_at: string;
+  rank: number;
+  /** Transcript excerpt with matches wrapped in <mark>…</mark> (text itself is not HTML-escaped). */
+  snippet: string;
+};
+
+export async function searchTranscripts(params: {
+  q: string;
+  student_id?: string;
+  exercise_id?: string;
+  /** rank (default): best matches among the most recent ones; recent: newest first. */
+  order?: "rank" | "recent";
+  limit?: number;
+  cursor?: string | null;
+}): Promise<{ results: TranscriptHit[]; next_cursor: string | null }> {
+  const qs = new URLSearchParams({ q: params.q });
+  if (params.student_id) qs.set("student_id", params.student_id);
+  if (params.exercise_id) qs.set("exercise_id", params.exercise_id);
+  if (params.order) qs.set("order", params.order);
+  if (params.limit) qs.set("limit", String(params.limit));
+  if (params.cursor) qs.set("cursor", params.cursor);
+  const res = await fetchWithAuth(`${API_BASE}/search?${qs.toString()}`);
+  if (!res.ok) throw new Error(await res.text());
+  return res.json();
+}
+
 export async function getReportById(id: string) {
   const res = await fetchWithAuth(`${API_BASE}/reports/${id}`);
   if (!res.ok) throw new Error(await res.text());
@@ -14,6 +14,19 @@ async function fetchWithAuth(url: string, options: RequestInit = {}) {
   return fetch(url, { ...options, headers });
 }
 
+const FINALIZE_BUSY_RETRIES = 3;
+
+/** Retry a request the backend shed with 503 (server busy), waiting the retry_after it sent. */
+async function fetchRetryingBusy(url: string, options: RequestInit, retries = FINALIZE_BUSY_RETRIES) {
+  for (let attempt = 0; ; attempt++) {
+    const res = await fetchWithAuth(url, options);
+    if (res.status !== 503 || attempt >= retries) return res;
+    const body = await res.clone().json().catch(() => ({}));
+    const wait = Number(body.retry_after) || 5;
+    await new Promise((r) => setTimeout(r, wait * 1000));
+  }
+}
+
 export type HomeworkStep = "landing" | "recording" | "processing" | "report";
 
 export type HomeworkStatus = {
@@ -73,7 +86,9 @@ export async function startHomework(recommendedExerciseId?: string): Promise<Sta
 
 export type ReportResponse = {
   score: number;
-  summary: string;
+  summary: string | null;
+  /** True while the summary is still being generated; follow it with subscribeSessionEvents. */
+  summary_pending?: boolean;
   coach_reminder: string;
   coach_feedback_text?: string;
 };
@@ -87,22 +102,72 @@ export async function getReport(): Promise<ReportResponse> {
 export type FinalizeResponse = {
   step: string;
   score: number;
-  summary: string;
+  summary: string | null;
+  summary_pending?: boolean;
+  pace?: Pace | null;
+  wpm_target?: { min: number | null; max: number | null };
   coach_reminder: string;
 };
 
+export type SessionEvent = { event: string; data: Record<string, unknown> };
+
+/**
+ * Follow the current session's server-sent events (processing, scored, report_ready, summary_delta,
+ * summary_ready, failed). Uses fetch streaming so the Authorization header can be sent.
+ * Resolves when the server closes the stream or the signal aborts.
+ */
+export async function subscribeSessionEvents(onEvent: (e: SessionEvent) => void, signal?: AbortSignal): Promise<void> {
+  const res = await fetchWithAuth(`${API_BASE}/events`, { signal });
+  if (!res.ok || !res.body) throw new Error(await res.text());
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buffer += decoder.decode(value, { stream: true });
+    let sep: number;
+    while ((sep = buffer.indexOf("\n\n")) >= 0) {
+      const block = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      let event = "message";
+      let data = "";
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (!data) continue;
+      try {
+        onEvent({ event, data: JSON.parse(data) });
+      } catch {
+        // ignore malformed event
+      }
+    }
+  }
+}
+
+export type Pace = "slow" | "on_target" | "fast";
+
 export type LiveMetrics = {
   transcript_segment: string;
   wpm: number;
   voice_strength: number;
   filler_count: number;
+  /** Increases with each finished server-side window; repeats mean no new transcript yet. */
+  window_id?: number;
+  pending?: boolean;
+  /** Window pace against the exercise's WPM targets; absent when the exercise has none. */
+  pace?: Pace | null;
+  /** Set when the server shed this chunk under load; the metrics are the last ones it had. */
+  slow_down?: boolean;
 };
 
 export async function sendStreamChunk(
   sessionId: string,
   audioBase64: string,
   sequenceIndex: number,
-  durationSeconds: number
+  durationSeconds: number,
+  recordingKey?: string
 ): Promise<LiveMetrics> {
   const res = await fetchWithAuth(`${API_BASE}/recordings/stream-chunk`, {
     method: "POST",
@@ -112,18 +177,59 @@ export async function sendStreamChunk(
       sequence_index: sequenceIndex,
       audio_base64: audioBase64,
       duration_seconds: durationSeconds,
+      // Spools chunks per recording, so a re-recording never reuses a failed attempt's chunks
+      recording_key: recordingKey,
     }),
   });
+  // Shed under load: the body carries the last metrics we computed, so keep showing those
+  if (res.status === 503) {
+    const body = await res.json().catch(() => null);
+    if (body && body.slow_down) return body as LiveMetrics;
+  }
   if (!res.ok) throw new Error(await res.text());
   return res.json();
 }
 
-export async function finalizeRecording(audioBase64: string, durationSeconds: number): Promise<FinalizeResponse> {
-  const res = await fetchWithAuth(`${API_BASE}/recordings/finalize`, {
+export async function finalizeRecording(
+  audioBase64: string,
+  durationSeconds: number,
+  idempotencyKey?: string
+): Promise<FinalizeResponse> {
+  const res = await fetchRetryingBusy(`${API_BASE}/recordings/finalize`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: { "Content-Type": "application/json", ...(idempotencyKey ? { "Idempotency-Key": idempotencyKey } : {}) },
     body: JSON.stringify({ audio_base64: audioBase64, duration_seconds: durationSeconds }),
   });
   if (!res.ok) throw new Error(await res.text());
   return res.json();
 }
+
+export type StreamChunk = { sequence_index: number; audio_base64: string };
+
+/**
+ * Finalize from chunks the server already spooled via stream-chunk. Pass the chunks it reported missing
+ * (and/or the tail). Returns { missing } when the server still has gaps, so the caller can re-send just those.
+ */
+export async function finalizeFromStream(
+  totalChunks: number,
+  durationSeconds: number,
+  idempotencyKey: string,
+  chunks: StreamChunk[]
+): Promise<FinalizeResponse | { missing: number[] }> {
+  const res = await fetchRetryingBusy(`${API_BASE}/recordings/finalize`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", "Idempotency-Key": idempotencyKey },
+    body: JSON.stringify({
+      assemble_from_stream: true,
+      total_chunks: totalChunks,
+      duration_seconds: durationSeconds,
+      chunks,
+    }),
+  });
+  if (res.status === 409) {
+    const body = await res.json().catch(() => ({}));
+    if (Array.isArray(body.missing)) return { missing: body.missing as number[] };
+  }
+  if (!res.ok) throw new Error(await res.text());
+  return res.json();
+}
@@ -0,0 +1,170 @@
+-- Session state transitions as single-round-trip RPC functions.
+-- Each function does its reads and writes in one transaction and returns the payload the route needs.
+-- Call from the backend via sb.rpc("<name>", {...}).
+
+-- Start or resume: reuse the latest not_started/recording session, else create one already in 'recording'.
+CREATE OR REPLACE FUNCTION hw_start_or_resume(p_user_id uuid, p_recommended_exercise_id uuid DEFAULT NULL)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  s homework_sessions_v2%ROWTYPE;
+  ex exercises_pool%ROWTYPE;
+BEGIN
+  -- Serialize concurrent starts for the same user
+  PERFORM pg_advisory_xact_lock(hashtext('hw_session:' || p_user_id::text));
+
+  SELECT * INTO s FROM homework_sessions_v2
+  WHERE user_id = p_user_id
+  ORDER BY created_at DESC
+  LIMIT 1
+  FOR UPDATE;
+
+  IF FOUND AND s.status IN ('not_started', 'recording') THEN
+    IF s.status = 'not_started' THEN
+      UPDATE homework_sessions_v2 SET status = 'recording', updated_at = now()
+      WHERE id = s.id
+      RETURNING * INTO s;
+    END IF;
+  ELSE
+    INSERT INTO homework_sessions_v2 (user_id, status, recommended_exercise_id)
+    VALUES (p_user_id, 'recording', p_recommended_exercise_id)
+    RETURNING * INTO s;
+  END IF;
+
+  IF s.recommended_exercise_id IS NOT NULL THEN
+    SELECT * INTO ex FROM exercises_pool WHERE id = s.recommended_exercise_id;
+  END IF;
+
+  RETURN jsonb_build_object(
+    'session_id', s.id,
+    'status', s.status,
+    'exercise', CASE WHEN s.recommended_exercise_id IS NULL THEN NULL ELSE jsonb_build_object(
+      'id', s.recommended_exercise_id,
+      'name', ex.name,
+      'description', ex.description
+    ) END
+  );
+END;
+$$;
+
+-- Begin finalize: lock the user's latest session, check it is recordable, move it to 'processing',
+-- create the recording row and resolve the starting metric (student override -> exercise default).
+-- Returns NULL in 'error' on success; otherwise 'error' is 'no_session' or 'not_recordable'.
+CREATE OR REPLACE FUNCTION hw_begin_finalize(p_user_id uuid, p_storage_path text DEFAULT NULL)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  s homework_sessions_v2%ROWTYPE;
+  rec_id uuid;
+  metric int;
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('hw_session:' || p_user_id::text));
+
+  SELECT * INTO s FROM homework_sessions_v2
+  WHERE user_id = p_user_id
+  ORDER BY created_at DESC
+  LIMIT 1
+  FOR UPDATE;
+
+  IF NOT FOUND THEN
+    RETURN jsonb_build_object('error', 'no_session');
+  END IF;
+  IF s.status NOT IN ('not_started', 'recording') THEN
+    RETURN jsonb_build_object('error', 'not_recordable', 'session_id', s.id, 'status', s.status);
+  END IF;
+
+  UPDATE homework_sessions_v2 SET status = 'processing', updated_at = now() WHERE id = s.id;
+
+  INSERT INTO recordings_v2 (session_id, storage_path)
+  VALUES (s.id, p_storage_path)
+  RETURNING id INTO rec_id;
+
+  SELECT starting_metric_override INTO metric FROM student_overrides_v2 WHERE user_id = p_user_id;
+  IF metric IS NULL AND s.recommended_exercise_id IS NOT NULL THEN
+    SELECT default_starting_metric INTO metric FROM exercises_pool WHERE id = s.recommended_exercise_id;
+  END IF;
+
+  RETURN jsonb_build_object(
+    'error', NULL,
+    'session_id', s.id,
+    'recording_id', rec_id,
+    'user_id', s.user_id,
+    'exercise_id', s.recommended_exercise_id,
+    'starting_metric', metric
+  );
+END;
+$$;
+
+-- Complete: write recording metrics, insert the report and mark the session completed.
+CREATE OR REPLACE FUNCTION hw_complete_with_report(
+  p_session_id uuid,
+  p_recording_id uuid,
+  p_transcript text,
+  p_wpm numeric,
+  p_filler_count int,
+  p_starting_metric int,
+  p_score numeric,
+  p_summary text
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  rep homework_reports_v2%ROWTYPE;
+BEGIN
+  IF p_recording_id IS NOT NULL THEN
+    UPDATE recordings_v2 SET
+      transcript = p_transcript,
+      wpm = p_wpm,
+      filler_count = p_filler_count,
+      starting_metric = p_starting_metric,
+      score = p_score,
+      updated_at = now()
+    WHERE id = p_recording_id;
+  END IF;
+
+  INSERT INTO homework_reports_v2 (session_id, recording_id, summary, score, starting_metric, filler_count)
+  VALUES (p_session_id, p_recording_id, coalesce(p_summary, ''), p_score, p_starting_metric, coalesce(p_filler_count, 0))
+  RETURNING * INTO rep;
+
+  UPDATE homework_sessions_v2 SET status = 'completed', updated_at = now() WHERE id = p_session_id;
+
+  RETURN to_jsonb(rep);
+END;
+$$;
+
+-- Submit coach feedback: update the report and return what the feedback email needs.
+CREATE OR REPLACE FUNCTION hw_submit_feedback(p_report_id uuid, p_coach_feedback_text text)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  rep homework_reports_v2%ROWTYPE;
+  uid uuid;
+BEGIN
+  UPDATE homework_reports_v2 SET
+    coach_feedback_text = p_coach_feedback_text,
+    coach_feedback_sent_at = now(),
+    updated_at = now()
+  WHERE id = p_report_id
+  RETURNING * INTO rep;
+
+  IF NOT FOUND THEN
+    RETURN NULL;
+  END IF;
+
+  SELECT user_id INTO uid FROM homework_sessions_v2 WHERE id = rep.session_id;
+
+  RETURN jsonb_build_object(
+    'id', rep.id,
+    'session_id', rep.session_id,
+    'user_id', uid,
+    'score', rep.score,
+    'summary', rep.summary,
+    'coach_feedback_text', rep.coach_feedback_text,
+    'coach_feedback_sent_at', rep.coach_feedback_sent_at
+  );
+END;
+$$;
@@ -0,0 +1,26 @@
+-- Keep updated_at current on every write so /v2/homework/status and /report ETags change with the row.
+
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.updated_at = now();
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_homework_sessions_v2_updated_at ON homework_sessions_v2;
+CREATE TRIGGER trg_homework_sessions_v2_updated_at
+  BEFORE UPDATE ON homework_sessions_v2
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_recordings_v2_updated_at ON recordings_v2;
+CREATE TRIGGER trg_recordings_v2_updated_at
+  BEFORE UPDATE ON recordings_v2
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_homework_reports_v2_updated_at ON homework_reports_v2;
+CREATE TRIGGER trg_homework_reports_v2_updated_at
+  BEFORE UPDATE ON homework_reports_v2
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
@@ -0,0 +1,100 @@
+-- Idempotent finalize: one row per finalize attempt, keyed by user + (client Idempotency-Key or session id + audio hash).
+-- Duplicates of an in-progress finalize wait for it; duplicates of a completed one get the stored result.
+
+CREATE TABLE IF NOT EXISTS finalize_requests_v2 (
+  idempotency_key text PRIMARY KEY,
+  session_id uuid NOT NULL REFERENCES homework_sessions_v2(id) ON DELETE CASCADE,
+  recording_id uuid REFERENCES recordings_v2(id) ON DELETE SET NULL,
+  audio_sha256 text,
+  status text NOT NULL DEFAULT 'in_progress' CHECK (status IN ('in_progress', 'completed', 'failed')),
+  result jsonb,
+  created_at timestamptz NOT NULL DEFAULT now(),
+  updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_finalize_requests_v2_session_id ON finalize_requests_v2(session_id);
+
+-- Replaces hw_begin_finalize(uuid, text): same behaviour plus the dedupe check and journal insert,
+-- all under the per-user advisory lock so concurrent duplicates serialize.
+DROP FUNCTION IF EXISTS hw_begin_finalize(uuid, text);
+
+CREATE OR REPLACE FUNCTION hw_begin_finalize(
+  p_user_id uuid,
+  p_storage_path text DEFAULT NULL,
+  p_idempotency_key text DEFAULT NULL,
+  p_audio_sha256 text DEFAULT NULL
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  s homework_sessions_v2%ROWTYPE;
+  fr finalize_requests_v2%ROWTYPE;
+  v_key text;
+  rec_id uuid;
+  metric int;
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('hw_session:' || p_user_id::text));
+
+  SELECT * INTO s FROM homework_sessions_v2
+  WHERE user_id = p_user_id
+  ORDER BY created_at DESC
+  LIMIT 1
+  FOR UPDATE;
+
+  IF NOT FOUND THEN
+    RETURN jsonb_build_object('error', 'no_session');
+  END IF;
+
+  v_key := p_user_id::text || ':' || coalesce(p_idempotency_key, s.id::text || ':' || coalesce(p_audio_sha256, ''));
+
+  SELECT * INTO fr FROM finalize_requests_v2 WHERE idempotency_key = v_key;
+  IF FOUND AND fr.status <> 'failed' THEN
+    RETURN jsonb_build_object(
+      'error', NULL,
+      'duplicate', true,
+      'idempotency_key', v_key,
+      'session_id', fr.session_id,
+      'status', fr.status,
+      'result', fr.result
+    );
+  END IF;
+
+  IF s.status NOT IN ('not_started', 'recording') THEN
+    RETURN jsonb_build_object('error', 'not_recordable', 'session_id', s.id, 'status', s.status);
+  END IF;
+
+  UPDATE homework_sessions_v2 SET status = 'processing', updated_at = now() WHERE id = s.id;
+
+  INSERT INTO recordings_v2 (session_id, storage_path)
+  VALUES (s.id, p_storage_path)
+  RETURNING id INTO rec_id;
+
+  -- A failed attempt with the same key is replaced by this one
+  INSERT INTO finalize_requests_v2 (idempotency_key, session_id, recording_id, audio_sha256, status)
+  VALUES (v_key, s.id, rec_id, p_audio_sha256, 'in_progress')
+  ON CONFLICT (idempotency_key) DO UPDATE SET
+    session_id = EXCLUDED.session_id,
+    recording_id = EXCLUDED.recording_id,
+    audio_sha256 = EXCLUDED.audio_sha256,
+    status = 'in_progress',
+    result = NULL,
+    updated_at = now();
+
+  SELECT starting_metric_override INTO metric FROM student_overrides_v2 WHERE user_id = p_user_id;
+  IF metric IS NULL AND s.recommended_exercise_id IS NOT NULL THEN
+    SELECT default_starting_metric INTO metric FROM exercises_pool WHERE id = s.recommended_exercise_id;
+  END IF;
+
+  RETURN jsonb_build_object(
+    'error', NULL,
+    'duplicate', false,
+    'idempotency_key', v_key,
+    'session_id', s.id,
+    'recording_id', rec_id,
+    'user_id', s.user_id,
+    'exercise_id', s.recommended_exercise_id,
+    'starting_metric', metric
+  );
+END;
+$$;
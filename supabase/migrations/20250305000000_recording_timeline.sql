@@ -0,0 +1,44 @@
+-- Word-timestamp timeline metrics stored once on the recording (pacing timeline, pauses, filler positions).
+ALTER TABLE recordings_v2 ADD COLUMN IF NOT EXISTS timeline jsonb;
+
+-- hw_complete_with_report gains p_timeline; drop the old signature so there is no ambiguous overload.
+DROP FUNCTION IF EXISTS hw_complete_with_report(uuid, uuid, text, numeric, int, int, numeric, text);
+
+CREATE OR REPLACE FUNCTION hw_complete_with_report(
+  p_session_id uuid,
+  p_recording_id uuid,
+  p_transcript text,
+  p_wpm numeric,
+  p_filler_count int,
+  p_starting_metric int,
+  p_score numeric,
+  p_summary text,
+  p_timeline jsonb DEFAULT NULL
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  rep homework_reports_v2%ROWTYPE;
+BEGIN
+  IF p_recording_id IS NOT NULL THEN
+    UPDATE recordings_v2 SET
+      transcript = p_transcript,
+      wpm = p_wpm,
+      filler_count = p_filler_count,
+      starting_metric = p_starting_metric,
+      score = p_score,
+      timeline = p_timeline,
+      updated_at = now()
+    WHERE id = p_recording_id;
+  END IF;
+
+  INSERT INTO homework_reports_v2 (session_id, recording_id, summary, score, starting_metric, filler_count)
+  VALUES (p_session_id, p_recording_id, p_summary, p_score, p_starting_metric, coalesce(p_filler_count, 0))
+  RETURNING * INTO rep;
+
+  UPDATE homework_sessions_v2 SET status = 'completed', updated_at = now() WHERE id = p_session_id;
+
+  RETURN to_jsonb(rep);
+END;
+$$;
@@ -0,0 +1,33 @@
+-- Bulk re-scoring after FILLER_WORDS / POINTS_PER_FILLER / starting-metric changes (backend: flask rescore).
+-- Reports are updated by recording_id, so index it; keyset paging walks recordings_v2 by primary key.
+CREATE INDEX IF NOT EXISTS idx_homework_reports_v2_recording_id ON homework_reports_v2(recording_id);
+
+-- p_rows: [{"recording_id": uuid, "filler_count": int, "starting_metric": int, "score": numeric}, ...]
+-- Updates recordings_v2 and the matching homework_reports_v2 rows in one statement each.
+CREATE OR REPLACE FUNCTION hw_rescore_batch(p_rows jsonb)
+RETURNS int
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n int;
+BEGIN
+  UPDATE recordings_v2 r SET
+    filler_count = x.filler_count,
+    starting_metric = x.starting_metric,
+    score = x.score,
+    updated_at = now()
+  FROM jsonb_to_recordset(p_rows) AS x(recording_id uuid, filler_count int, starting_metric int, score numeric)
+  WHERE r.id = x.recording_id;
+  GET DIAGNOSTICS n = ROW_COUNT;
+
+  UPDATE homework_reports_v2 rep SET
+    filler_count = x.filler_count,
+    starting_metric = x.starting_metric,
+    score = x.score,
+    updated_at = now()
+  FROM jsonb_to_recordset(p_rows) AS x(recording_id uuid, filler_count int, starting_metric int, score numeric)
+  WHERE rep.recording_id = x.recording_id;
+
+  RETURN n;
+END;
+$$;
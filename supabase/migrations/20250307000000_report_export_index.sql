@@ -0,0 +1,2 @@
+-- Admin export pages through reports newest first with a (created_at, id) keyset cursor.
+CREATE INDEX IF NOT EXISTS idx_homework_reports_v2_created_at_id ON homework_reports_v2(created_at DESC, id DESC);
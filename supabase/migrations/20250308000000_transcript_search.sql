@@ -0,0 +1,89 @@
+-- Full-text search over recordings_v2.transcript for coaches (GET /v2/admin/search).
+-- 'simple' config (no stemming, no stopword removal) so fillers and short phrases ("you know", "like",
+-- "so") stay searchable; the english config would drop them as stopwords.
+
+ALTER TABLE recordings_v2 ADD COLUMN IF NOT EXISTS transcript_tsv tsvector;
+
+CREATE OR REPLACE FUNCTION recordings_v2_transcript_tsv()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.transcript_tsv = CASE WHEN NEW.transcript IS NULL THEN NULL ELSE to_tsvector('simple', NEW.transcript) END;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_recordings_v2_transcript_tsv ON recordings_v2;
+CREATE TRIGGER trg_recordings_v2_transcript_tsv
+  BEFORE INSERT OR UPDATE OF transcript ON recordings_v2
+  FOR EACH ROW EXECUTE FUNCTION recordings_v2_transcript_tsv();
+
+-- Backfill existing rows without bumping updated_at (ETags and exports key off it)
+ALTER TABLE recordings_v2 DISABLE TRIGGER trg_recordings_v2_updated_at;
+UPDATE recordings_v2 SET transcript_tsv = to_tsvector('simple', transcript)
+WHERE transcript IS NOT NULL AND transcript_tsv IS NULL;
+ALTER TABLE recordings_v2 ENABLE TRIGGER trg_recordings_v2_updated_at;
+
+CREATE INDEX IF NOT EXISTS idx_recordings_v2_transcript_tsv ON recordings_v2 USING gin (transcript_tsv);
+
+-- Search: websearch syntax ("quoted phrase", or, -exclude), optional student/exercise filters.
+-- Ranked by ts_rank_cd, paged with a (rank, recording_id) keyset cursor; ts_headline only runs on the page.
+-- Snippets mark matches with <mark>…</mark>; the transcript text itself is not HTML-escaped.
+CREATE OR REPLACE FUNCTION hw_search_transcripts(
+  p_query text,
+  p_user_id uuid DEFAULT NULL,
+  p_exercise_id uuid DEFAULT NULL,
+  p_limit int DEFAULT 20,
+  p_after_rank real DEFAULT NULL,
+  p_after_id uuid DEFAULT NULL
+)
+RETURNS TABLE (
+  recording_id uuid,
+  session_id uuid,
+  user_id uuid,
+  exercise_id uuid,
+  exercise_name text,
+  report_id uuid,
+  score numeric,
+  created_at timestamptz,
+  rank real,
+  snippet text
+)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH q AS (
+    SELECT websearch_to_tsquery('simple', p_query) AS tsq
+  ),
+  hits AS (
+    SELECT r.id, r.session_id, r.transcript, r.created_at, s.user_id AS uid, s.recommended_exercise_id AS ex_id,
+           ts_rank_cd(r.transcript_tsv, q.tsq) AS hit_rank
+    FROM recordings_v2 r
+    JOIN homework_sessions_v2 s ON s.id = r.session_id
+    CROSS JOIN q
+    WHERE r.transcript_tsv @@ q.tsq
+      AND (p_user_id IS NULL OR s.user_id = p_user_id)
+      AND (p_exercise_id IS NULL OR s.recommended_exercise_id = p_exercise_id)
+  ),
+  page AS (
+    SELECT h.* FROM hits h
+    WHERE p_after_rank IS NULL OR (h.hit_rank, h.id) < (p_after_rank, p_after_id)
+    ORDER BY h.hit_rank DESC, h.id DESC
+    LIMIT least(greatest(p_limit, 1), 100)
+  )
+  SELECT
+    p.id, p.session_id, p.uid, p.ex_id, ex.name, rep.id, rep.score, p.created_at, p.hit_rank,
+    ts_headline('simple', p.transcript, q.tsq,
+      'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=8, FragmentDelimiter=" … "')
+  FROM page p
+  CROSS JOIN q
+  LEFT JOIN exercises_pool ex ON ex.id = p.ex_id
+  LEFT JOIN LATERAL (
+    SELECT hr.id, hr.score FROM homework_reports_v2 hr
+    WHERE hr.recording_id = p.id
+    ORDER BY hr.created_at DESC
+    LIMIT 1
+  ) rep ON true
+  ORDER BY p.hit_rank DESC, p.id DESC;
+$$;
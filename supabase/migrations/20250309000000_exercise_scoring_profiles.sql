@@ -0,0 +1,114 @@
+-- Per-exercise scoring profiles: filler vocabulary, points per filler and pace targets (target_wpm_min/max).
+-- NULL filler_words / points_per_filler fall back to the backend's FILLER_WORDS / POINTS_PER_FILLER.
+-- scoring_version bumps whenever a scoring field changes; the backend caches compiled profiles by
+-- (exercise id, scoring_version), so other workers pick up an edit the next time they see the new version.
+ALTER TABLE exercises_pool ADD COLUMN IF NOT EXISTS filler_words text[];
+ALTER TABLE exercises_pool ADD COLUMN IF NOT EXISTS points_per_filler int;
+ALTER TABLE exercises_pool ADD COLUMN IF NOT EXISTS scoring_version int NOT NULL DEFAULT 1;
+
+CREATE OR REPLACE FUNCTION exercises_pool_bump_scoring_version()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF (NEW.filler_words, NEW.points_per_filler, NEW.target_wpm_min, NEW.target_wpm_max)
+     IS DISTINCT FROM (OLD.filler_words, OLD.points_per_filler, OLD.target_wpm_min, OLD.target_wpm_max) THEN
+    NEW.scoring_version = OLD.scoring_version + 1;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_exercises_pool_scoring_version ON exercises_pool;
+CREATE TRIGGER trg_exercises_pool_scoring_version
+  BEFORE UPDATE ON exercises_pool
+  FOR EACH ROW EXECUTE FUNCTION exercises_pool_bump_scoring_version();
+
+-- hw_begin_finalize also returns the exercise's scoring_version so finalize can use the cached profile
+-- without another lookup. Same signature as 20250304000000_finalize_idempotency.sql.
+CREATE OR REPLACE FUNCTION hw_begin_finalize(
+  p_user_id uuid,
+  p_storage_path text DEFAULT NULL,
+  p_idempotency_key text DEFAULT NULL,
+  p_audio_sha256 text DEFAULT NULL
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  s homework_sessions_v2%ROWTYPE;
+  fr finalize_requests_v2%ROWTYPE;
+  ex exercises_pool%ROWTYPE;
+  v_key text;
+  rec_id uuid;
+  metric int;
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('hw_session:' || p_user_id::text));
+
+  SELECT * INTO s FROM homework_sessions_v2
+  WHERE user_id = p_user_id
+  ORDER BY created_at DESC
+  LIMIT 1
+  FOR UPDATE;
+
+  IF NOT FOUND THEN
+    RETURN jsonb_build_object('error', 'no_session');
+  END IF;
+
+  v_key := p_user_id::text || ':' || coalesce(p_idempotency_key, s.id::text || ':' || coalesce(p_audio_sha256, ''));
+
+  SELECT * INTO fr FROM finalize_requests_v2 WHERE idempotency_key = v_key;
+  IF FOUND AND fr.status <> 'failed' THEN
+    RETURN jsonb_build_object(
+      'error', NULL,
+      'duplicate', true,
+      'idempotency_key', v_key,
+      'session_id', fr.session_id,
+      'status', fr.status,
+      'result', fr.result
+    );
+  END IF;
+
+  IF s.status NOT IN ('not_started', 'recording') THEN
+    RETURN jsonb_build_object('error', 'not_recordable', 'session_id', s.id, 'status', s.status);
+  END IF;
+
+  UPDATE homework_sessions_v2 SET status = 'processing', updated_at = now() WHERE id = s.id;
+
+  INSERT INTO recordings_v2 (session_id, storage_path)
+  VALUES (s.id, p_storage_path)
+  RETURNING id INTO rec_id;
+
+  -- A failed attempt with the same key is replaced by this one
+  INSERT INTO finalize_requests_v2 (idempotency_key, session_id, recording_id, audio_sha256, status)
+  VALUES (v_key, s.id, rec_id, p_audio_sha256, 'in_progress')
+  ON CONFLICT (idempotency_key) DO UPDATE SET
+    session_id = EXCLUDED.session_id,
+    recording_id = EXCLUDED.recording_id,
+    audio_sha256 = EXCLUDED.audio_sha256,
+    status = 'in_progress',
+    result = NULL,
+    updated_at = now();
+
+  IF s.recommended_exercise_id IS NOT NULL THEN
+    SELECT * INTO ex FROM exercises_pool WHERE id = s.recommended_exercise_id;
+  END IF;
+
+  SELECT starting_metric_override INTO metric FROM student_overrides_v2 WHERE user_id = p_user_id;
+  IF metric IS NULL THEN
+    metric := ex.default_starting_metric;
+  END IF;
+
+  RETURN jsonb_build_object(
+    'error', NULL,
+    'duplicate', false,
+    'idempotency_key', v_key,
+    'session_id', s.id,
+    'recording_id', rec_id,
+    'user_id', s.user_id,
+    'exercise_id', s.recommended_exercise_id,
+    'scoring_version', ex.scoring_version,
+    'starting_metric', metric
+  );
+END;
+$$;
@@ -0,0 +1,99 @@
+-- Durable finalize journal: finalize_requests_v2 rows also record where the audio is archived, the last
+-- completed stage and its checkpoint (transcript / metrics / report id), so a finalize interrupted by a dead
+-- worker can be resumed by the backend's sweeper instead of leaving the session in 'processing'.
+-- Stages: started -> transcribed -> scored -> reported -> summarized.
+ALTER TABLE finalize_requests_v2 ADD COLUMN IF NOT EXISTS user_id uuid;
+ALTER TABLE finalize_requests_v2 ADD COLUMN IF NOT EXISTS stage text NOT NULL DEFAULT 'started'
+  CHECK (stage IN ('started', 'transcribed', 'scored', 'reported', 'summarized'));
+ALTER TABLE finalize_requests_v2 ADD COLUMN IF NOT EXISTS checkpoint jsonb;
+ALTER TABLE finalize_requests_v2 ADD COLUMN IF NOT EXISTS audio_ref text;
+ALTER TABLE finalize_requests_v2 ADD COLUMN IF NOT EXISTS params jsonb;
+ALTER TABLE finalize_requests_v2 ADD COLUMN IF NOT EXISTS attempts int NOT NULL DEFAULT 0;
+ALTER TABLE finalize_requests_v2 ADD COLUMN IF NOT EXISTS last_error text;
+ALTER TABLE finalize_requests_v2 ADD COLUMN IF NOT EXISTS heartbeat_at timestamptz NOT NULL DEFAULT now();
+
+-- Sweeper scans only unfinished journal rows
+CREATE INDEX IF NOT EXISTS idx_finalize_requests_v2_sweep ON finalize_requests_v2(heartbeat_at)
+  WHERE status = 'in_progress' OR (status = 'completed' AND stage = 'reported');
+
+-- A failed key reused by hw_begin_finalize starts a fresh journal; keep updated_at current like other tables.
+CREATE OR REPLACE FUNCTION finalize_requests_v2_before_update()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF OLD.status = 'failed' AND NEW.status = 'in_progress' THEN
+    NEW.stage = 'started';
+    NEW.checkpoint = NULL;
+    NEW.audio_ref = NULL;
+    NEW.params = NULL;
+    NEW.attempts = 0;
+    NEW.last_error = NULL;
+    NEW.heartbeat_at = now();
+  END IF;
+  NEW.updated_at = now();
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_finalize_requests_v2_before_update ON finalize_requests_v2;
+CREATE TRIGGER trg_finalize_requests_v2_before_update
+  BEFORE UPDATE ON finalize_requests_v2
+  FOR EACH ROW EXECUTE FUNCTION finalize_requests_v2_before_update();
+
+-- Claim journal rows whose heartbeat is older than p_stale_sec: unfinished finalizes, and completed ones
+-- whose summary never landed. Claiming bumps attempts and heartbeat; SKIP LOCKED lets several workers sweep.
+-- Rows out of attempts are given up: marked failed and the session handed back to the student ('recording');
+-- a report stuck without a summary gets a placeholder. Returns {claimed: [...], abandoned: [...]}.
+CREATE OR REPLACE FUNCTION hw_claim_stuck_finalize(p_stale_sec int, p_max_attempts int, p_limit int)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_claimed jsonb;
+  v_abandoned jsonb;
+BEGIN
+  WITH gone AS (
+    UPDATE finalize_requests_v2 f SET
+      status = CASE WHEN f.status = 'in_progress' THEN 'failed' ELSE f.status END,
+      stage = CASE WHEN f.status = 'completed' THEN 'summarized' ELSE f.stage END,
+      last_error = coalesce(f.last_error, 'gave up after retries')
+    WHERE f.heartbeat_at < now() - make_interval(secs => p_stale_sec)
+      AND f.attempts >= p_max_attempts
+      AND (f.status = 'in_progress' OR (f.status = 'completed' AND f.stage = 'reported'))
+    RETURNING f.idempotency_key, f.session_id, f.recording_id, f.status
+  ),
+  reset_sessions AS (
+    UPDATE homework_sessions_v2 s SET status = 'recording', updated_at = now()
+    FROM gone
+    WHERE s.id = gone.session_id AND gone.status = 'failed' AND s.status = 'processing'
+    RETURNING s.id
+  ),
+  placeholder_summaries AS (
+    UPDATE homework_reports_v2 rep SET summary = 'Summary unavailable.'
+    FROM gone
+    WHERE rep.recording_id = gone.recording_id AND gone.status = 'completed' AND rep.summary IS NULL
+    RETURNING rep.id
+  )
+  SELECT coalesce(jsonb_agg(to_jsonb(gone)), '[]'::jsonb) INTO v_abandoned FROM gone;
+
+  WITH c AS (
+    SELECT idempotency_key FROM finalize_requests_v2
+    WHERE heartbeat_at < now() - make_interval(secs => p_stale_sec)
+      AND attempts < p_max_attempts
+      AND (status = 'in_progress' OR (status = 'completed' AND stage = 'reported'))
+    ORDER BY heartbeat_at
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  ),
+  u AS (
+    UPDATE finalize_requests_v2 f SET attempts = f.attempts + 1, heartbeat_at = now()
+    FROM c
+    WHERE f.idempotency_key = c.idempotency_key
+    RETURNING f.*
+  )
+  SELECT coalesce(jsonb_agg(to_jsonb(u)), '[]'::jsonb) INTO v_claimed FROM u;
+
+  RETURN jsonb_build_object('claimed', v_claimed, 'abandoned', v_abandoned);
+END;
+$$;
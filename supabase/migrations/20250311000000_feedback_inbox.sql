@@ -0,0 +1,104 @@
+-- Coach feedback inbox (GET /v2/admin/feedback-inbox): reports still waiting for coach feedback, oldest first.
+-- Reports carry their student's user_id so the inbox and its student filter read one partial index that only
+-- holds unreviewed reports, and per-student pending counts are kept by triggers instead of counted per request.
+
+ALTER TABLE homework_reports_v2 ADD COLUMN IF NOT EXISTS user_id uuid;
+
+CREATE OR REPLACE FUNCTION homework_reports_v2_set_user_id()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF NEW.user_id IS NULL THEN
+    SELECT user_id INTO NEW.user_id FROM homework_sessions_v2 WHERE id = NEW.session_id;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_homework_reports_v2_set_user_id ON homework_reports_v2;
+CREATE TRIGGER trg_homework_reports_v2_set_user_id
+  BEFORE INSERT ON homework_reports_v2
+  FOR EACH ROW EXECUTE FUNCTION homework_reports_v2_set_user_id();
+
+-- Backfill without bumping updated_at (ETags and exports key off it)
+ALTER TABLE homework_reports_v2 DISABLE TRIGGER trg_homework_reports_v2_updated_at;
+UPDATE homework_reports_v2 r SET user_id = s.user_id
+FROM homework_sessions_v2 s
+WHERE s.id = r.session_id AND r.user_id IS NULL;
+ALTER TABLE homework_reports_v2 ENABLE TRIGGER trg_homework_reports_v2_updated_at;
+
+CREATE INDEX IF NOT EXISTS idx_homework_reports_v2_pending_feedback
+  ON homework_reports_v2(created_at, id) WHERE coach_feedback_sent_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_homework_reports_v2_pending_feedback_user
+  ON homework_reports_v2(user_id, created_at, id) WHERE coach_feedback_sent_at IS NULL;
+
+-- One row per student with unreviewed reports; pending drops to 0 (row kept) once all are reviewed.
+CREATE TABLE IF NOT EXISTS feedback_pending_counts_v2 (
+  user_id uuid PRIMARY KEY,
+  pending int NOT NULL DEFAULT 0,
+  oldest_pending_at timestamptz,
+  updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_feedback_pending_counts_v2_oldest
+  ON feedback_pending_counts_v2(oldest_pending_at, user_id) WHERE pending > 0;
+
+-- Apply a +1/-1 to a student's count. oldest_pending_at is re-read from the partial index (one index probe).
+CREATE OR REPLACE FUNCTION feedback_pending_apply(p_user_id uuid, p_delta int)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF p_user_id IS NULL THEN
+    RETURN;
+  END IF;
+  INSERT INTO feedback_pending_counts_v2 AS c (user_id, pending, oldest_pending_at, updated_at)
+  VALUES (p_user_id, GREATEST(p_delta, 0), NULL, now())
+  ON CONFLICT (user_id) DO UPDATE SET pending = GREATEST(c.pending + p_delta, 0), updated_at = now();
+
+  UPDATE feedback_pending_counts_v2 SET oldest_pending_at = (
+    SELECT created_at FROM homework_reports_v2
+    WHERE user_id = p_user_id AND coach_feedback_sent_at IS NULL
+    ORDER BY created_at, id
+    LIMIT 1
+  )
+  WHERE user_id = p_user_id;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION homework_reports_v2_pending_count()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    IF NEW.coach_feedback_sent_at IS NULL THEN
+      PERFORM feedback_pending_apply(NEW.user_id, 1);
+    END IF;
+  ELSIF TG_OP = 'DELETE' THEN
+    IF OLD.coach_feedback_sent_at IS NULL THEN
+      PERFORM feedback_pending_apply(OLD.user_id, -1);
+    END IF;
+  ELSIF (OLD.coach_feedback_sent_at IS NULL) <> (NEW.coach_feedback_sent_at IS NULL) THEN
+    PERFORM feedback_pending_apply(NEW.user_id, CASE WHEN NEW.coach_feedback_sent_at IS NULL THEN 1 ELSE -1 END);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_homework_reports_v2_pending_count ON homework_reports_v2;
+CREATE TRIGGER trg_homework_reports_v2_pending_count
+  AFTER INSERT OR DELETE OR UPDATE OF coach_feedback_sent_at ON homework_reports_v2
+  FOR EACH ROW EXECUTE FUNCTION homework_reports_v2_pending_count();
+
+-- Seed counts from existing reports
+INSERT INTO feedback_pending_counts_v2 (user_id, pending, oldest_pending_at)
+SELECT user_id, count(*), min(created_at)
+FROM homework_reports_v2
+WHERE coach_feedback_sent_at IS NULL AND user_id IS NOT NULL
+GROUP BY user_id
+ON CONFLICT (user_id) DO UPDATE SET
+  pending = EXCLUDED.pending,
+  oldest_pending_at = EXCLUDED.oldest_pending_at,
+  updated_at = now();
@@ -0,0 +1,81 @@
+-- Transcript search without ranking every match: a common term ("like", "um") matches most recordings, and
+-- ts_rank_cd over all of them reads every matching tsvector before the LIMIT.
+-- order 'rank' ranks only the p_candidates most recent matches; order 'recent' skips ranking order entirely and
+-- pages newest first with a (created_at, recording_id) keyset cursor.
+
+CREATE INDEX IF NOT EXISTS idx_recordings_v2_created_at ON recordings_v2(created_at, id);
+
+-- New arguments: drop the old signature so PostgREST doesn't see two overloads
+DROP FUNCTION IF EXISTS hw_search_transcripts(text, uuid, uuid, int, real, uuid);
+
+CREATE OR REPLACE FUNCTION hw_search_transcripts(
+  p_query text,
+  p_user_id uuid DEFAULT NULL,
+  p_exercise_id uuid DEFAULT NULL,
+  p_limit int DEFAULT 20,
+  p_after_rank real DEFAULT NULL,
+  p_after_id uuid DEFAULT NULL,
+  p_order text DEFAULT 'rank',
+  p_after_created_at timestamptz DEFAULT NULL,
+  p_candidates int DEFAULT 2000
+)
+RETURNS TABLE (
+  recording_id uuid,
+  session_id uuid,
+  user_id uuid,
+  exercise_id uuid,
+  exercise_name text,
+  report_id uuid,
+  score numeric,
+  created_at timestamptz,
+  rank real,
+  snippet text
+)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH q AS (
+    SELECT websearch_to_tsquery('simple', p_query) AS tsq
+  ),
+  -- Newest matches first: the whole page for 'recent', the candidate set for 'rank'
+  hits AS (
+    SELECT r.id, r.session_id, r.transcript_tsv, r.created_at, s.user_id AS uid, s.recommended_exercise_id AS ex_id
+    FROM recordings_v2 r
+    JOIN homework_sessions_v2 s ON s.id = r.session_id
+    CROSS JOIN q
+    WHERE r.transcript_tsv @@ q.tsq
+      AND (p_user_id IS NULL OR s.user_id = p_user_id)
+      AND (p_exercise_id IS NULL OR s.recommended_exercise_id = p_exercise_id)
+      AND (p_order <> 'recent' OR p_after_created_at IS NULL
+           OR (r.created_at, r.id) < (p_after_created_at, p_after_id))
+    ORDER BY r.created_at DESC, r.id DESC
+    LIMIT CASE WHEN p_order = 'recent' THEN least(greatest(p_limit, 1), 100)
+               ELSE least(greatest(p_candidates, 1), 5000) END
+  ),
+  ranked AS (
+    SELECT h.id, h.session_id, h.created_at, h.uid, h.ex_id, ts_rank_cd(h.transcript_tsv, q.tsq) AS hit_rank
+    FROM hits h
+    CROSS JOIN q
+  ),
+  page AS (
+    SELECT k.* FROM ranked k
+    WHERE p_order = 'recent' OR p_after_rank IS NULL OR (k.hit_rank, k.id) < (p_after_rank, p_after_id)
+    ORDER BY CASE WHEN p_order = 'recent' THEN k.created_at END DESC NULLS LAST, k.hit_rank DESC, k.id DESC
+    LIMIT least(greatest(p_limit, 1), 100)
+  )
+  SELECT
+    p.id, p.session_id, p.uid, p.ex_id, ex.name, rep.id, rep.score, p.created_at, p.hit_rank,
+    ts_headline('simple', r.transcript, q.tsq,
+      'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=8, FragmentDelimiter=" … "')
+  FROM page p
+  JOIN recordings_v2 r ON r.id = p.id
+  CROSS JOIN q
+  LEFT JOIN exercises_pool ex ON ex.id = p.ex_id
+  LEFT JOIN LATERAL (
+    SELECT hr.id, hr.score FROM homework_reports_v2 hr
+    WHERE hr.recording_id = p.id
+    ORDER BY hr.created_at DESC
+    LIMIT 1
+  ) rep ON true
+  ORDER BY CASE WHEN p_order = 'recent' THEN p.created_at END DESC NULLS LAST, p.hit_rank DESC, p.id DESC;
+$$;
@@ -0,0 +1,10 @@
+-- Total reports waiting for coach feedback, for the inbox header. Sums the trigger-maintained per-student counts
+-- (one row per student, read through the pending > 0 partial index) rather than the page the inbox returns.
+
+CREATE OR REPLACE FUNCTION hw_feedback_pending_total()
+RETURNS bigint
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT coalesce(sum(pending), 0)::bigint FROM feedback_pending_counts_v2 WHERE pending > 0;
+$$;